@@ -0,0 +1,72 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Summarize timing samples (in seconds)."""
+    return {
+        "n": len(samples),
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.mean(samples),
+        "max_s": max(samples),
+    }
+
+
+def report(benchmark: str, **fields: Any) -> Dict[str, Any]:
+    """Print one benchmark result as a JSON line on stdout and return it."""
+    result = {"benchmark": benchmark, **fields}
+    print(json.dumps(result), file=sys.stdout, flush=True)
+    return result
+
+
+def measure(function: Callable[[], Any], repeat: int, warmup: int = 1) -> List[float]:
+    """Time `repeat` calls of `function` (in seconds), after `warmup` untimed calls."""
+    for _ in range(warmup):
+        function()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def git_commit() -> Optional[str]:
+    """Get the commit the benchmarks run on, if in a git checkout."""
+    try:
+        output = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def save(path: str, results: List[Dict[str, Any]]) -> None:
+    """Write results to a JSON file along with the commit and platform they were measured on."""
+    document = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "results": results,
+    }
+    with open(path, "w") as results_file:
+        json.dump(document, results_file, indent=2)
+
+
+def load(path: str) -> List[Dict[str, Any]]:
+    """Read results written by `save`, or the JSON lines printed by `report`."""
+    with open(path) as results_file:
+        content = results_file.read()
+    try:
+        return json.loads(content)["results"]
+    except (ValueError, KeyError, TypeError):
+        return [json.loads(line) for line in content.splitlines() if line.strip()]
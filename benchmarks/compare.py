@@ -0,0 +1,90 @@
+"""
+Compare two benchmark runs and flag the results that got slower.
+
+Results are matched on their benchmark name and parameters (every field that is not a
+measurement), and compared on their fastest time, which is the least affected by noise from the
+rest of the system. Results found in only one of the runs are listed too, since a result that no
+longer matches its baseline (e.g. a renamed parameter) would otherwise hide a regression. Exits
+with status 1 when any result is more than `--threshold` slower, so it can gate a CI job.
+
+    python -m benchmarks.compare BASELINE CURRENT [--threshold 0.1]
+"""
+import argparse
+import sys
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.common import load
+
+# Fields that are measured rather than parameters of a benchmark
+MEASUREMENTS = {"n", "min_s", "median_s", "mean_s", "max_s", "bytes", "seconds", "modules", "series", "errors"}
+METRIC = "min_s"
+
+
+def key(result: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """Get the benchmark name and parameters identifying a result."""
+    return tuple(
+        (name, value)
+        for name, value in sorted(result.items())
+        if name not in MEASUREMENTS and not name.endswith(("_s", "_per_s", "_per_second"))
+    )
+
+
+def describe(result_key: Tuple[Tuple[str, Any], ...]) -> str:
+    return " ".join(str(value) if field == "benchmark" else f"{field}={value}" for field, value in result_key)
+
+
+def compare(
+    baseline: List[Dict[str, Any]], current: List[Dict[str, Any]], threshold: float
+) -> List[Dict[str, Any]]:
+    """Get the relative change of every result found in both runs, flagging regressions."""
+    baseline_by_key = {key(result): result for result in baseline if METRIC in result}
+    changes = []
+    for result in current:
+        if METRIC not in result or (before := baseline_by_key.get(key(result))) is None:
+            continue
+        change = result[METRIC] / before[METRIC] - 1 if before[METRIC] else 0.0
+        changes.append(
+            {
+                "benchmark": describe(key(result)),
+                "before_s": before[METRIC],
+                "after_s": result[METRIC],
+                "change": change,
+                "regression": change > threshold,
+            }
+        )
+    return changes
+
+
+def unmatched(baseline: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """Get the results of each run that have no counterpart in the other one."""
+    baseline_keys = {key(result) for result in baseline if METRIC in result}
+    current_keys = {key(result) for result in current if METRIC in result}
+    return {
+        "baseline": [describe(result_key) for result_key in sorted(baseline_keys - current_keys, key=str)],
+        "current": [describe(result_key) for result_key in sorted(current_keys - baseline_keys, key=str)],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline", type=str, help="Results of the reference run")
+    parser.add_argument("current", type=str, help="Results of the run to check")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    baseline, current = load(args.baseline), load(args.current)
+    changes = compare(baseline, current, args.threshold)
+    for change in changes:
+        flag = "REGRESSION" if change["regression"] else ""
+        print(
+            f"{change['benchmark']:<60} {change['before_s'] * 1000:>10.3f}ms {change['after_s'] * 1000:>10.3f}ms "
+            f"{change['change']:>+8.1%} {flag}"
+        )
+    for run, names in unmatched(baseline, current).items():
+        for name in names:
+            print(f"{name:<60} only in the {run} run")
+    return 1 if any(change["regression"] for change in changes) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
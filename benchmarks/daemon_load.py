@@ -0,0 +1,83 @@
+"""
+Stress the daemon, the read cache and the in-memory stores with thousands of simulated devices.
+
+Every poll reads all the devices through `Daemon.poll` with the cache enabled and hands the
+readings to a `MemoryStore` and a `Rollup`, like `pybattery serve` does. Simulated reads take
+`--latency` seconds, plus up to `--jitter`, and fail at `--failure-rate`.
+
+The stores preallocate every series they see (about 28KB in a default `MemoryStore` and 190KB in
+a default `Rollup`), so they are sized down here with `--history-size` and `--rollup-buckets` to
+keep thousands of devices (tens of thousands of series) in memory.
+
+    python -m benchmarks.daemon_load [--devices 100 1000 5000] [--polls N] [--workers N]
+"""
+import argparse
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import report, summarize
+from pybattery.api import Api
+from pybattery.daemon import Daemon
+from pybattery.models.config import Config, DeviceConfig
+from pybattery.simulation.backend import Simulation, SimulationSettings, scale_config
+from pybattery.storage.memory import MemoryStore
+from pybattery.storage.rollup import Rollup
+
+DEVICE_TYPES = ["renogy_rover", "dht11", "ds18b20"]
+
+
+def run(
+    devices: int,
+    polls: int,
+    workers: int,
+    settings: SimulationSettings,
+    history_size: int,
+    rollup_buckets: int,
+) -> Dict[str, Any]:
+    base = Config(devices={name: DeviceConfig(description=name, type=name) for name in DEVICE_TYPES})
+    config = scale_config(base, max(1, devices // len(DEVICE_TYPES)))
+    api = Api(config, cache=True, simulation=Simulation(settings, seed=0))
+    memory = MemoryStore(capacity=history_size)
+    rollup = Rollup(resolutions={60: rollup_buckets, 3600: rollup_buckets})
+    daemon = Daemon(api, max_workers=workers, sinks=[memory, rollup])
+    names = list(api.read_devices)
+
+    samples: List[float] = []
+    errors = 0
+    for _ in range(polls):
+        start = time.perf_counter()
+        readings = daemon.poll(names)
+        samples.append(time.perf_counter() - start)
+        errors += sum(1 for reading in readings.values() if isinstance(reading, dict) and "error" in reading)
+    return report(
+        "daemon_load",
+        devices=len(names),
+        workers=workers,
+        series=len(memory.series),
+        errors=errors,
+        readings_per_s=len(names) * polls / sum(samples),
+        **summarize(samples),
+    )
+
+
+def main(argv=None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--polls", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.001)
+    parser.add_argument("--jitter", type=float, default=0.001)
+    parser.add_argument("--failure-rate", type=float, default=0.01)
+    parser.add_argument("--history-size", type=int, default=360)
+    parser.add_argument("--rollup-buckets", type=int, default=60)
+    args = parser.parse_args(argv)
+
+    settings = SimulationSettings(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate)
+    return [
+        run(devices, args.polls, args.workers, settings, args.history_size, args.rollup_buckets)
+        for devices in args.devices
+    ]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Measure the read, write and output hot paths of the CLI with simulated devices.
+
+- `cold_start`: `pybattery read` of one device in a fresh interpreter, imports included
+- `config_load`: `Config.from_file`, parsing the YAML (`cache=off`) or from the config cache
+  (`cache=on`), as the number of configured devices grows
+- `api_construction`: `Api` (`_parse_devices`) with the real drivers
+- `api_read`: `Api.read` of every device, serially and with `--workers` threads
+- `output`: `OutputWriter` throughput for JSON and YAML
+
+Results are printed as JSON lines and, with `--output`, saved along with the commit so that two
+runs can be compared with `python -m benchmarks.compare`.
+
+    python -m benchmarks.hot_paths [--devices 1 10 100 1000] [--repeat N] [--output FILE]
+"""
+import argparse
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import yaml
+
+from benchmarks.common import ROOT, measure, report, save, summarize
+from pybattery.api import Api
+from pybattery.models.config import Config
+from pybattery.output_writer import OutputFormat, OutputWriter
+from pybattery.simulation.backend import Simulation, SimulationSettings
+
+# Device types whose drivers can be built without their hardware
+DEVICE_TYPES = ["renogy_rover", "dht11", "ds18b20"]
+
+COLD_START = """
+import sys
+from pybattery.main import main
+from pybattery.models.config import Config
+sys.argv = ["pybattery", "--simulate", "read", "-f", "json", "device-0"]
+main(Config.from_file({config_path!r}))
+"""
+
+
+def write_config(directory: str, devices: int) -> str:
+    """Write a config file with `devices` devices of the supported types and get its path."""
+    config = {
+        "devices": {
+            f"device-{index}": {
+                "description": f"Device {index}",
+                "type": DEVICE_TYPES[index % len(DEVICE_TYPES)],
+                "address": "/dev/ttyUSB0",
+                "port": index % 247 + 1,
+                "gpio": 4,
+                "interval": 10,
+            }
+            for index in range(devices)
+        }
+    }
+    path = os.path.join(directory, f"config-{devices}.yml")
+    with open(path, "w") as config_file:
+        yaml.safe_dump(config, config_file)
+    return path
+
+
+def cold_start(config_path: str, repeat: int) -> Dict[str, Any]:
+    code = COLD_START.format(config_path=config_path)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, check=True)
+        samples.append(time.perf_counter() - start)
+    return report("cold_start", **summarize(samples))
+
+
+def api_construction(config_path: str, devices: int, repeat: int) -> List[Dict[str, Any]]:
+    config = Config.from_file(config_path)
+    return [
+        *(
+            report(
+                "config_load",
+                cache="on" if cache else "off",
+                devices=devices,
+                **summarize(measure(lambda: Config.from_file(config_path, cache=cache), repeat)),
+            )
+            for cache in (False, True)
+        ),
+        report("api_construction", devices=devices, **summarize(measure(lambda: Api(config), repeat))),
+    ]
+
+
+def api_read(config_path: str, devices: int, repeat: int, workers: int, latency: float) -> List[Dict[str, Any]]:
+    api = Api(Config.from_file(config_path), simulation=Simulation(SimulationSettings(latency=latency), seed=0))
+    names = list(api.read_devices)
+    results = []
+    for mode, max_workers in (("serial", None), ("concurrent", workers)):
+        samples = measure(lambda: api.read(names, max_workers=max_workers), repeat)
+        results.append(
+            report("api_read", mode=mode, devices=devices, per_device_s=min(samples) / devices, **summarize(samples))
+        )
+    return results
+
+
+def output(config_path: str, devices: int, repeat: int) -> List[Dict[str, Any]]:
+    data = Api(Config.from_file(config_path), simulation=Simulation(seed=0)).read_all(
+        [f"device-{index}" for index in range(devices)]
+    )
+    results = []
+    for output_format in OutputFormat:
+        writer = OutputWriter(output_format)
+        buffer = io.StringIO()
+
+        def write():
+            buffer.seek(0)
+            buffer.truncate()
+            writer.write(data, fd=buffer)
+
+        samples = measure(write, repeat)
+        size = len(buffer.getvalue().encode())
+        results.append(
+            report(
+                "output",
+                format=output_format.value,
+                devices=devices,
+                bytes=size,
+                mb_per_s=size / min(samples) / 1e6,
+                **summarize(samples),
+            )
+        )
+    return results
+
+
+def main(argv=None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated read latency")
+    parser.add_argument("--output", type=str, help="Save the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ["PYBATTERY_CACHE_DIR"] = os.path.join(directory, "cache")  # also for the cold starts
+        config_paths = {devices: write_config(directory, devices) for devices in args.devices}
+        results.append(cold_start(config_paths[min(args.devices)], args.repeat))
+        for devices, config_path in config_paths.items():
+            results += api_construction(config_path, devices, args.repeat)
+            results += api_read(config_path, devices, args.repeat, args.workers, args.latency)
+            results += output(config_path, devices, args.repeat)
+    if args.output:
+        save(args.output, results)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Measure Modbus read throughput on a shared (simulated) serial bus.
+
+`per_read` opens, configures and closes the port for every read, as a driver without a
+connection pool would; `pooled` keeps the port open in a `ConnectionPool` and queues the reads
+of every device on the bus back to back. Several devices (slave addresses) share the bus and are
+read from concurrent threads.
+
+    python -m benchmarks.serial_bus [--devices N] [--reads N] [--latency SECONDS]
+"""
+import argparse
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+import minimalmodbus
+
+from benchmarks.common import report
+from pybattery.connections import ConnectionPool
+from pybattery.device_types.renogy_rover.registers import BLOCK
+from pybattery.device_types.renogy_rover.simulator import ModbusSlaveSimulator
+
+
+def per_read(port: str) -> Callable[[int], List[int]]:
+    def read(slave_address: int) -> List[int]:
+        instrument = minimalmodbus.Instrument(port, slave_address, close_port_after_each_call=True)
+        instrument.serial.baudrate = 9600
+        instrument.serial.timeout = 1.0
+        return instrument.read_registers(*BLOCK)
+
+    return read
+
+
+def pooled(port: str, pool: ConnectionPool) -> Callable[[int], List[int]]:
+    bus = pool.bus(port)
+    return lambda slave_address: bus.read_registers(slave_address, *BLOCK)
+
+
+def run(mode: str, read: Callable[[int], List[int]], devices: int, reads: int, lock: bool) -> Dict[str, Any]:
+    # Without a pool, reads of devices sharing the bus must be serialized by the caller.
+    bus_lock = threading.Lock()
+
+    def device_loop(slave_address: int):
+        for _ in range(reads):
+            if lock:
+                with bus_lock:
+                    read(slave_address)
+            else:
+                read(slave_address)
+
+    threads = [threading.Thread(target=device_loop, args=(address,)) for address in range(1, devices + 1)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return report(
+        "serial_bus",
+        mode=mode,
+        devices=devices,
+        reads=devices * reads,
+        seconds=elapsed,
+        reads_per_second=devices * reads / elapsed,
+    )
+
+
+def main(argv=None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--devices", type=int, default=4)
+    parser.add_argument("--reads", type=int, default=25)
+    parser.add_argument("--latency", type=float, default=0.002, help="Simulated response latency")
+    args = parser.parse_args(argv)
+
+    registers = {register: register & 0xFF for register in range(BLOCK[0], BLOCK[0] + BLOCK[1])}
+    with ModbusSlaveSimulator(registers, range(1, args.devices + 1), latency=args.latency) as simulator:
+        results = [run("per_read", per_read(simulator.port), args.devices, args.reads, lock=True)]
+        pool = ConnectionPool()
+        try:
+            results.append(run("pooled", pooled(simulator.port, pool), args.devices, args.reads, lock=False))
+        finally:
+            pool.close()
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Measure the cost of starting `pybattery read <device>` with a single configured device.
+
+`eager` reproduces the old behaviour of importing every driver module before building the `Api`;
+`lazy` is the current behaviour, where only the configured device type is imported. Each sample
+runs in a fresh interpreter. The lazy run fails if asyncio was imported: it is only needed by the
+async API, the HTTP server and the D-Bus service, and costs ~30ms on its own.
+
+    python -m benchmarks.startup [--repeat N]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from benchmarks.common import ROOT, report, summarize
+
+CODE = """
+import json, sys, time
+start = time.perf_counter()
+import pybattery.main
+from pybattery.api import Api
+from pybattery.device_types import list_device_types
+from pybattery.models.config import Config
+if {eager}:
+    registry = list_device_types()
+    for name in registry:
+        try:
+            registry[name]
+        except (KeyError, ImportError):
+            pass
+api = Api(Config.from_file({config_path!r}))
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "modules": len(sys.modules), "asyncio": "asyncio" in sys.modules}}))
+"""
+
+CONFIG = """
+devices:
+  thermo-exterior:
+    description: Exterior temperature sensor
+    type: ds18b20
+"""
+
+
+def run(mode: str, config_path: str, repeat: int) -> Dict[str, Any]:
+    code = CODE.format(eager=mode == "eager", config_path=config_path)
+    in_process: List[float] = []
+    wall: List[float] = []
+    modules = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        wall.append(time.perf_counter() - start)
+        sample = json.loads(output.strip().splitlines()[-1])
+        in_process.append(sample["seconds"])
+        modules = sample["modules"]
+        if mode == "lazy" and sample["asyncio"]:
+            raise RuntimeError("Starting pybattery imported asyncio")
+    return report(
+        "startup",
+        mode=mode,
+        modules=modules,
+        **summarize(in_process),
+        process_median_s=summarize(wall)["median_s"],
+    )
+
+
+def main(argv=None) -> List[Dict[str, Any]]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".yml", delete=False) as config_file:
+        config_file.write(CONFIG)
+    try:
+        return [run(mode, config_file.name, args.repeat) for mode in ("eager", "lazy")]
+    finally:
+        os.remove(config_file.name)
+
+
+if __name__ == "__main__":
+    main()
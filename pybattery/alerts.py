@@ -0,0 +1,181 @@
+import sys
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from pybattery.models.config import AlertConfig
+
+ACTIVE = "active"
+CLEARED = "cleared"
+CHANGED = "changed"
+DEFAULT_RATE_WINDOW = 300.0
+
+
+@dataclass
+class AlertEvent:
+    """A transition of an alert rule."""
+
+    rule: str
+    state: str  # ACTIVE, CLEARED or CHANGED
+    device: str
+    metric: str
+    value: float  # The value (or rate of change, per second) that caused the transition
+    timestamp: float
+    message: Optional[str] = None
+
+    def __str__(self) -> str:
+        return f"{self.rule} {self.state}: {self.message or f'{self.device} {self.metric}'} ({self.value:g})"
+
+
+class AlertRule:
+    """The configuration of a rule and the little state needed to evaluate it on one new value at a time."""
+
+    def __init__(self, name: str, config: AlertConfig):
+        if config.above is None and config.below is None and config.deadband is None:
+            raise ValueError(f"Alert '{name}' needs a threshold (above/below) or a deadband")
+        self.window = DEFAULT_RATE_WINDOW if config.window is None else config.window
+        if config.rate and self.window <= 0:
+            raise ValueError(f"Alert '{name}' needs a positive window to measure a rate over")
+        self.name = name
+        self.config = config
+        self.path = config.metric.split(".")
+        self.hysteresis = config.hysteresis or 0.0
+        self.active = False
+        self.value: Optional[float] = None  # last value (or rate) the conditions were checked against
+        self._samples: Deque[Tuple[float, float]] = deque()  # (timestamp, value) over the window, for rates
+        self._reported: Optional[float] = None  # last value a change was reported for, for deadbands
+
+    @property
+    def is_threshold(self) -> bool:
+        return self.config.above is not None or self.config.below is not None
+
+    def evaluate(self, timestamp: float, value: float) -> Optional[str]:
+        """Fold a new value into the rule and get the transition it caused, if any."""
+        if not self.is_threshold:
+            self.value = value
+            if self._reported is not None and abs(value - self._reported) < self.config.deadband:  # type: ignore
+                return None
+            self._reported = value
+            return CHANGED
+
+        if self.config.rate:
+            if (rate := self._rate(timestamp, value)) is None:
+                return None
+            value = rate
+        self.value = value
+
+        above, below = self.config.above, self.config.below
+        if not self.active and ((above is not None and value > above) or (below is not None and value < below)):
+            self.active = True
+            return ACTIVE
+        if self.active and (above is None or value < above - self.hysteresis) and (
+            below is None or value > below + self.hysteresis
+        ):
+            self.active = False
+            return CLEARED
+        return None
+
+    def _rate(self, timestamp: float, value: float) -> Optional[float]:
+        """
+        Get the rate of change between the last sample at least `window` seconds old and this one, or
+        None until the samples span the window. A sample that is not newer than the last one (the same
+        cached reading again) is skipped; an older one (the clock went back) starts over.
+        """
+        samples = self._samples
+        if samples and timestamp <= samples[-1][0]:
+            if timestamp == samples[-1][0]:
+                return None
+            samples.clear()
+        samples.append((timestamp, value))
+        while len(samples) > 1 and samples[1][0] <= timestamp - self.window:
+            samples.popleft()
+        first_timestamp, first_value = samples[0]
+        if timestamp - first_timestamp < self.window:
+            return None
+        return (value - first_value) / (timestamp - first_timestamp)
+
+    def value_of(self, reading: Any) -> Optional[float]:
+        """Get the metric of the rule from a device reading, or None if it is missing or not a number."""
+        for key in self.path:
+            if not isinstance(reading, dict) or key not in reading:
+                return None
+            reading = reading[key]
+        if isinstance(reading, (bool, int, float)):
+            return float(reading)
+        return None
+
+
+class AlertEngine:
+    """
+    Evaluate alert rules on readings as they come in and emit an `AlertEvent` for every transition.
+
+    Rules are indexed by device, so each batch of readings only costs the rules of the devices in
+    it, and every rule keeps little state: whether it is active and the last value, and for rate
+    rules the samples of their window. The daemon feeds it the readings of every poll (see
+    `Api.evaluate_alerts`); listeners are called with each event.
+    """
+
+    def __init__(self, rules: Optional[Dict[str, AlertConfig]] = None):
+        self._rules: Dict[str, List[AlertRule]] = {}
+        self._listeners: List[Callable[[AlertEvent], None]] = []
+        self._lock = threading.Lock()
+        self.reload(rules)
+
+    def reload(self, rules: Optional[Dict[str, AlertConfig]]) -> None:
+        """Replace the rules, keeping the state (active, last value) of those whose config did not change."""
+        current = {rule.name: rule for rule in self.rules}
+        indexed: Dict[str, List[AlertRule]] = {}
+        for name, config in (rules or {}).items():
+            rule = current[name] if name in current and current[name].config == config else AlertRule(name, config)
+            indexed.setdefault(config.device, []).append(rule)
+        with self._lock:
+            self._rules = indexed
+
+    @property
+    def rules(self) -> List[AlertRule]:
+        """Get every rule."""
+        return [rule for rules in self._rules.values() for rule in rules]
+
+    @property
+    def active(self) -> List[str]:
+        """Get the names of the threshold rules that are currently active."""
+        return [rule.name for rule in self.rules if rule.active]
+
+    def add_listener(self, listener: Callable[[AlertEvent], None]) -> None:
+        """Call `listener` with every future event."""
+        self._listeners.append(listener)
+
+    def evaluate(
+        self, timestamp: float, readings: Dict[str, Any], timestamps: Optional[Dict[str, float]] = None
+    ) -> List[AlertEvent]:
+        """
+        Evaluate the rules of the devices in `readings` and notify the listeners of the transitions.
+        The readings are stamped with `timestamp`, or with their own time in `timestamps`.
+        """
+        events = []
+        with self._lock:
+            for device_name, reading in readings.items():
+                sampled_at = timestamps.get(device_name, timestamp) if timestamps else timestamp
+                for rule in self._rules.get(device_name, ()):
+                    if (value := rule.value_of(reading)) is None:
+                        continue
+                    if state := rule.evaluate(sampled_at, value):
+                        events.append(
+                            AlertEvent(
+                                rule=rule.name,
+                                state=state,
+                                device=device_name,
+                                metric=rule.config.metric,
+                                value=rule.value,  # type: ignore
+                                timestamp=sampled_at,
+                                message=rule.config.message,
+                            )
+                        )
+        for event in events:
+            for listener in self._listeners:
+                try:
+                    listener(event)
+                except Exception as e:
+                    print(f"Alert listener failed: {e}", file=sys.stderr)
+        return events
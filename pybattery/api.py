@@ -1,13 +1,30 @@
+import dataclasses
 import json
 import sys
+import threading
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Set, Tuple, Union
 
 import yaml
 
+from pybattery.cache import CachedDevice
 from pybattery.device_types import list_device_types
-from pybattery.models.config import Config
-from pybattery.protocols import ReadableDeviceType, WritableDeviceType
+from pybattery.models.config import Config, DeviceConfig
+from pybattery.models.device import SerialDevice
+from pybattery.device_proxy import DeviceProxy, capabilities
+from pybattery.protocols import (
+    AsyncReadableDeviceType,
+    ReadableDeviceType,
+    WritableDeviceType,
+)
+from pybattery.workers import TaskTimeoutError, run_concurrently
+from pybattery.write_queue import WriteQueue
+
+if TYPE_CHECKING:
+    from pybattery.alerts import AlertEngine
+    from pybattery.connections import ConnectionPool
+    from pybattery.isolation import IsolatedDevice
+    from pybattery.simulation.backend import Simulation
 
 
 class ReadFormat(Enum):
@@ -18,10 +35,20 @@ class ReadFormat(Enum):
 
 
 class Api:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, cache: bool = False, simulation: Optional["Simulation"] = None):
         self._config = config
+        self._simulation = simulation
         self._device_types = None
-        self._read_devices, self._write_devices = self._parse_devices()
+        self._connections = None
+        self._alerts: Optional["AlertEngine"] = None
+        self._write_queues: Dict[str, WriteQueue] = {}
+        self._write_queues_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._cache = False
+        self._async_read_devices: Optional[Dict[str, AsyncReadableDeviceType]] = None
+        self._devices, self._read_devices, self._write_devices = self._parse_devices(config)
+        if cache:
+            self.enable_cache()
 
     @property
     def config(self) -> Config:
@@ -38,38 +65,319 @@ class Api:
         """Get the writable devices."""
         return self._write_devices
 
+    @property
+    def async_read_devices(self) -> Dict[str, AsyncReadableDeviceType]:
+        """
+        Get the readable devices with a coroutine `read()`: async drivers as they are, and the
+        others run in the loop's executor. When the cache is enabled, every device is read through
+        its `CachedDevice` in the executor, so that both paths share the readings and coalescing.
+        """
+        from pybattery.async_adapters import AsyncReader
+
+        with self._reload_lock:
+            if self._async_read_devices is None:
+                self._async_read_devices = {
+                    name: (
+                        self._devices[name]
+                        if self._devices[name].capabilities.async_read and not isinstance(device, CachedDevice)
+                        else AsyncReader(device)
+                    )
+                    for name, device in self._read_devices.items()
+                }
+            return self._async_read_devices
+
     @property
     def all_devices(self) -> Dict[str, Union[ReadableDeviceType, WritableDeviceType]]:
         """Get all devices."""
         return {**self._read_devices, **self._write_devices}
 
     @property
-    def device_types(self) -> Dict[str, type]:
-        """Get all device types."""
+    def simulation(self) -> Optional["Simulation"]:
+        """Get the simulation the devices are built by instead of their hardware drivers, if any."""
+        return self._simulation
+
+    @property
+    def connections(self) -> "ConnectionPool":
+        """Get the pool of serial connections shared by the devices, opened on first use."""
+        if self._connections is None:
+            from pybattery.connections import ConnectionPool
+
+            self._connections = ConnectionPool()
+        return self._connections
+
+    def close(self) -> None:
+        """
+        Send the writes still queued, close the device drivers (stopping the worker processes of
+        isolated devices) and close the serial connections held open for the devices.
+        """
+        with self._write_queues_lock:
+            write_queues, self._write_queues = list(self._write_queues.values()), {}
+        for write_queue in write_queues:
+            write_queue.close()
+        self._close_devices(self._devices)
+        if self._connections is not None:
+            self._connections.close()
+
+    @property
+    def alerts(self) -> "AlertEngine":
+        """Get the engine evaluating the alert rules of the config (see `evaluate_alerts`)."""
+        if self._alerts is None:
+            from pybattery.alerts import AlertEngine
+
+            self._alerts = AlertEngine(self._config.alerts)
+        return self._alerts
+
+    @property
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get the cache hit/miss statistics of every cached device."""
+        return {
+            name: dict(device.stats) for name, device in self._read_devices.items() if isinstance(device, CachedDevice)
+        }
+
+    def cache_ttl(self, device_name: str, config: Optional[Config] = None) -> float:
+        """
+        Get the number of seconds a reading of the device may be reused for: the `cache_ttl` entry of
+        its device type in the config, or else the device type's own `cache_ttl`.
+        """
+        config = config or self._config
+        device_type = config.devices[device_name].type
+        if (ttl := (config.cache_ttl or {}).get(device_type)) is not None:
+            return ttl
+        return getattr(self.device_type(device_type), "cache_ttl", 0.0)
+
+    def write_interval(self, device_name: str, config: Optional[Config] = None) -> float:
+        """
+        Get the minimum number of seconds between two writes to the device: the `write_interval` entry
+        of its device type in the config, or else the device type's own `write_interval`.
+        """
+        config = config or self._config
+        device_type = config.devices[device_name].type
+        if (interval := (config.write_interval or {}).get(device_type)) is not None:
+            return interval
+        return getattr(self.device_type(device_type), "write_interval", 0.0)
+
+    def isolated(self, device_name: str, config: Optional[Config] = None) -> bool:
+        """
+        Check whether the device runs in a worker process (see `IsolatedDevice`): the `isolated`
+        entry of its device type in the config, or else the device type's own `isolated`.
+        """
+        config = config or self._config
+        device_type = config.devices[device_name].type
+        if (isolated := (config.isolated or {}).get(device_type)) is not None:
+            return isolated
+        return getattr(self.device_type(device_type), "isolated", False)
+
+    @property
+    def isolation_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get the call, start and timeout counts of the worker process of every isolated device in use."""
+        return {name: dict(device.stats) for name, device in self._isolated_devices().items()}
+
+    def write_queue(self, device_name: str) -> WriteQueue:
+        """Get the queue writes to a device go through, creating it on first use."""
+        with self._write_queues_lock:
+            if device_name not in self._write_queues:
+                self._write_queues[device_name] = WriteQueue(
+                    self._write_devices[device_name], self.write_interval(device_name), name=device_name
+                )
+            return self._write_queues[device_name]
+
+    @property
+    def write_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get the queue depth, write counts and latencies of every device written to so far."""
+        with self._write_queues_lock:
+            write_queues = dict(self._write_queues)
+        return {name: {"depth": queue.depth, **queue.stats} for name, queue in write_queues.items()}
+
+    def enable_cache(self) -> None:
+        """
+        Wrap every readable device in a `CachedDevice` so that concurrent reads are coalesced and
+        readings are reused for the TTL given by `cache_ttl`. Devices added by `reload` are cached too.
+        """
+        with self._reload_lock:
+            self._cache = True
+            self._read_devices = {
+                name: device if isinstance(device, CachedDevice) else CachedDevice(device, ttl=self.cache_ttl(name))
+                for name, device in self._read_devices.items()
+            }
+            self._async_read_devices = None
+
+    def reload(self, config: Config) -> Dict[str, List[str]]:
+        """
+        Switch to a new configuration, rebuilding only the devices whose config changed, and get the
+        names of the devices `added`, `changed` and `removed`.
+
+        A device is kept as it is, with its cached reading, open connection and write queue, when
+        its `DeviceConfig` (apart from the polling `interval`) and the `cache_ttl`, `write_interval`
+        and `isolated` settings of its type are the same in both configs. The new devices are built first
+        and then swapped in all at once: a read that already looked its device up finishes on the
+        old instance, and no read ever sees a mix of the two configs. Pending writes to the devices
+        that were replaced are flushed to the old instances, which are then closed, and the serial
+        ports that no device uses anymore are released.
+        """
+        with self._reload_lock:
+            old_config = self._config
+            unchanged = {
+                name
+                for name, device_config in config.devices.items()
+                if (old_device_config := old_config.devices.get(name)) is not None
+                and dataclasses.replace(old_device_config, interval=None)
+                == dataclasses.replace(device_config, interval=None)
+                and all(
+                    (getattr(old_config, setting) or {}).get(device_config.type)
+                    == (getattr(config, setting) or {}).get(device_config.type)
+                    for setting in ("cache_ttl", "write_interval", "isolated")
+                )
+            }
+            kept = unchanged & set(self._devices)
+            devices, read_devices, write_devices = self._parse_devices(config, kept)
+            if self._cache:
+                read_devices = {
+                    name: device if name in kept else CachedDevice(device, ttl=self.cache_ttl(name, config))
+                    for name, device in read_devices.items()
+                }
+            if self._alerts is not None and config.alerts != old_config.alerts:
+                self._alerts.reload(config.alerts)
+            replaced = set(old_config.devices) - unchanged
+            old_devices = self._devices
+            self._config, self._devices = config, devices
+            self._read_devices, self._write_devices = read_devices, write_devices
+            self._async_read_devices = None
+
+        with self._write_queues_lock:
+            write_queues = [self._write_queues.pop(name) for name in replaced if name in self._write_queues]
+        for write_queue in write_queues:
+            write_queue.close()
+        self._close_devices({name: proxy for name, proxy in old_devices.items() if name in replaced})
+        self._release_connections()
+        return {
+            "added": sorted(set(config.devices) - set(old_config.devices)),
+            "changed": sorted(replaced & set(config.devices)),
+            "removed": sorted(set(old_config.devices) - set(config.devices)),
+        }
+
+    @property
+    def device_types(self) -> Mapping[str, type]:
+        """Get all device types, or the simulated device types when running a simulation."""
         if self._device_types is None:
-            self._device_types = list_device_types()
+            self._device_types = self._simulation.device_types if self._simulation else list_device_types()
         return self._device_types
 
+    def device_type(self, name: str) -> Optional[type]:
+        """Get a device type by name, or None if it does not exist or its driver cannot be imported."""
+        try:
+            return self.device_types.get(name)
+        except ImportError as e:
+            print(f"Device type '{name}' could not be loaded: {e}", file=sys.stderr)
+            return None
+
     def read(
         self,
         device_names: List[str],
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
     ) -> Optional[Dict[str, Any]]:
-        """Read component data."""
+        """
+        Read component data.
+
+        Devices are read one after the other unless `max_workers` or `timeout` is given, in which
+        case they are read concurrently (see `read_all`).
+        """
         unknown_devices = set(device_names) - set(self.read_devices.keys())
         if unknown_devices:
             print(f"Unknown devices: {', '.join(unknown_devices)}", file=sys.stderr)
             return None
 
-        output = {
-            device_name: device.read() for device_name in device_names if (device := self.read_devices.get(device_name))
-        }
+        output = self.read_all(device_names, max_workers=max_workers, timeout=timeout)
         if len(device_names) == 1:
             output = output.get(device_names[0])
         return output
 
-    def write(self, device: WritableDeviceType, value: str, **kwargs):
-        """Write component data."""
-        print(f"Writing {value} to {device}")
+    def read_all(
+        self,
+        device_names: List[str],
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Read component data and return it keyed by device name, skipping unknown devices.
+
+        When `max_workers` or `timeout` is set, devices are read on a pool of at most `max_workers`
+        threads (one per device by default). A device that fails or takes longer than `timeout`
+        seconds is reported as `{"error": "..."}` instead of failing the whole batch.
+        """
+        read_devices = self.read_devices  # the same devices for the whole batch, even if reloaded meanwhile
+        devices = {device_name: device for device_name in device_names if (device := read_devices.get(device_name))}
+        if max_workers is None and timeout is None:
+            return {device_name: device.read() for device_name, device in devices.items()}
+
+        outcomes = run_concurrently(
+            {device_name: device.read for device_name, device in devices.items()},
+            max_workers=max_workers or len(devices) or 1,
+            timeout=timeout,
+        )
+        output = {}
+        for device_name, outcome in outcomes.items():
+            if isinstance(outcome, Exception):
+                print(f"Failed to read device '{device_name}': {outcome}", file=sys.stderr)
+                outcome = {"error": f"{type(outcome).__name__}: {outcome}"}
+            output[device_name] = outcome
+        return output
+
+    async def aread(self, device_names: List[str], timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Read component data without blocking the running event loop (see `aread_all`)."""
+        unknown_devices = set(device_names) - set(self.read_devices.keys())
+        if unknown_devices:
+            print(f"Unknown devices: {', '.join(unknown_devices)}", file=sys.stderr)
+            return None
+
+        output = await self.aread_all(device_names, timeout=timeout)
+        if len(device_names) == 1:
+            output = output.get(device_names[0])  # type: ignore
+        return output
+
+    async def aread_all(self, device_names: List[str], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Read component data concurrently on the running event loop and return it keyed by device
+        name, skipping unknown devices. Async drivers are awaited directly and the others run in
+        the loop's executor. A device that fails or takes longer than `timeout` seconds is reported
+        as `{"error": "..."}` instead of failing the whole batch.
+        """
+        import asyncio
+
+        async_read_devices = self.async_read_devices
+        devices = {
+            device_name: device for device_name in device_names if (device := async_read_devices.get(device_name))
+        }
+
+        async def read(device_name: str, device: AsyncReadableDeviceType) -> Any:
+            try:
+                return await asyncio.wait_for(device.read(), timeout)
+            except asyncio.TimeoutError:
+                raise TaskTimeoutError(device_name, timeout)  # type: ignore
+
+        outcomes = await asyncio.gather(*(read(*item) for item in devices.items()), return_exceptions=True)
+        output = {}
+        for device_name, outcome in zip(devices, outcomes):
+            if isinstance(outcome, Exception):
+                print(f"Failed to read device '{device_name}': {outcome}", file=sys.stderr)
+                outcome = {"error": f"{type(outcome).__name__}: {outcome}"}
+            output[device_name] = outcome
+        return output
+
+    async def awrite(self, device_name: str, value: Any) -> None:
+        """Write a value to a device through its write queue without blocking the running event loop."""
+        await self.write_queue(device_name).submit(value).wait()
+
+    def write(self, device_name: str, value: Any, wait: bool = True) -> None:
+        """
+        Write a value to a device through its write queue (see `WriteQueue`), waiting until it (or
+        a newer value submitted meanwhile) was written unless `wait` is False.
+        """
+        if device_name not in self._write_devices:
+            raise KeyError(f"Device '{device_name}' not found")
+        pending = self.write_queue(device_name).submit(value)
+        if wait:
+            pending.result()
 
     def list_gpio(self, **kwargs):
         """List all available GPIO pins on the board."""
@@ -97,19 +405,124 @@ class Api:
         except (ImportError, NotImplementedError):
             print("Board module not available. GPIO pins cannot be listed.")
 
-    def _parse_devices(self) -> Tuple[Dict[str, ReadableDeviceType], Dict[str, WritableDeviceType]]:
-        """Parse devices from the configuration."""
+    def _parse_devices(
+        self, config: Config, kept: Set[str] = frozenset()  # type: ignore
+    ) -> Tuple[Dict[str, DeviceProxy], Dict[str, ReadableDeviceType], Dict[str, WritableDeviceType]]:
+        """
+        Parse devices from the configuration, reusing the current proxies (and their wrappers) of the
+        devices in `kept`. Get the proxies, the readable devices and the writable devices.
+
+        No driver is built here (see `DeviceProxy`): the devices are classified by their type, so
+        the cost is one import per device type rather than one driver per device.
+        """
         all_devices = {
-            name: device_type(device_config)
-            for name, device_config in self._config.devices.items()
-            if (device_type := self.device_types.get(device_config.type))
-            and isinstance(device_type, (ReadableDeviceType, WritableDeviceType))
+            name: device
+            for name, device_config in config.devices.items()
+            if (device := self._devices[name] if name in kept else self._create_proxy(name, config)) is not None
         }
-        if unknown_devices := set(self.config.devices.keys()) - set(all_devices.keys()):
+        if unknown_devices := set(config.devices.keys()) - set(all_devices.keys()):
             print(f"Unknown devices found in config: {', '.join(unknown_devices)}", file=sys.stderr)
             print("Devices were not recognized as either a readable or writable device.", file=sys.stderr)
 
-        read_devices = {name: device for name, device in all_devices.items() if isinstance(device, ReadableDeviceType)}
-        write_devices = {name: device for name, device in all_devices.items() if isinstance(device, WritableDeviceType)}
+        # Async drivers are given a blocking facade; `async_read_devices` does the opposite.
+        # The adapters (and asyncio) are only imported when there is an async driver, to keep startup fast.
+        if any(device.capabilities.async_read or device.capabilities.async_write for device in all_devices.values()):
+            from pybattery.async_adapters import SyncReader, SyncWriter
+        read_devices = {
+            name: SyncReader(device) if device.capabilities.async_read else device
+            for name, device in all_devices.items()
+            if device.capabilities.readable
+        }
+        write_devices = {
+            name: SyncWriter(device) if device.capabilities.async_write else device
+            for name, device in all_devices.items()
+            if device.capabilities.writable
+        }
+        # The devices kept by `reload` keep their wrappers too, and with them their cached readings
+        read_devices.update((name, self._read_devices[name]) for name in kept if name in read_devices)
+        write_devices.update((name, self._write_devices[name]) for name in kept if name in write_devices)
+        return all_devices, read_devices, write_devices  # type: ignore
+
+    def _isolated_devices(self) -> Dict[str, "IsolatedDevice"]:
+        """Get the isolated devices whose driver has been built."""
+        from pybattery.isolation import IsolatedDevice
+
+        return {
+            name: proxy.device
+            for name, proxy in self._devices.items()
+            if proxy.built and isinstance(proxy.device, IsolatedDevice)
+        }
+
+    @staticmethod
+    def _close_devices(devices: Dict[str, DeviceProxy]) -> None:
+        """Release the resources (worker process, GPIO pins, ...) of the built drivers that have a `close` method."""
+        for name, proxy in devices.items():
+            close = getattr(proxy.device, "close", None) if proxy.built else None
+            if close is None:
+                continue
+            try:
+                close()
+            except Exception as e:
+                print(f"Failed to close device '{name}': {e}", file=sys.stderr)
+
+    def _release_connections(self) -> None:
+        """Close the serial connections that none of the current devices use anymore."""
+        if self._connections is None:
+            return
+        ports = {
+            proxy.device.serial_port
+            for proxy in self._devices.values()
+            if proxy.built and isinstance(proxy.device, SerialDevice)
+        }
+        for port in set(self._connections.buses) - ports:
+            self._connections.release(port)
+
+    def evaluate_alerts(self, timestamp: float, readings: Dict[str, Any]) -> None:
+        """
+        Evaluate the alert rules on the readings of a poll taken at `timestamp`. A reading served
+        from the cache is stamped with the time it was read from the device instead, so that rules
+        measuring a rate skip the readings they have already seen.
+        """
+        if not self._config.alerts:
+            return
+        read_devices = self.read_devices
+        read_times = {
+            device_name: device.read_time
+            for device_name in readings
+            if isinstance(device := read_devices.get(device_name), CachedDevice) and device.read_time is not None
+        }
+        self.alerts.evaluate(timestamp, readings, read_times)
+
+    def _create_proxy(self, name: str, config: Config) -> Optional[DeviceProxy]:
+        """Get the proxy of a configured device, or None if its type is unknown or not a device."""
+        device_config = config.devices[name]
+        if self._simulation is not None:
+            device_type = self._simulation.device_type(name, device_config)
+        else:
+            device_type = self.device_type(device_config.type)
+        if device_type is None:
+            return None
+        device_capabilities = capabilities(device_type)
+        if not (device_capabilities.readable or device_capabilities.writable):
+            return None
+        # Simulated devices do not bit-bang anything and async drivers do not block: neither is isolated
+        isolated = self._simulation is None and not device_capabilities.async_read and self.isolated(name, config)
+        return DeviceProxy(
+            device_config, lambda: self._create_device(name, device_config, isolated), device_capabilities
+        )
+
+    def _create_device(
+        self, name: str, device_config: DeviceConfig, isolated: bool = False
+    ) -> Union[ReadableDeviceType, WritableDeviceType]:
+        """Build the driver of a configured device, in a worker process if `isolated`."""
+        if self._simulation is not None:
+            device = self._simulation.create(name, device_config)
+        elif not isolated:
+            device = self.device_types[device_config.type](device_config)
+        else:
+            from pybattery.isolation import IsolatedDevice
 
-        return read_devices, write_devices
+            device = IsolatedDevice(self.device_types[device_config.type], device_config, name=name)
+        if isinstance(device, SerialDevice):
+            device.connections = self.connections
+        return device  # type: ignore
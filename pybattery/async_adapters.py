@@ -0,0 +1,107 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Dict, Optional, TypeVar, Union
+
+from pybattery.protocols import (
+    AsyncReadableDeviceType,
+    AsyncWritableDeviceType,
+    ReadableDeviceType,
+    WritableDeviceType,
+)
+
+T = TypeVar("T")
+
+
+class EventLoopThread:
+    """An event loop running in a background thread, on which synchronous code can run coroutines."""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """Get the loop, starting it on first use."""
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="pybattery-loop", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def run(self, coroutine: Awaitable[T]) -> T:
+        """Run a coroutine on the loop and wait for its result."""
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Cannot wait for a coroutine on the thread of the loop running it")
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()  # type: ignore
+
+    def stop(self) -> None:
+        with self._lock:
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+        if loop and thread:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+
+# Shared by every synchronous facade of an asynchronous device
+event_loop = EventLoopThread()
+
+
+class SyncDevice:
+    """
+    Give an asynchronous device a blocking `read()`/`write()`, by running its coroutines on the
+    shared background `event_loop`. Many of these can wait at once without holding up each other.
+    """
+
+    def __init__(self, device: Union[AsyncReadableDeviceType, AsyncWritableDeviceType]):
+        self._device = device
+
+    @property
+    def device(self) -> Union[AsyncReadableDeviceType, AsyncWritableDeviceType]:
+        """Get the wrapped device."""
+        return self._device
+
+    @property
+    def description(self) -> str:
+        """Get the device description."""
+        return self._device.description
+
+
+class SyncReader(SyncDevice):
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Read the component's value."""
+        return event_loop.run(self._device.read())  # type: ignore
+
+
+class SyncWriter(SyncDevice):
+    def write(self, value: Any) -> None:
+        """Write a value to the component."""
+        event_loop.run(self._device.write(value))  # type: ignore
+
+
+class AsyncDevice:
+    """
+    Give a synchronous device a coroutine `read()`, by running its blocking `read()` in the default
+    executor of the running loop.
+    """
+
+    def __init__(self, device: ReadableDeviceType):
+        self._device = device
+
+    @property
+    def device(self) -> ReadableDeviceType:
+        """Get the wrapped device."""
+        return self._device
+
+    @property
+    def description(self) -> str:
+        """Get the device description."""
+        return self._device.description
+
+
+class AsyncReader(AsyncDevice):
+    async def read(self) -> Optional[Dict[str, Any]]:
+        """Read the component's value."""
+        return await asyncio.get_running_loop().run_in_executor(None, self._device.read)  # type: ignore
@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from pybattery.protocols import ReadableDeviceType
+from pybattery.workers import PendingResult
+
+
+class CachedDevice:
+    """
+    Wrap a readable device so that its readings are reused for `ttl` seconds.
+
+    Concurrent `read()` calls made while a hardware read is in flight do not start their own:
+    they wait for, and share, the result of the read already in progress. Hits, misses and
+    coalesced reads are counted in `stats`.
+    """
+
+    def __init__(self, device: ReadableDeviceType, ttl: float = 0.0):
+        self._device = device
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._value: Any = None
+        self._read_at: Optional[float] = None
+        self._read_time: Optional[float] = None
+        self._in_flight: Optional[PendingResult] = None
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    @property
+    def device(self) -> ReadableDeviceType:
+        """Get the wrapped device."""
+        return self._device
+
+    @property
+    def description(self) -> str:
+        """Get the device description."""
+        return self._device.description
+
+    @property
+    def ttl(self) -> float:
+        """Get the number of seconds a reading is reused for."""
+        return self._ttl
+
+    @property
+    def read_time(self) -> Optional[float]:
+        """Get when (seconds since the epoch) the cached reading was read from the device."""
+        return self._read_time
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Return the cached reading if still fresh, otherwise read (or join the read in flight)."""
+        with self._lock:
+            if self._read_at is not None and time.monotonic() - self._read_at < self._ttl:
+                self.stats["hits"] += 1
+                return self._value
+            if self._in_flight is not None:
+                self.stats["coalesced"] += 1
+                in_flight = self._in_flight
+                leader = False
+            else:
+                self.stats["misses"] += 1
+                in_flight = self._in_flight = PendingResult()
+                leader = True
+
+        if not leader:
+            return in_flight.result()
+
+        try:
+            value = self._device.read()
+        except BaseException as e:  # KeyboardInterrupt too, or the readers waiting on this read would hang
+            in_flight.set_error(e if isinstance(e, Exception) else RuntimeError(f"Read interrupted by {e!r}"))
+            raise
+        else:
+            with self._lock:
+                self._value = value
+                self._read_at = time.monotonic()
+                self._read_time = time.time()
+            in_flight.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._in_flight = None
+
+    def invalidate(self) -> None:
+        """Forget the cached reading so the next `read()` goes to the device."""
+        with self._lock:
+            self._read_at = None
@@ -0,0 +1,151 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Optional, Tuple
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len; followed by `len` bytes of name
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+
+def load_inotify() -> Optional[ctypes.CDLL]:
+    """Get the C library if it provides inotify (Linux), else None."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") and hasattr(libc, "inotify_add_watch") else None
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """Get what tells whether a file changed (inode, size, mtime), or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+class ConfigWatcher:
+    """
+    Call `on_change` from a background thread whenever the file at `path` changes.
+
+    On Linux the file's directory is watched with inotify, so that editors that save by renaming a
+    new file over the old one are noticed too; elsewhere, or when inotify is not available, the
+    file's inode, size and mtime are polled every `poll_interval` seconds. Changes less than
+    `debounce` seconds apart are reported once, after the last one, so that a file still being
+    written is not loaded, and nothing is reported while the file is missing.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        on_change: Callable[[], None],
+        poll_interval: float = 2.0,
+        debounce: float = 0.2,
+        use_inotify: bool = True,
+    ):
+        self._path = os.path.abspath(path)
+        self._on_change = on_change
+        self._poll_interval = poll_interval
+        self._debounce = debounce
+        self._libc = load_inotify() if use_inotify else None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._signature = file_signature(self._path)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def uses_inotify(self) -> bool:
+        """Check whether changes are watched with inotify rather than by polling."""
+        return self._libc is not None
+
+    def start(self) -> None:
+        """Start watching in a daemon thread; changes made once this returns are reported."""
+        self._stop.clear()
+        fd = self._open_inotify() if self._libc is not None else None
+        if fd is None:
+            self._libc = None  # out of inotify watches, or the directory is not watchable: poll
+        self._thread = threading.Thread(target=self._run, args=(fd,), name="pybattery-config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, fd: Optional[int]) -> None:
+        if fd is not None:
+            try:
+                self._watch_inotify(fd)
+            finally:
+                os.close(fd)
+        else:
+            self._watch_polling()
+
+    def _open_inotify(self) -> Optional[int]:
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)  # type: ignore
+        if fd < 0:
+            return None
+        if self._libc.inotify_add_watch(fd, os.path.dirname(self._path).encode(), WATCH_MASK) < 0:  # type: ignore
+            os.close(fd)
+            return None
+        return fd
+
+    def _watch_inotify(self, fd: int) -> None:
+        name = os.path.basename(self._path)
+        changed_at: Optional[float] = None
+        while not self._stop.is_set():
+            timeout = 0.5 if changed_at is None else max(0.0, changed_at + self._debounce - time.monotonic())
+            if select.select([fd], [], [], min(timeout, 0.5))[0]:
+                if name in self._event_names(os.read(fd, 4096)):
+                    changed_at = time.monotonic()
+            if changed_at is not None and time.monotonic() - changed_at >= self._debounce:
+                changed_at = None
+                self._check()
+
+    def _watch_polling(self) -> None:
+        while not self._stop.wait(self._poll_interval):
+            if file_signature(self._path) != self._signature:
+                self._stop.wait(self._debounce)
+                self._check()
+
+    def _check(self) -> None:
+        """Report a change if the file exists and is not the one last reported."""
+        signature = file_signature(self._path)
+        if signature is None or signature == self._signature:
+            return
+        self._signature = signature
+        try:
+            self._on_change()
+        except Exception as e:
+            print(f"Config change handler failed: {e}", file=sys.stderr)
+
+    @staticmethod
+    def _event_names(data: bytes) -> set:
+        names = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            names.add(data[offset : offset + length].rstrip(b"\0").decode(errors="replace"))
+            offset += length
+        return names
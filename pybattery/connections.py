@@ -0,0 +1,170 @@
+import queue
+import sys
+import termios
+import threading
+import time
+from typing import Callable, Dict, List, Optional, TypeVar
+
+import minimalmodbus
+import serial
+
+from pybattery.workers import PendingResult
+
+T = TypeVar("T")
+
+# What a port that went away (e.g. a USB adapter reset) fails with
+PORT_ERRORS = (serial.SerialException, OSError, termios.error)
+
+DEFAULT_BAUDRATE = 9600
+DEFAULT_TIMEOUT = 1.0
+DEFAULT_RECONNECT_DELAY = 0.5
+MAX_RECONNECT_DELAY = 30.0
+
+
+class SerialBus:
+    """
+    A serial port kept open and shared by every Modbus device on it.
+
+    Requests from any thread are put on a queue and executed back to back by a single worker
+    thread, so only one transaction is ever on the wire and no time is lost between them. When
+    the port fails (e.g. the USB adapter was reset), it is closed and reopened with exponential
+    backoff; requests made while waiting for the next attempt fail fast with `ConnectionError`.
+    """
+
+    def __init__(
+        self,
+        port: str,
+        baudrate: int = DEFAULT_BAUDRATE,
+        timeout: float = DEFAULT_TIMEOUT,
+        reconnect_delay: float = DEFAULT_RECONNECT_DELAY,
+        max_reconnect_delay: float = MAX_RECONNECT_DELAY,
+    ):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self._reconnect_delay = reconnect_delay
+        self._max_reconnect_delay = max_reconnect_delay
+        self._next_delay = reconnect_delay
+        self._retry_at: Optional[float] = None
+        self._instruments: Dict[int, minimalmodbus.Instrument] = {}
+        self._requests: "queue.Queue" = queue.Queue()
+        self.stats: Dict[str, float] = {"requests": 0, "errors": 0, "reconnects": 0, "busy_seconds": 0.0}
+        self._thread = threading.Thread(target=self._run, name=f"pybattery-bus-{port}", daemon=True)
+        self._thread.start()
+
+    @property
+    def queue_depth(self) -> int:
+        """Get the number of requests waiting for the bus."""
+        return self._requests.qsize()
+
+    def execute(self, request: Callable[[], T]) -> T:
+        """Run `request` on the bus worker once all the requests queued before it are done."""
+        return self._submit(request).result()
+
+    async def execute_async(self, request: Callable[[], T]) -> T:
+        """Like `execute`, but wait for the result without blocking the running event loop."""
+        return await self._submit(request).wait()
+
+    def read_registers(self, slave_address: int, start: int, count: int) -> List[int]:
+        """Read `count` holding registers from a device on the bus in one request."""
+        return self.execute(lambda: self._instrument(slave_address).read_registers(start, count))
+
+    async def read_registers_async(self, slave_address: int, start: int, count: int) -> List[int]:
+        """Like `read_registers`, but wait for the registers without blocking the running event loop."""
+        return await self.execute_async(lambda: self._instrument(slave_address).read_registers(start, count))
+
+    def _submit(self, request: Callable[[], T]) -> PendingResult:
+        pending = PendingResult()
+        self._requests.put((request, pending))
+        return pending
+
+    def close(self) -> None:
+        """Stop the worker and close the port."""
+        self._requests.put(None)
+        self._thread.join()
+        for instrument in self._instruments.values():
+            instrument.serial.close()
+
+    def _run(self) -> None:
+        while (item := self._requests.get()) is not None:
+            request, pending = item
+            started = time.monotonic()
+            try:
+                pending.set_result(self._attempt(request))
+            except Exception as e:
+                self.stats["errors"] += 1
+                pending.set_error(e)
+            finally:
+                self.stats["requests"] += 1
+                self.stats["busy_seconds"] += time.monotonic() - started
+
+    def _attempt(self, request: Callable[[], T]) -> T:
+        if self._retry_at is not None:
+            if (wait := self._retry_at - time.monotonic()) > 0:
+                raise ConnectionError(f"{self.port} is disconnected, reconnecting in {wait:.1f}s")
+            self._reconnect()
+        try:
+            return request()
+        except minimalmodbus.ModbusException:
+            raise  # the port is fine, the device did not answer properly
+        except PORT_ERRORS as e:
+            print(f"Serial port {self.port} failed, reconnecting: {e}", file=sys.stderr)
+            self._reconnect()  # right away once, then with backoff
+            return request()
+
+    def _reconnect(self) -> None:
+        self.stats["reconnects"] += 1
+        try:
+            for instrument in self._instruments.values():
+                instrument.serial.close()
+                instrument.serial.open()
+        except PORT_ERRORS:
+            self._retry_at = time.monotonic() + self._next_delay
+            self._next_delay = min(self._next_delay * 2, self._max_reconnect_delay)
+            raise
+        self._retry_at = None
+        self._next_delay = self._reconnect_delay
+
+    def _instrument(self, slave_address: int) -> minimalmodbus.Instrument:
+        if slave_address not in self._instruments:
+            # minimalmodbus shares one serial.Serial between all the instruments of a port
+            instrument = minimalmodbus.Instrument(self.port, slave_address)
+            instrument.serial.baudrate = self.baudrate
+            instrument.serial.timeout = self.timeout
+            self._instruments[slave_address] = instrument
+        return self._instruments[slave_address]
+
+
+class ConnectionPool:
+    """Keep one `SerialBus` per serial port open for as long as the pool lives."""
+
+    def __init__(self):
+        self._buses: Dict[str, SerialBus] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def buses(self) -> Dict[str, SerialBus]:
+        """Get the open buses by port."""
+        with self._lock:
+            return dict(self._buses)
+
+    def bus(self, port: str, **settings) -> SerialBus:
+        """Get the bus of a serial port, opening it with `settings` the first time."""
+        with self._lock:
+            if port not in self._buses:
+                self._buses[port] = SerialBus(port, **settings)
+            return self._buses[port]
+
+    def release(self, port: str) -> None:
+        """Close the bus of a serial port, if it is open; it is opened again by the next `bus` call."""
+        with self._lock:
+            bus = self._buses.pop(port, None)
+        if bus is not None:
+            bus.close()
+
+    def close(self) -> None:
+        """Close every bus."""
+        with self._lock:
+            buses, self._buses = list(self._buses.values()), {}
+        for bus in buses:
+            bus.close()
@@ -0,0 +1,138 @@
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from pybattery.api import Api
+from pybattery.models.config import Config
+from pybattery.protocols import ReadingSink
+from pybattery.scheduler import Scheduler
+
+DEFAULT_INTERVAL = 10.0
+
+
+class Daemon:
+    """
+    Poll every readable device on its own interval and hand the readings to a set of sinks.
+
+    The daemon owns a single `Api` for its whole lifetime so the configuration is parsed and the
+    devices are built only once. Each device is polled every `DeviceConfig.interval` seconds
+    (`default_interval` when unset); devices that are due at the same tick are read together.
+    A new configuration handed to `request_reload` is applied between two polls (see `reload`).
+    """
+
+    def __init__(
+        self,
+        api: Api,
+        default_interval: float = DEFAULT_INTERVAL,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        sinks: Optional[List[ReadingSink]] = None,
+    ):
+        self._api = api
+        self._default_interval = default_interval
+        self._max_workers = max_workers
+        self._timeout = timeout
+        self._sinks: List[ReadingSink] = list(sinks or [])
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._pending_config: Optional[Config] = None
+        self._latest: Dict[str, Any] = {}
+        self._latest_timestamps: Dict[str, float] = {}
+        self.scheduler = Scheduler()
+        for name in api.read_devices:
+            self.scheduler.add(name, self.interval(name))
+
+    @property
+    def api(self) -> Api:
+        """Get the API used to talk to the devices."""
+        return self._api
+
+    @property
+    def latest(self) -> Dict[str, Any]:
+        """Get the most recent reading of every device that has been polled."""
+        return dict(self._latest)
+
+    @property
+    def latest_timestamps(self) -> Dict[str, float]:
+        """Get the time (seconds since the epoch) each device was last polled."""
+        return dict(self._latest_timestamps)
+
+    def interval(self, device_name: str) -> float:
+        """Get the polling interval of a device."""
+        return self._api.config.devices[device_name].interval or self._default_interval
+
+    def add_sink(self, sink: ReadingSink) -> None:
+        """Send every future poll result to `sink`."""
+        self._sinks.append(sink)
+
+    def poll(self, device_names: List[str]) -> Dict[str, Any]:
+        """Read the given devices now, update the latest state and notify the sinks."""
+        timestamp = time.time()
+        readings = self._api.read_all(device_names, max_workers=self._max_workers, timeout=self._timeout)
+        self._latest.update(readings)
+        self._latest_timestamps.update((name, timestamp) for name in readings)
+        self._api.evaluate_alerts(timestamp, readings)
+        for sink in self._sinks:
+            try:
+                sink.record(timestamp, readings)
+            except Exception as e:
+                print(f"Sink {sink.__class__.__name__} failed: {e}", file=sys.stderr)
+        return readings
+
+    def reload(self, config: Config) -> Dict[str, List[str]]:
+        """
+        Switch the API to a new configuration (see `Api.reload`) and reschedule the devices that were
+        added or whose interval changed. The devices that were removed are forgotten.
+        """
+        changes = self._api.reload(config)
+        jobs = self.scheduler.jobs
+        for name in jobs:
+            if name not in self._api.read_devices:
+                self.scheduler.remove(name)
+                self._latest.pop(name, None)
+                self._latest_timestamps.pop(name, None)
+        for name in self._api.read_devices:
+            if jobs.get(name) != self.interval(name):
+                self.scheduler.add(name, self.interval(name))
+        return changes
+
+    def request_reload(self, config: Config) -> None:
+        """Have `run` apply a new configuration before its next poll; safe to call from any thread."""
+        self._pending_config = config
+        self._wake.set()
+
+    def run(self) -> None:
+        """Poll devices until `stop` is called."""
+        self._stop.clear()
+        while not self._stop.is_set():
+            if (config := self._pending_config) is not None:
+                self._pending_config = None
+                self._apply_reload(config)
+            if due := self.scheduler.due():
+                self.poll(due)
+            deadline = self.scheduler.next_deadline()
+            self._wake.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            self._wake.clear()
+
+    def stop(self) -> None:
+        """Ask `run` to return after the current poll."""
+        self._stop.set()
+        self._wake.set()
+
+    def _apply_reload(self, config: Config) -> None:
+        try:
+            changes = self.reload(config)
+        except Exception as e:
+            print(f"Failed to reload the config: {e}", file=sys.stderr)
+            return
+        summary = "; ".join(f"{change} {', '.join(names)}" for change, names in changes.items() if names)
+        print(f"Config reloaded: {summary or 'no device changed'}", file=sys.stderr)
+
+
+class LogSink:
+    """Print every poll result to stderr."""
+
+    def record(self, timestamp: float, readings: Dict[str, Any]) -> None:
+        for device_name, reading in readings.items():
+            print(f"{timestamp:.3f} {device_name}: {reading}", file=sys.stderr)
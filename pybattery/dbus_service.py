@@ -0,0 +1,139 @@
+import json
+import threading
+from typing import Any, Callable, Dict, Optional
+
+import dbus
+import dbus.bus
+import dbus.service
+from dbus.mainloop.glib import DBusGMainLoop, threads_init
+from gi.repository import GLib
+
+from pybattery.daemon import Daemon
+
+BUS_NAME = "in.sebmart.pybattery"
+OBJECT_PATH = "/in/sebmart/pybattery"
+INTERFACE = "in.sebmart.pybattery"
+
+
+class UnknownDeviceError(dbus.exceptions.DBusException):
+    _dbus_error_name = f"{INTERFACE}.UnknownDevice"
+
+
+class NoReadingError(dbus.exceptions.DBusException):
+    _dbus_error_name = f"{INTERFACE}.NoReading"
+
+
+class DbusService(dbus.service.Object):
+    """
+    Expose the daemon's devices on D-Bus as `in.sebmart.pybattery` (see `dbus/`).
+
+    Readings are returned as JSON strings and come from the daemon's latest poll, so callers never
+    trigger hardware reads on the bus thread; a device not polled yet fails with `NoReading`. The
+    service is also a `ReadingSink`: whenever a poll changes a device's reading, a `ReadingChanged`
+    signal is emitted so other processes can subscribe instead of polling.
+    """
+
+    def __init__(self, daemon: Daemon, bus: dbus.bus.BusConnection):
+        self._daemon = daemon
+        self._bus_name: Optional[dbus.service.BusName] = dbus.service.BusName(BUS_NAME, bus)
+        self._previous: Dict[str, str] = {}
+        super().__init__(self._bus_name, OBJECT_PATH)
+
+    @dbus.service.method(INTERFACE, in_signature="", out_signature="a{ss}")
+    def List(self) -> Dict[str, str]:
+        """List every device with its description."""
+        return {name: device.description for name, device in self._daemon.api.all_devices.items()}
+
+    @dbus.service.method(INTERFACE, in_signature="s", out_signature="s")
+    def Read(self, device_name: str) -> str:
+        """Get the latest reading of a device as JSON."""
+        return json.dumps(self._read(device_name))
+
+    @dbus.service.method(INTERFACE, in_signature="i", out_signature="s")
+    def ReadPin(self, pin: int) -> str:
+        """Get the latest reading of the device wired to a GPIO pin as JSON."""
+        for name, device_config in self._daemon.api.config.devices.items():
+            gpio = device_config.args.get("gpio")
+            if isinstance(gpio, dict):
+                gpio = list(gpio.values())
+            if pin in (gpio if isinstance(gpio, list) else [gpio]) and name in self._daemon.api.read_devices:
+                return json.dumps(self._read(name))
+        raise UnknownDeviceError(f"No readable device on GPIO {pin}")
+
+    @dbus.service.method(INTERFACE, in_signature="ss", out_signature="", async_callbacks=("reply", "error"))
+    def Write(
+        self, device_name: str, value: str, reply: Callable[[], None], error: Callable[[Exception], None]
+    ) -> None:
+        """
+        Write a value to a device, replying once it was written. The write is queued (see
+        `WriteQueue`) and waited for off the main loop, so other calls and signals are not held up.
+        """
+        if device_name not in self._daemon.api.write_devices:
+            raise UnknownDeviceError(f"Device '{device_name}' not found")
+        pending = self._daemon.api.write_queue(device_name).submit(value)
+
+        def done() -> None:
+            try:
+                pending.result()
+            except Exception as e:
+                GLib.idle_add(error, e)
+            else:
+                GLib.idle_add(reply)
+
+        pending.add_done_callback(done)
+
+    @dbus.service.signal(INTERFACE, signature="ss")
+    def ReadingChanged(self, device_name: str, reading: str) -> None:
+        """Emitted with the new reading (as JSON) when a poll changes a device's reading."""
+
+    def record(self, timestamp: float, readings: Dict[str, Any]) -> None:
+        """Emit `ReadingChanged` for every reading that differs from the previous poll."""
+        for device_name, reading in readings.items():
+            encoded = json.dumps(reading, sort_keys=True)
+            if self._previous.get(device_name) != encoded:
+                self._previous[device_name] = encoded
+                # Signals must be sent from the thread running the GLib main loop.
+                GLib.idle_add(self.ReadingChanged, device_name, encoded)
+
+    def _read(self, device_name: str) -> Any:
+        if device_name not in self._daemon.api.read_devices:
+            raise UnknownDeviceError(f"Device '{device_name}' not found")
+        latest = self._daemon.latest
+        if device_name not in latest:
+            raise NoReadingError(f"Device '{device_name}' has not been read yet")
+        return latest[device_name]
+
+    def release_name(self) -> None:
+        """Give up the bus name, so that another instance can take it."""
+        if self._bus_name is not None:
+            bus_name, self._bus_name = self._bus_name, None
+            bus_name.get_bus().release_name(BUS_NAME)
+
+
+class DbusServer:
+    """Run a `DbusService` on its own GLib main loop thread."""
+
+    def __init__(self, daemon: Daemon, address: Optional[str] = None, system: bool = True):
+        """Connect to the bus at `address`, or else to the system (default) or session bus."""
+        threads_init()
+        DBusGMainLoop(set_as_default=True)
+        if address:
+            self.bus = dbus.bus.BusConnection(address)
+        else:
+            self.bus = dbus.SystemBus() if system else dbus.SessionBus()
+        self.service = DbusService(daemon, self.bus)
+        self._loop = GLib.MainLoop()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start dispatching D-Bus calls in a background thread."""
+        self._thread = threading.Thread(target=self._loop.run, name="pybattery-dbus", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the main loop and release the bus name."""
+        self._loop.quit()
+        if self._thread:
+            self._thread.join()
+        self.service.remove_from_connection()
+        self.service.release_name()
@@ -0,0 +1,86 @@
+import inspect
+import threading
+from functools import lru_cache
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+from pybattery.models.config import DeviceConfig
+
+
+class Capabilities(NamedTuple):
+    """What the devices of a type can do, from the methods of their class."""
+
+    readable: bool
+    writable: bool
+    async_read: bool  # `read` is a coroutine function
+    async_write: bool  # `write` is a coroutine function
+
+
+@lru_cache(maxsize=None)
+def capabilities(device_type: type) -> Capabilities:
+    """
+    Classify a device type once, from its class: the same as checking its instances against the
+    `ReadableDeviceType`/`WritableDeviceType` protocols, without inspecting every instance.
+    """
+    described = hasattr(device_type, "description")
+    read = getattr(device_type, "read", None)
+    write = getattr(device_type, "write", None)
+    return Capabilities(
+        readable=described and callable(read),
+        writable=described and callable(write),
+        async_read=described and inspect.iscoroutinefunction(read),
+        async_write=described and inspect.iscoroutinefunction(write),
+    )
+
+
+class DeviceProxy:
+    """
+    Stand in for a configured device, and build its driver (opening its hardware) on first use.
+
+    The description comes from the config, so listing devices builds nothing, and reading one
+    device only builds that one. `read` and `write` are forwarded to the driver, as is every other
+    public attribute (e.g. the `refresh` of a display). Concurrent first uses build the driver
+    once; a driver that fails to build is built again on the next use.
+    """
+
+    def __init__(self, config: DeviceConfig, factory: Callable[[], Any], device_capabilities: Capabilities):
+        self._config = config
+        self._factory = factory
+        self._capabilities = device_capabilities
+        self._device: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    @property
+    def description(self) -> str:
+        """Get the device description."""
+        return self._config.description
+
+    @property
+    def capabilities(self) -> Capabilities:
+        return self._capabilities
+
+    @property
+    def built(self) -> bool:
+        """Check whether the driver has been built yet."""
+        return self._device is not None
+
+    @property
+    def device(self) -> Any:
+        """Get the driver, building it on first use."""
+        if self._device is None:
+            with self._lock:
+                if self._device is None:
+                    self._device = self._factory()
+        return self._device
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Read the component's value (a coroutine for async drivers)."""
+        return self.device.read()
+
+    def write(self, value: Any) -> None:
+        """Write a value to the component (a coroutine for async drivers)."""
+        return self.device.write(value)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.device, name)
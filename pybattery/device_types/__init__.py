@@ -1,15 +1,44 @@
 import importlib
-from typing import Dict
+import pkgutil
+from typing import Dict, Iterator, List, Mapping
 
 
-def list_device_types() -> Dict[str, type]:
-    """List all device types in the pybattery package."""
-    import pkgutil
-    import pybattery.device_types
+class DeviceTypeRegistry(Mapping[str, type]):
+    """
+    Map device type names to their `Device` class without importing every driver up front.
 
-    components = {}
-    for _, name, _ in pkgutil.iter_modules(pybattery.device_types.__path__):
-        module = importlib.import_module(f"pybattery.device_types.{name}")
-        if hasattr(module, "Device") and isinstance(module.Device, type):
-            components[name] = module.Device
-    return components
+    Names are the modules found in the `pybattery.device_types` package, listed from the file
+    system. A driver module (and therefore its hardware libraries) is only imported the first time
+    its type is looked up. Modules that do not define a `Device` class raise `KeyError` when looked
+    up; drivers whose dependencies are missing raise `ImportError`.
+    """
+
+    def __init__(self, package_name: str = __name__, package_path: List[str] = __path__):  # type: ignore
+        self._package_name = package_name
+        self._names = [name for _, name, _ in pkgutil.iter_modules(package_path)]
+        self._types: Dict[str, type] = {}
+
+    def __getitem__(self, name: str) -> type:
+        if name not in self._types:
+            if name not in self._names:
+                raise KeyError(name)
+            module = importlib.import_module(f"{self._package_name}.{name}")
+            device_type = getattr(module, "Device", None)
+            if not isinstance(device_type, type):
+                raise KeyError(name)
+            self._types[name] = device_type
+        return self._types[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._names
+
+
+def list_device_types() -> DeviceTypeRegistry:
+    """List all device types in the pybattery package, importing each one only when it is used."""
+    return DeviceTypeRegistry()
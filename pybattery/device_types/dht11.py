@@ -2,7 +2,11 @@ from typing import Any, Dict
 
 from pybattery.models.config import DeviceConfig
 from pybattery.models.device import Device
-from Adafruit_DHT import read as read_sensor, DHT11
+
+try:
+    from Adafruit_DHT import read as read_sensor, DHT11
+except ImportError:  # not on a Raspberry Pi; see `pybattery --simulate`
+    read_sensor = DHT11 = None
 
 DEFAULT_GPIO = 13
 
@@ -12,6 +16,8 @@ class Dht11Device(Device):
     """
 
     gpio: str
+    cache_ttl = 2.0  # The sensor cannot be sampled more often than every ~2 seconds
+    isolated = True  # Reads bit-bang GPIO with tight timing and can block for seconds
 
     def __init__(self, config: DeviceConfig) -> None:
         super().__init__(config)
@@ -22,6 +28,8 @@ class Dht11Device(Device):
         Read the temperature and humidity data from the DHT11 sensor.
         """
 
+        if read_sensor is None:
+            raise RuntimeError("Adafruit_DHT is not installed, the DHT11 sensor cannot be read")
         humidity, temperature = read_sensor(DHT11, self.gpio)
         try:
             return {
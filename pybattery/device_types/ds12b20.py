@@ -1,24 +1,8 @@
-from typing import Any, Dict
+from pybattery.device_types.ds18b20 import Ds18b20Device
 
-from pybattery.models.config import DeviceConfig
-from pybattery.models.device import Device
+# `ds12b20` was the type name of the DS18B20 driver before it was corrected; kept for existing configs
+Ds12b20Device = Ds18b20Device
 
-
-class Ds12b20Device(Device):
-    """
-    Read temperature data from a DS12B20 thermometer sensor.
-    """
-
-    def __init__(self, config: DeviceConfig) -> None:
-        super().__init__(config)
-
-    def read(self) -> Dict[str, Any]:
-        """
-        Read the component's value.
-        """
-        return {}
-
-
-Device = Ds12b20Device
+Device = Ds18b20Device
 
 __all__ = ["Device", "Ds12b20Device"]
@@ -0,0 +1,177 @@
+import functools
+import os
+import threading
+import time
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+from pybattery.models.config import DeviceConfig
+from pybattery.models.device import Device
+from pybattery.workers import run_concurrently
+
+DEFAULT_SYSFS = "/sys/bus/w1/devices"
+# Family codes of the 1-Wire thermometers handled by the kernel's w1_therm driver
+THERMOMETER_FAMILIES = ("28-", "10-", "22-", "3b-", "42-")
+CONVERSION_TIMEOUT = 1.5  # A 12-bit conversion takes up to 750ms
+MAX_AGE = 1.0  # Reads of the bus less than this many seconds apart share the same conversion
+
+
+def read_file(path: str, size: int = 128) -> bytes:
+    """Read a small sysfs file in a single system call, without a buffered file object."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
+
+
+def parse_w1_slave(data: bytes) -> Optional[int]:
+    """
+    Get the temperature, in thousandths of a degree, from the content of a `w1_slave` file, or None
+    if the CRC check of the scratchpad failed:
+
+        72 01 4b 46 7f ff 0e 10 57 : crc=57 YES
+        72 01 4b 46 7f ff 0e 10 57 t=23125
+    """
+    newline = data.find(b"\n")
+    if newline < 3 or data[newline - 3 : newline] != b"YES":
+        return None
+    if (position := data.find(b"t=", newline)) < 0:
+        return None
+    return int(data[position + 2 :])
+
+
+class OneWireBus:
+    """
+    The thermometers on the 1-Wire buses of a sysfs tree (`/sys/bus/w1/devices`).
+
+    A read starts a conversion on every thermometer at once by writing `trigger` to the bus
+    master's `therm_bulk_read` (Linux 5.10+), waits for it, and then reads every thermometer's
+    `temperature`: one conversion time for the whole bus instead of one per probe. Without bulk
+    reads only the requested probes are read, each `w1_slave` on its own thread so that their
+    conversions overlap. The reading of each probe is kept for `MAX_AGE` seconds, so that the
+    devices configured for each probe share one conversion when they are polled together. Probes
+    are discovered on every read, so that hot-plugged probes show up.
+    """
+
+    def __init__(self, root: str = DEFAULT_SYSFS):
+        self.root = root
+        self._lock = threading.Lock()
+        self._readings: Dict[str, Tuple[float, Optional[float]]] = {}  # sensor -> (read at, temperature)
+        self.stats: Dict[str, int] = {"conversions": 0, "bulk_conversions": 0}
+
+    def masters(self) -> List[str]:
+        """Get the paths of the bus masters that support bulk conversions."""
+        names = sorted(name for name in os.listdir(self.root) if name.startswith("w1_bus_master"))
+        paths = [os.path.join(self.root, name, "therm_bulk_read") for name in names]
+        return [path for path in paths if os.path.exists(path)]
+
+    def sensors(self) -> List[str]:
+        """Get the IDs of the thermometers on the buses, e.g. `28-0316a279c3ff`."""
+        return sorted(name for name in os.listdir(self.root) if name.startswith(THERMOMETER_FAMILIES))
+
+    def read(self, max_age: float = MAX_AGE, sensors: Optional[Collection[str]] = None) -> Dict[str, Optional[float]]:
+        """
+        Get the temperature (°C) of every thermometer, or of those of `sensors` that are on the
+        buses, None for those that could not be read, from a new conversion unless the last one
+        is less than `max_age` seconds old.
+        """
+        with self._lock:
+            wanted = [sensor for sensor in self.sensors() if sensors is None or sensor in sensors]
+            now = time.monotonic()
+            stale = [
+                sensor
+                for sensor in wanted
+                if sensor not in self._readings or now - self._readings[sensor][0] >= max_age
+            ]
+            if stale:
+                temperatures = self._convert(stale)
+                read_at = time.monotonic()
+                self._readings.update((sensor, (read_at, value)) for sensor, value in temperatures.items())
+            return {sensor: self._readings[sensor][1] for sensor in wanted}
+
+    def _convert(self, sensors: List[str]) -> Dict[str, Optional[float]]:
+        """Read `sensors`, or every probe when the bus masters convert them all at once anyway."""
+        self.stats["conversions"] += 1
+        if masters := self.masters():
+            self.stats["bulk_conversions"] += 1
+            for master in masters:
+                fd = os.open(master, os.O_WRONLY)
+                try:
+                    os.write(fd, b"trigger\n")
+                finally:
+                    os.close(fd)
+            deadline = time.monotonic() + CONVERSION_TIMEOUT
+            while any(read_file(master).strip() == b"-1" for master in masters) and time.monotonic() < deadline:
+                time.sleep(0.05)
+            return {sensor: self._temperature(sensor, bulk=True) for sensor in self.sensors()}
+        if len(sensors) == 1:
+            return {sensors[0]: self._temperature(sensors[0], bulk=False)}
+        # The kernel releases the bus while a probe converts, so the conversions of the probes overlap
+        outcomes = run_concurrently(
+            {sensor: functools.partial(self._temperature, sensor, bulk=False) for sensor in sensors},
+            max_workers=len(sensors),
+            timeout=CONVERSION_TIMEOUT,
+        )
+        return {sensor: None if isinstance(outcome, Exception) else outcome for sensor, outcome in outcomes.items()}
+
+    def _temperature(self, sensor: str, bulk: bool) -> Optional[float]:
+        try:
+            if bulk:
+                return int(read_file(os.path.join(self.root, sensor, "temperature"))) / 1000
+            millidegrees = parse_w1_slave(read_file(os.path.join(self.root, sensor, "w1_slave")))
+            return None if millidegrees is None else millidegrees / 1000
+        except (OSError, ValueError):  # EIO on a CRC error, or an empty file when the probe went away
+            return None
+
+
+_buses: Dict[str, OneWireBus] = {}
+_buses_lock = threading.Lock()
+
+
+def one_wire_bus(root: str = DEFAULT_SYSFS) -> OneWireBus:
+    """Get the bus of a sysfs tree, shared by every device reading from it."""
+    with _buses_lock:
+        if root not in _buses:
+            _buses[root] = OneWireBus(root)
+        return _buses[root]
+
+
+class Ds18b20Device(Device):
+    """
+    Read the temperature of a DS18B20 1-Wire thermometer, through the kernel's w1_therm driver.
+
+    `sensor` in the config is the probe ID (e.g. `28-0316a279c3ff`); without it the only probe on
+    the bus is read, or every probe when there are several (`{"sensors": {"<id>": ...}}`). `sysfs`
+    points to another sysfs tree than `/sys/bus/w1/devices`.
+    """
+
+    sensor: Optional[str]
+
+    def __init__(self, config: DeviceConfig) -> None:
+        super().__init__(config)
+        self.sensor = config.args.get("sensor")
+        self.bus = one_wire_bus(config.args.get("sysfs", DEFAULT_SYSFS))
+
+    def read(self) -> Dict[str, Any]:
+        """
+        Read the temperature (°C) from the thermometer.
+        """
+        temperatures = self.bus.read(sensors=None if self.sensor is None else [self.sensor])
+        if self.sensor is None:
+            if not temperatures:
+                raise RuntimeError(f"No 1-Wire thermometer found in {self.bus.root}")
+            if len(temperatures) > 1:
+                return {"sensors": dict(temperatures)}
+            sensor, temperature = next(iter(temperatures.items()))
+        elif self.sensor not in temperatures:
+            raise RuntimeError(f"1-Wire thermometer '{self.sensor}' not found in {self.bus.root}")
+        else:
+            sensor, temperature = self.sensor, temperatures[self.sensor]
+        if temperature is None:
+            raise RuntimeError(f"1-Wire thermometer '{sensor}' could not be read")
+        return {"temperature": temperature}
+
+
+Device = Ds18b20Device
+
+__all__ = ["Device", "Ds18b20Device", "OneWireBus"]
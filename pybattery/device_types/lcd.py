@@ -1,13 +1,24 @@
-from typing import Optional
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
 from pybattery.models.config import DeviceConfig
 from pybattery.models.device import Device
 
-from RPLCD.gpio import CharLCD
-from RPi import GPIO
+try:
+    from RPLCD.gpio import CharLCD
+    from RPi import GPIO
+except (ImportError, RuntimeError):  # not on a Raspberry Pi; see `pybattery --simulate`
+    CharLCD = GPIO = None
 
 LCD_COLUMNS = 16
 LCD_ROWS = 2
 
+# Unchanged characters between two changed ones are rewritten rather than moving the cursor when
+# the gap is no longer than this (moving the cursor costs one command, writing a character one).
+MAX_REWRITE_GAP = 1
+
+
 class LcdDevice(Device):
     """Control a 16x2 LCD display."""
     rs: int
@@ -29,13 +40,17 @@ class LcdDevice(Device):
         self.d6 = gpio.get("d6", 5)
         self.d7 = gpio.get("d7", 11)
 
-        self._lcd: Optional[CharLCD] = None
+        self._lcd: Optional["CharLCD"] = None
+        self._frame: List[str] = [" " * LCD_COLUMNS] * LCD_ROWS
+        self.stats: Dict[str, int] = {"frames": 0, "skipped": 0, "writes": 0, "last_frame_writes": 0}
 
     @property
-    def lcd(self) -> CharLCD:
+    def lcd(self) -> "CharLCD":
         """Return the LCD object."""
 
         if not self._lcd:
+            if CharLCD is None:
+                raise RuntimeError("RPLCD and RPi.GPIO are not installed, the LCD cannot be driven")
             self._lcd = CharLCD(
                 numbering_mode=GPIO.BCM,
                 cols=LCD_COLUMNS,
@@ -51,6 +66,7 @@ class LcdDevice(Device):
                 auto_linebreaks=False,
             )
             self._lcd.clear()
+            self._frame = [" " * LCD_COLUMNS] * LCD_ROWS
         return self._lcd
 
     def write(self, value: str, *other_lines) -> None:
@@ -60,11 +76,76 @@ class LcdDevice(Device):
         to the display.
 
         e.g. write("Line 1\r\nLine 2") == write("Line 1", "Line 2")
+
+        The display is never cleared: the new text is compared with a shadow copy of what is on
+        screen and only the characters that changed are sent, after moving the cursor to them.
+        Nothing is sent at all when the text is unchanged.
+        """
+        lines = [line.rstrip("\r") for line in value.split("\n")] + list(other_lines)
+        frame = [line[:LCD_COLUMNS].ljust(LCD_COLUMNS) for line in lines[:LCD_ROWS]]
+        frame += [" " * LCD_COLUMNS] * (LCD_ROWS - len(frame))
+
+        lcd = self.lcd
+        writes = 0
+        for row, (old, new) in enumerate(zip(self._frame, frame)):
+            for column, text in changed_runs(old, new):
+                lcd.cursor_pos = (row, column)
+                lcd.write_string(text)
+                writes += 1 + len(text)
+        self._frame = frame
+
+        self.stats["frames"] += 1
+        self.stats["skipped"] += writes == 0
+        self.stats["writes"] += writes
+        self.stats["last_frame_writes"] = writes
+
+    def close(self) -> None:
+        """Release the GPIO pins of the display; it is set up again on the next write."""
+        if self._lcd:
+            lcd, self._lcd = self._lcd, None
+            lcd.close(clear=False)
+
+    def refresh(
+        self,
+        render: Callable[[], str],
+        fps: float = 1.0,
+        frames: Optional[int] = None,
+        stop: Optional[threading.Event] = None,
+        on_frame: Optional[Callable[[int], None]] = None,
+    ) -> None:
         """
-        # Placeholder for actual implementation
-        self.lcd.clear()
-        lines = value.split("\n") + list(other_lines)
-        self.lcd.write_string("\r\n".join(lines[:LCD_ROWS]))
+        Redraw the display with the text returned by `render()` at a fixed frame rate, until
+        `frames` frames were drawn or `stop` is set. `on_frame` is called after every frame with
+        the number of writes (commands and characters) sent to the controller for that frame.
+        """
+        stop = stop or threading.Event()
+        period = 1 / fps
+        next_frame = time.monotonic()
+        drawn = 0
+        while not stop.is_set() and (frames is None or drawn < frames):
+            self.write(render())
+            drawn += 1
+            if on_frame:
+                on_frame(self.stats["last_frame_writes"])
+            next_frame += period
+            if (delay := next_frame - time.monotonic()) < 0:  # running late, drop the missed frames
+                next_frame -= (delay // period) * period
+                delay = next_frame - time.monotonic()
+            if frames is None or drawn < frames:
+                stop.wait(max(0.0, delay))
+
+
+def changed_runs(old: str, new: str) -> List[Tuple[int, str]]:
+    """Get the `(column, text)` runs of `new` that differ from `old`, merging runs split by short gaps."""
+    runs: List[Tuple[int, int]] = []
+    for column, (old_char, new_char) in enumerate(zip(old, new)):
+        if old_char == new_char:
+            continue
+        if runs and column - runs[-1][1] <= MAX_REWRITE_GAP + 1:
+            runs[-1] = (runs[-1][0], column)
+        else:
+            runs.append((column, column))
+    return [(start, new[start : end + 1]) for start, end in runs]
 
 
 Device = LcdDevice
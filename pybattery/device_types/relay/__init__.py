@@ -0,0 +1,6 @@
+from pybattery.device_types.relay.device import RelayDevice
+
+
+Device = RelayDevice
+
+__all__ = ["Device", "RelayDevice"]
@@ -0,0 +1,69 @@
+from typing import Any, Dict, Optional
+
+from pybattery.models.config import DeviceConfig
+from pybattery.models.device import Device
+
+try:
+    from RPi import GPIO
+except (ImportError, RuntimeError):  # not on a Raspberry Pi; see `pybattery --simulate`
+    GPIO = None
+
+DEFAULT_GPIO = 27
+ON_VALUES = {"1", "on", "true", "yes", "high"}
+OFF_VALUES = {"0", "off", "false", "no", "low"}
+
+
+def parse_state(value: Any) -> bool:
+    """Parse the state written to a relay: a boolean, 0/1 or a word like on/off."""
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ON_VALUES:
+        return True
+    if text in OFF_VALUES:
+        return False
+    raise ValueError(f"Invalid relay state: '{value}' (expected on or off)")
+
+
+class RelayDevice(Device):
+    """
+    Switch a relay on or off through a GPIO pin.
+
+    `gpio` in the config is the pin (BCM numbering) and `active_low: true` is for the common relay
+    boards that switch on when the pin is low. Writes are at least `write_interval` seconds apart
+    when they go through the `Api` so that the relay cannot chatter.
+    """
+
+    gpio: int
+    active_low: bool
+    write_interval = 1.0
+
+    def __init__(self, config: DeviceConfig) -> None:
+        super().__init__(config)
+        self.gpio = int(config.args.get("gpio", DEFAULT_GPIO))
+        self.active_low = bool(config.args.get("active_low", False))
+        self._on: Optional[bool] = None
+        self._configured = False
+
+    def read(self) -> Dict[str, Any]:
+        """
+        Get the state the relay was last switched to, or None before the first write.
+        """
+        return {"on": self._on}
+
+    def write(self, value: Any) -> None:
+        """
+        Switch the relay `on` or `off`.
+        """
+        on = parse_state(value)
+        self._output(on != self.active_low)
+        self._on = on
+
+    def _output(self, level: bool) -> None:
+        if GPIO is None:
+            raise RuntimeError("RPi.GPIO is not installed, the relay cannot be switched")
+        if not self._configured:
+            GPIO.setmode(GPIO.BCM)
+            GPIO.setup(self.gpio, GPIO.OUT)
+            self._configured = True
+        GPIO.output(self.gpio, GPIO.HIGH if level else GPIO.LOW)
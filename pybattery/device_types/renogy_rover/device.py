@@ -1,6 +1,53 @@
-from pybattery.models.device import Device
+from typing import Any, Dict, Optional
 
-class RenogyRoverDevice(Device):
+from pybattery.connections import ConnectionPool, SerialBus
+from pybattery.device_types.renogy_rover.registers import BLOCK, decode
+from pybattery.models.config import DeviceConfig
+from pybattery.models.device import SerialDevice
+
+DEFAULT_SERIAL_PORT = "/dev/ttyUSB0"
+DEFAULT_SLAVE_ADDRESS = 1
+BAUDRATE = 9600
+TIMEOUT = 1.0
+
+
+class RenogyRoverDevice(SerialDevice):
     """
-    Renogy Rover device class.
+    Read battery, solar panel and load data from a Renogy Rover MPPT charge controller.
+
+    The controller is polled over Modbus RTU (RS-232/RS-485). `address` in the config is the
+    serial port and `port` the controller's Modbus slave address. All the values are fetched with
+    a single multi-register request (see `registers.BLOCK`) on the port's shared `SerialBus`.
+    `read` is a coroutine that waits for the bus without blocking the event loop, so one loop can
+    poll controllers on many buses at once. A device used outside of an `Api` opens the port in a
+    pool of its own, which `close` closes.
     """
+
+    serial_port: str
+    slave_address: int
+
+    def __init__(self, config: DeviceConfig) -> None:
+        super().__init__(config)
+        self.serial_port = config.args.get("address", DEFAULT_SERIAL_PORT)
+        self.slave_address = int(config.args.get("port", DEFAULT_SLAVE_ADDRESS))
+        self._own_connections: Optional[ConnectionPool] = None
+
+    @property
+    def bus(self) -> SerialBus:
+        """Return the serial bus the controller is on, opening it on first use."""
+        if self.connections is None:
+            self.connections = self._own_connections = ConnectionPool()
+        return self.connections.bus(self.serial_port, baudrate=BAUDRATE, timeout=TIMEOUT)
+
+    def close(self) -> None:
+        """Close the serial port if the device opened it itself rather than through the `Api`'s pool."""
+        if self._own_connections is not None:
+            self._own_connections.close()
+            self.connections = self._own_connections = None
+
+    async def read(self) -> Dict[str, Any]:
+        """
+        Read the controller's status.
+        """
+        start, count = BLOCK
+        return decode(await self.bus.read_registers_async(self.slave_address, start, count))
@@ -0,0 +1,106 @@
+from typing import Any, Dict, List, Tuple
+
+# Every value is read in a single Modbus request (at most 125 registers): (first register, count).
+# 0x0115-0x011F (operating days and historical totals) are read along but not decoded.
+BLOCK: Tuple[int, int] = (0x0100, 35)
+STATUS = slice(0x00, 0x15)  # 0x0100-0x0114: battery, temperatures, load, PV and daily statistics
+STATE = slice(0x20, 0x23)  # 0x0120-0x0122: load/charging state and fault bits
+
+CHARGING_STATES = {
+    0: "deactivated",
+    1: "activated",
+    2: "mppt",
+    3: "equalizing",
+    4: "boost",
+    5: "floating",
+    6: "current_limiting",
+}
+
+FAULTS = {
+    30: "charge_mos_short_circuit",
+    29: "anti_reverse_mos_short",
+    28: "solar_panel_reversed",
+    27: "solar_panel_working_point_over_voltage",
+    26: "solar_panel_counter_current",
+    25: "pv_input_over_voltage",
+    24: "pv_input_short_circuit",
+    23: "pv_input_over_power",
+    22: "ambient_temperature_too_high",
+    21: "controller_temperature_too_high",
+    20: "load_over_power",
+    19: "load_short_circuit",
+    18: "battery_under_voltage",
+    17: "battery_over_voltage",
+    16: "battery_over_discharge",
+}
+
+
+def signed_byte(value: int) -> int:
+    """Decode a temperature byte, where bit 7 is the sign and bits 0-6 the magnitude."""
+    return -(value & 0x7F) if value & 0x80 else value
+
+
+def decode(registers: List[int]) -> Dict[str, Any]:
+    """Decode the registers of `BLOCK` into a structured reading."""
+    (
+        soc,
+        battery_voltage,
+        charging_current,
+        temperatures,
+        load_voltage,
+        load_current,
+        load_power,
+        pv_voltage,
+        pv_current,
+        pv_power,
+        _,  # 0x010A: load on/off command register
+        min_battery_voltage,
+        max_battery_voltage,
+        max_charging_current,
+        max_discharging_current,
+        max_charging_power,
+        max_discharging_power,
+        charging_amp_hours,
+        discharging_amp_hours,
+        power_generation,
+        power_consumption,
+    ) = registers[STATUS]
+    load_state, faults_high, faults_low = registers[STATE]
+    faults = faults_high << 16 | faults_low
+
+    return {
+        "battery": {
+            "soc": soc,
+            "voltage": battery_voltage / 10,
+            "charging_current": charging_current / 100,
+            "temperature": signed_byte(temperatures & 0xFF),
+            "min_voltage_today": min_battery_voltage / 10,
+            "max_voltage_today": max_battery_voltage / 10,
+        },
+        "controller": {
+            "temperature": signed_byte(temperatures >> 8),
+            "charging_state": CHARGING_STATES.get(load_state & 0xFF, "unknown"),
+            "faults": [name for bit, name in FAULTS.items() if faults & (1 << bit)],
+        },
+        "load": {
+            "on": bool(load_state & 0x8000),
+            "voltage": load_voltage / 10,
+            "current": load_current / 100,
+            "power": load_power,
+        },
+        "pv": {
+            "voltage": pv_voltage / 10,
+            "current": pv_current / 100,
+            "power": pv_power,
+        },
+        "today": {
+            "max_charging_current": max_charging_current / 100,
+            "max_discharging_current": max_discharging_current / 100,
+            "max_charging_power": max_charging_power,
+            "max_discharging_power": max_discharging_power,
+            "charging_amp_hours": charging_amp_hours,
+            "discharging_amp_hours": discharging_amp_hours,
+            "power_generation": power_generation,
+            "power_consumption": power_consumption,
+        },
+    }
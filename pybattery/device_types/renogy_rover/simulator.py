@@ -0,0 +1,103 @@
+import os
+import pty
+import select
+import struct
+import threading
+import time
+import tty
+from typing import Dict, Iterable, Optional
+
+READ_HOLDING_REGISTERS = 3
+REQUEST_SIZE = 8
+
+
+def crc16(data: bytes) -> int:
+    """Compute the Modbus RTU CRC of a frame."""
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+class ModbusSlaveSimulator:
+    """
+    Answer Modbus RTU "read holding registers" requests on a pseudo-terminal, standing in for one
+    or more controllers on a serial bus.
+
+    Open `port` (the slave end of the pty) with any Modbus master. Requests for other slave
+    addresses are ignored, like on a real RS-485 bus, and unknown registers read as 0. Every
+    answered request is counted in `requests`.
+    """
+
+    def __init__(
+        self,
+        registers: Dict[int, int],
+        slave_addresses: Iterable[int] = (1,),
+        latency: float = 0.0,
+    ):
+        self.registers = registers
+        self.slave_addresses = set(slave_addresses)
+        self.latency = latency
+        self.requests = 0
+        self._master_fd: Optional[int] = None
+        self._slave_fd: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def port(self) -> str:
+        """Get the path of the serial port to connect to."""
+        assert self._slave_fd is not None, "Simulator is not started"
+        return os.ttyname(self._slave_fd)
+
+    def start(self) -> "ModbusSlaveSimulator":
+        self._master_fd, self._slave_fd = pty.openpty()
+        tty.setraw(self._slave_fd)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._serve, name="modbus-simulator", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        for fd in (self._master_fd, self._slave_fd):
+            if fd is not None:
+                os.close(fd)
+        self._master_fd = self._slave_fd = None
+
+    def __enter__(self) -> "ModbusSlaveSimulator":
+        return self.start()
+
+    def __exit__(self, *_) -> None:
+        self.stop()
+
+    def _serve(self) -> None:
+        buffer = b""
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._master_fd], [], [], 0.05)
+            if not readable:
+                buffer = b""  # an idle line ends any partial frame
+                continue
+            buffer += os.read(self._master_fd, 256)  # type: ignore
+            while len(buffer) >= REQUEST_SIZE:
+                frame, buffer = buffer[:REQUEST_SIZE], buffer[REQUEST_SIZE:]
+                if response := self._respond(frame):
+                    if self.latency:
+                        time.sleep(self.latency)
+                    os.write(self._master_fd, response)  # type: ignore
+
+    def _respond(self, frame: bytes) -> Optional[bytes]:
+        slave_address, function_code, start, count = struct.unpack(">BBHH", frame[:6])
+        if crc16(frame[:6]) != struct.unpack("<H", frame[6:])[0] or slave_address not in self.slave_addresses:
+            return None
+        if function_code != READ_HOLDING_REGISTERS:
+            body = struct.pack(">BBB", slave_address, function_code | 0x80, 1)  # illegal function
+        else:
+            values = [self.registers.get(register, 0) for register in range(start, start + count)]
+            body = struct.pack(f">BBB{count}H", slave_address, function_code, count * 2, *values)
+        self.requests += 1
+        return body + struct.pack("<H", crc16(body))
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import sys
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from pybattery.daemon import Daemon
+from pybattery.metrics import OPENMETRICS_CONTENT_TYPE, PROMETHEUS_CONTENT_TYPE, MetricsRegistry
+from pybattery.storage.memory import MemoryStore
+from pybattery.storage.rollup import DEFAULT_MAX_POINTS, Rollup
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Text(NamedTuple):
+    """A response body sent as it is rather than as JSON."""
+
+    content_type: str
+    content: bytes
+
+
+class HttpApi:
+    """
+    Serve the daemon's state as JSON over a small asyncio HTTP/1.1 server.
+
+    Reads are answered from what the daemon last sampled (and from the in-memory stores for
+    history), so requests never touch the hardware. The server runs its own event loop in a
+    background thread, so any number of clients can be connected without holding up polling.
+
+    Routes:
+        GET  /devices                         readable and writable devices with their description
+        GET  /readings                        latest reading of every device
+        GET  /readings/<device>               latest reading of one device
+        GET  /history/<device>/<metric>       raw samples (`start`, `end`) from the memory store, or
+                                              aggregates when `resolution=auto` (`max_points`)
+        GET  /stats                           cache, write queue and worker process statistics
+        GET  /alerts                          state of every alert rule
+        GET  /metrics                         readings as Prometheus gauges (OpenMetrics if accepted)
+        POST /devices/<device>                write the JSON body's `value` to a writable device
+    """
+
+    def __init__(
+        self,
+        daemon: Daemon,
+        memory: Optional[MemoryStore] = None,
+        rollup: Optional[Rollup] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+    ):
+        self._daemon = daemon
+        self._memory = memory
+        self._rollup = rollup
+        self._metrics = metrics
+        self._host = host
+        self._port = port
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        """Get the port the server listens on (the bound port once started with port 0)."""
+        return self._port
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        started = threading.Event()
+        errors: List[Exception] = []
+        loop = self._loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            try:
+                server = loop.run_until_complete(asyncio.start_server(self._handle, self._host, self._port))
+            except Exception as e:
+                errors.append(e)
+                started.set()
+                return
+            self._port = server.sockets[0].getsockname()[1]
+            started.set()
+            loop.run_forever()
+            server.close()
+            loop.run_until_complete(server.wait_closed())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="pybattery-http", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+
+    def stop(self) -> None:
+        """Stop serving and wait for the server thread to exit."""
+        if self._loop and self._thread:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = self._thread = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while request_line := await reader.readline():
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self._respond(method, target, body, headers)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                if isinstance(payload, Text):
+                    content_type, content = payload
+                else:
+                    content_type, content = "application/json", json.dumps(payload).encode()
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                        f"Content-Type: {content_type}\r\n"
+                        f"Content-Length: {len(content)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    ).encode()
+                    + content
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, method: str, target: str, body: bytes, headers: Dict[str, str]) -> Tuple[int, Any]:
+        url = urlsplit(target)
+        path = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            if method == "POST" and len(path) == 2 and path[0] == "devices":
+                return 200, await self._write(path[1], body)
+            if method != "GET":
+                raise HttpError(405, f"Method {method} not allowed")
+            if path == ["metrics"]:
+                return 200, self._render_metrics(headers.get("accept", ""))
+            return 200, self._get(path, query)
+        except HttpError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            print(f"HTTP request {method} {target} failed: {e}", file=sys.stderr)
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    def _get(self, path: List[str], query: Dict[str, str]) -> Any:
+        api = self._daemon.api
+        if path == ["devices"]:
+            return {
+                "read": {name: device.description for name, device in api.read_devices.items()},
+                "write": {name: device.description for name, device in api.write_devices.items()},
+            }
+        if path == ["readings"]:
+            return self._daemon.latest
+        if len(path) == 2 and path[0] == "readings":
+            latest = self._daemon.latest
+            if path[1] not in latest:
+                raise HttpError(404, f"No reading for device '{path[1]}'")
+            return latest[path[1]]
+        if len(path) == 3 and path[0] == "history":
+            return self._history(path[1], path[2], query)
+        if path == ["alerts"]:
+            return {
+                rule.name: {
+                    "device": rule.config.device,
+                    "metric": rule.config.metric,
+                    "active": rule.active,
+                    "value": rule.value,
+                }
+                for rule in api.alerts.rules
+            }
+        if path == ["stats"]:
+            return {"cache": api.cache_stats, "writes": api.write_stats, "isolated": api.isolation_stats}
+        raise HttpError(404, f"Not found: /{'/'.join(path)}")
+
+    def _render_metrics(self, accept: str) -> Text:
+        if self._metrics is None:
+            raise HttpError(404, "Metrics are not available")
+        if "application/openmetrics-text" in accept:
+            return Text(OPENMETRICS_CONTENT_TYPE, self._metrics.render(openmetrics=True))
+        return Text(PROMETHEUS_CONTENT_TYPE, self._metrics.render())
+
+    def _history(self, device_name: str, metric: str, query: Dict[str, str]) -> Any:
+        try:
+            start = float(query["start"]) if "start" in query else None
+            end = float(query["end"]) if "end" in query else None
+            max_points = int(query.get("max_points", DEFAULT_MAX_POINTS))
+        except ValueError as e:
+            raise HttpError(400, f"Invalid query: {e}")
+
+        if query.get("resolution") == "auto":
+            if self._rollup is None:
+                raise HttpError(404, "Aggregates are not available")
+            resolution, buckets = self._rollup.query(device_name, metric, start, end, max_points=max_points)
+            return {"resolution": resolution, "buckets": buckets}
+        if self._memory is None:
+            raise HttpError(404, "History is not available")
+        return {"samples": self._memory.range(device_name, metric, start, end)}
+
+    async def _write(self, device_name: str, body: bytes) -> Any:
+        api = self._daemon.api
+        if device_name not in api.write_devices:
+            raise HttpError(404, f"Device '{device_name}' not found")
+        try:
+            value = json.loads(body)["value"]
+        except (ValueError, KeyError, TypeError):
+            raise HttpError(400, 'Expected a JSON body like {"value": ...}')
+        await api.awrite(device_name, value)
+        return {"written": value}
@@ -0,0 +1,147 @@
+import multiprocessing
+import pickle
+import threading
+from multiprocessing.connection import Connection
+from typing import Any, Dict, Optional, Tuple
+
+from pybattery.models.config import DeviceConfig
+from pybattery.workers import TaskTimeoutError
+
+DEFAULT_TIMEOUT = 10.0
+START_TIMEOUT = 30.0  # Starting an interpreter and importing the driver can be slow on a Raspberry Pi
+
+# Fresh interpreters: a forked child would inherit the parent's threads' locks and the GPIO state
+_context = multiprocessing.get_context("spawn")
+
+
+def serve_device(device_type: type, config: DeviceConfig, connection: Connection) -> None:
+    """Build a device and run the calls received on `connection` until it is closed (in the worker)."""
+    try:
+        device = device_type(config)
+    except Exception as e:
+        connection.send((False, e))
+        return
+    connection.send((True, None))
+    while True:
+        try:
+            request = connection.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if request is None:
+            return
+        method, args = request
+        try:
+            response: Tuple[bool, Any] = (True, getattr(device, method)(*args))
+        except Exception as e:
+            response = (False, e)
+        try:
+            connection.send(response)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            connection.send((False, RuntimeError(f"{type(response[1]).__name__}: {response[1]}")))
+
+
+class IsolatedDevice:
+    """
+    Run a device in its own worker process and forward `read()`/`write()` to it over a pipe.
+
+    For drivers that bit-bang GPIO (e.g. the DHT11): the timing of their busy loops is not
+    disturbed by the GIL of the main process, and a read that hangs only holds up its caller. The
+    worker is started on first use; a call that gets no answer within `timeout` seconds kills the
+    worker and raises `TaskTimeoutError`, and the next call starts a new one. Calls to the same
+    device are made one at a time. Calls, restarts and timeouts are counted in `stats`.
+    """
+
+    def __init__(self, device_type: type, config: DeviceConfig, timeout: float = DEFAULT_TIMEOUT, name: str = ""):
+        self._device_type = device_type
+        self._config = config
+        self._timeout = timeout
+        self._name = name or config.description
+        self._lock = threading.Lock()
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+        self._connection: Optional[Connection] = None
+        self.stats: Dict[str, int] = {"calls": 0, "starts": 0, "timeouts": 0}
+
+    @property
+    def description(self) -> str:
+        """Get the device description."""
+        return self._config.description
+
+    @property
+    def pid(self) -> Optional[int]:
+        """Get the process ID of the worker, if it is running."""
+        return self._process.pid if self._process is not None and self._process.is_alive() else None
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Read the component's value in the worker."""
+        return self._call("read")
+
+    def write(self, value: Any) -> None:
+        """Write a value to the component in the worker."""
+        self._call("write", value)
+
+    def close(self) -> None:
+        """Stop the worker."""
+        with self._lock:
+            if self._connection is not None:
+                try:
+                    self._connection.send(None)
+                except OSError:
+                    pass
+            self._stop(grace=1.0)
+
+    def _call(self, method: str, *args: Any) -> Any:
+        with self._lock:
+            self.stats["calls"] += 1
+            connection = self._start()
+            connection.send((method, args))
+            try:
+                ok, result = self._receive(connection, self._timeout)
+            except TaskTimeoutError:
+                self.stats["timeouts"] += 1
+                raise
+        if not ok:
+            raise result
+        return result
+
+    def _start(self) -> Connection:
+        if self._process is not None and self._process.is_alive():
+            return self._connection  # type: ignore
+        self._stop()
+        connection, worker_connection = _context.Pipe()
+        self._process = _context.Process(
+            target=serve_device,
+            args=(self._device_type, self._config, worker_connection),
+            name=f"pybattery-{self._name}",
+            daemon=True,
+        )
+        self._process.start()
+        worker_connection.close()
+        self._connection = connection
+        self.stats["starts"] += 1
+        ok, error = self._receive(connection, START_TIMEOUT)
+        if not ok:  # the driver failed to build
+            self._stop()
+            raise error
+        return connection
+
+    def _receive(self, connection: Connection, timeout: float) -> Tuple[bool, Any]:
+        """Wait for the next message from the worker, killing it if there is none in time or it died."""
+        try:
+            if connection.poll(timeout):
+                return connection.recv()
+        except (EOFError, OSError):
+            self._stop()
+            raise RuntimeError(f"The worker process of '{self._name}' exited") from None
+        self._stop()
+        raise TaskTimeoutError(self._name, timeout)
+
+    def _stop(self, grace: float = 0.0) -> None:
+        process, connection, self._process, self._connection = self._process, self._connection, None, None
+        if connection is not None:
+            connection.close()
+        if process is None:
+            return
+        process.join(grace)
+        if process.is_alive():
+            process.kill()
+            process.join()
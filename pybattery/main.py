@@ -1,10 +1,35 @@
 import argparse
+import os
+import signal
+import string
 import sys
-from typing import List, Optional
+import time
+from datetime import datetime
+from typing import Callable, List, Optional
 
 from pybattery.api import Api
-from pybattery.models.config import Config
-from pybattery.output_writer import OutputFormat, OutputWriter
+from pybattery.models.config import DEFAULT_CONFIG_PATH, Config
+from pybattery.output_writer import OutputFormat, OutputWriter, StreamFormat, StreamWriter
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 7 * 86400}
+
+
+def parse_time(value: str) -> float:
+    """
+    Parse a point in time given as seconds since the epoch, an ISO 8601 date or a duration
+    relative to now such as `30m`, `12h` or `7d`.
+    """
+    if value[-1:] in DURATION_UNITS and value[:-1].replace(".", "", 1).isdigit():
+        return time.time() - float(value[:-1]) * DURATION_UNITS[value[-1]]
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid time: '{value}'")
+
 
 
 def list_devices(api):
@@ -17,19 +42,82 @@ def list_devices(api):
 
 def list_device_types(api):
     """List all available device types in the pybattery package."""
-    data = {
-        name: device_type.__doc__.strip().splitlines()[0] if device_type.__doc__ else "No description available"
-        for name, device_type in api.device_types.items()
-    }
+    data = {}
+    for name in api.device_types:
+        try:
+            device_type = api.device_types[name]
+        except KeyError:
+            continue
+        except ImportError as e:
+            data[name] = f"Unavailable: {e}"
+            continue
+        data[name] = device_type.__doc__.strip().splitlines()[0] if device_type.__doc__ else "No description available"
     OutputWriter(OutputFormat.YAML).write({"device_types": data})
 
-def read(api: Api, device_names: List[str], format):
+def read(
+    api: Api,
+    device_names: List[str],
+    format: Optional[str] = None,
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    follow: bool = False,
+    interval: float = 1.0,
+    count: Optional[int] = None,
+):
     """Read data from specified devices."""
     if not device_names:
         return
+    if follow:
+        return follow_readings(api, device_names, format, workers, timeout, interval, count)
+
+    try:
+        if format in [f.value for f in StreamFormat]:
+            writer = StreamWriter(StreamFormat(format))
+            writer.write(time.time(), api.read_all(device_names, workers, timeout))
+            writer.close()
+        elif data := api.read(device_names, max_workers=workers, timeout=timeout):
+            OutputWriter(OutputFormat(format or OutputFormat.YAML.value)).write(data)
+    finally:
+        api.close()
 
-    if data := api.read(device_names):
-        OutputWriter(OutputFormat(format)).write(data)
+def follow_readings(
+    api: Api,
+    device_names: List[str],
+    format: Optional[str],
+    workers: Optional[int],
+    timeout: Optional[float],
+    interval: float,
+    count: Optional[int],
+):
+    """Read the devices every `interval` seconds and stream the readings until interrupted."""
+    writer = StreamWriter(StreamFormat(format or StreamFormat.NDJSON.value))
+    api.alerts.add_listener(lambda event: print(f"Alert {event}", file=sys.stderr))
+    next_read = time.monotonic()
+    records = 0
+    try:
+        while count is None or records < count:
+            timestamp = time.time()
+            try:
+                readings = api.read_all(device_names, max_workers=workers, timeout=timeout)
+            except Exception as e:
+                print(f"Failed to read devices: {e}", file=sys.stderr)
+            else:
+                api.evaluate_alerts(timestamp, readings)
+                writer.write(timestamp, readings)
+                records += 1
+            next_read += interval
+            if (delay := next_read - time.monotonic()) < 0:  # running late, skip the missed reads
+                next_read -= (delay // interval) * interval if interval else delay
+                delay = next_read - time.monotonic()
+            time.sleep(max(0.0, delay))
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`): stop quietly, without Python complaining about stdout on exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        writer.close()
+        api.close()
 
 def write(api: Api, device_name: str, value: str):
     """Write data to a specified device."""
@@ -37,19 +125,272 @@ def write(api: Api, device_name: str, value: str):
     if device_name not in write_devices:
         print(f"Device '{device_name}' not found.", file=sys.stderr)
         return
-    device = write_devices[device_name]
     try:
-        device.write(value)
+        api.write(device_name, value)
     except Exception as e:
         print(f"Failed to write to device '{device_name}': {e}", file=sys.stderr)
+    finally:
+        api.close()
+
+def display(api: Api, device_name: str, template: str, fps: float = 1.0, frames: Optional[int] = None, verbose=False):
+    """
+    Refresh a display from live readings at a fixed frame rate. `template` is a format string
+    whose fields name devices, e.g. `"SOC {mppt[battery][soc]}%"`.
+    """
+    device = api.write_devices.get(device_name)
+    if not hasattr(device, "refresh"):
+        print(f"Device '{device_name}' is not a display.", file=sys.stderr)
+        return
+    template = template.replace("\\n", "\n")
+    fields = [field for _, field, _, _ in string.Formatter().parse(template) if field]
+    sources = sorted({field.split("[")[0].split(".")[0] for field in fields})
+    api.enable_cache()
+
+    def render() -> str:
+        try:
+            return template.format(**api.read_all(sources))
+        except Exception as e:  # keep refreshing, the failure is shown on the display
+            return f"Error: {e}"
+
+    def report(writes: int) -> None:
+        if verbose:
+            print(f"{writes} writes", file=sys.stderr)
+
+    try:
+        device.refresh(render, fps=fps, frames=frames, on_frame=report)  # type: ignore
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stats = device.stats  # type: ignore
+        print(
+            f"{stats['frames']} frames, {stats['skipped']} unchanged, {stats['writes']} writes "
+            f"({stats['writes'] / max(stats['frames'], 1):.1f} per frame)",
+            file=sys.stderr,
+        )
+        api.close()
+
+def serve(
+    api: Api,
+    interval: Optional[float] = None,
+    workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    verbose: bool = False,
+    history_size: Optional[int] = None,
+    history_dir: Optional[str] = None,
+    no_history: bool = False,
+    retention: Optional[float] = None,
+    rollup_backfill: float = 1.0,
+    http_host: Optional[str] = None,
+    http_port: Optional[int] = None,
+    dbus: Optional[str] = None,
+    record: Optional[str] = None,
+    no_reload: bool = False,
+    config_path: Optional[str] = None,
+    load_config: Optional[Callable[[], Config]] = None,
+):
+    """
+    Poll devices continuously until interrupted, reloading the config when the file at `config_path`
+    changes or on SIGHUP (`load_config` reads it again).
+    """
+    from pybattery.daemon import DEFAULT_INTERVAL, Daemon, LogSink
+    from pybattery.storage.history import DEFAULT_HISTORY_DIR, HistoryStore
+    from pybattery.storage.memory import DEFAULT_CAPACITY, MemoryStore
+    from pybattery.storage.rollup import Rollup
+
+    api.enable_cache()
+    interval = DEFAULT_INTERVAL if interval is None else interval
+    daemon = Daemon(api, default_interval=interval, max_workers=workers, timeout=timeout)
+    api.alerts.add_listener(lambda event: print(f"Alert {event}", file=sys.stderr))
+    memory = MemoryStore(capacity=DEFAULT_CAPACITY if history_size is None else history_size)
+    daemon.add_sink(memory)
+    rollup = Rollup()
+    history_store = None
+    if not no_history:
+        history_store = HistoryStore(
+            history_dir or DEFAULT_HISTORY_DIR, retention=retention * 86400 if retention else None
+        )
+        rollup.load(history_store.samples(start=time.time() - rollup_backfill * 86400))
+        daemon.add_sink(history_store)
+    daemon.add_sink(rollup)
+    if verbose:
+        daemon.add_sink(LogSink())
+    recorder = None
+    if record:
+        from pybattery.simulation.trace import TraceRecorder
+
+        recorder = TraceRecorder(record)
+        daemon.add_sink(recorder)
+    http = None
+    if http_port is not None:
+        from pybattery.http_api import DEFAULT_HOST, HttpApi
+        from pybattery.metrics import MetricsRegistry
+
+        metrics = MetricsRegistry(api)
+        daemon.add_sink(metrics)
+        http = HttpApi(
+            daemon, memory=memory, rollup=rollup, metrics=metrics, host=http_host or DEFAULT_HOST, port=http_port
+        )
+        http.start()
+    dbus_server = None
+    if dbus:
+        from pybattery.dbus_service import DbusServer
+
+        dbus_server = DbusServer(daemon, system=dbus == "system")
+        daemon.add_sink(dbus_server.service)
+        dbus_server.start()
+
+    watcher = None
+    if load_config is not None and not no_reload:
+        from pybattery.config_watcher import ConfigWatcher
+
+        def reload_config():
+            try:
+                daemon.request_reload(load_config())
+            except Exception as e:
+                print(f"Config not reloaded: {e}", file=sys.stderr)
+
+        signal.signal(signal.SIGHUP, lambda *_: reload_config())
+        if config_path:
+            watcher = ConfigWatcher(config_path, reload_config)
+            watcher.start()
+
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher:
+            watcher.stop()
+        if dbus_server:
+            dbus_server.stop()
+        if http:
+            http.stop()
+        if history_store:
+            history_store.close()
+        if recorder:
+            recorder.close()
+        api.close()
+
+def history(
+    api: Api,
+    device_name: str,
+    metric: str,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    history_dir: Optional[str] = None,
+    format: str = OutputFormat.YAML.value,
+):
+    """Print the recorded samples of a device metric."""
+    from pybattery.storage.history import DEFAULT_HISTORY_DIR, HistoryStore
+
+    history_dir = history_dir or DEFAULT_HISTORY_DIR
+    try:
+        store = HistoryStore(history_dir, read_only=True)
+    except FileNotFoundError:
+        print(f"No history found in {history_dir}", file=sys.stderr)
+        sys.exit(1)
+    data = [
+        {"timestamp": timestamp, "value": value} for timestamp, value in store.query(device_name, metric, since, until)
+    ]
+    OutputWriter(OutputFormat(format)).write({device_name: {metric: data}})
+
+
+def export(
+    api: Api,
+    output: str,
+    devices: Optional[List[str]] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    history_dir: Optional[str] = None,
+    format: Optional[str] = None,
+    chunk_records: Optional[int] = None,
+):
+    """
+    Write the recorded samples to a columnar file, or to a gzip-compressed CSV file when the format
+    is `csv` or the output ends with `.csv.gz` (see `pybattery.storage.export`).
+    """
+    from pybattery.storage.export import DEFAULT_CHUNK_RECORDS, ColumnarWriter, CsvWriter, export as export_samples
+    from pybattery.storage.history import DEFAULT_HISTORY_DIR, HistoryStore
+
+    history_dir = history_dir or DEFAULT_HISTORY_DIR
+    format = format or ("csv" if output.endswith(".csv.gz") else "columnar")
+    chunk_records = chunk_records or DEFAULT_CHUNK_RECORDS
+    try:
+        store = HistoryStore(history_dir, read_only=True)
+    except FileNotFoundError:
+        print(f"No history found in {history_dir}", file=sys.stderr)
+        sys.exit(1)
+    recorded = {device_name for device_name, _ in store.series}
+    if unknown := sorted(set(devices or []) - recorded):
+        print(f"No recorded samples for devices: {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(1)
+    output_file = sys.stdout.buffer if output == "-" else open(output, "wb")
+    try:
+        writer = CsvWriter(output_file) if format == "csv" else ColumnarWriter(output_file, chunk_records)
+        count = export_samples(store, writer, set(devices) if devices else None, since, until)
+    finally:
+        if output_file is not sys.stdout.buffer:
+            output_file.close()
+    print(f"Exported {count} samples to {output}", file=sys.stderr)
+
+
+def create_simulation(
+    config: Config,
+    simulate: bool = False,
+    replay: Optional[str] = None,
+    speed: float = 1.0,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    failure_rate: float = 0.0,
+    seed: Optional[int] = None,
+    scale: int = 1,
+):
+    """Get the config and the simulation to build the devices with, if simulating."""
+    if not (simulate or replay):
+        return config, None
+    from pybattery.simulation.backend import Simulation, SimulationSettings, scale_config
+    from pybattery.simulation.trace import load_trace
+
+    settings = SimulationSettings(latency=latency, jitter=jitter, failure_rate=failure_rate, speed=speed)
+    simulation = Simulation(settings, trace=load_trace(replay) if replay else None, seed=seed)
+    return scale_config(config, scale, simulation.sources), simulation
 
 
 def main(config: Optional[Config] = None):
-    config = config or Config.from_file()
-    api = Api(config=config)
+    config_path = None if config else DEFAULT_CONFIG_PATH
+    config = config or Config.from_file(config_path)
+
+    # Parsed first because the devices are built (and simulated) before the commands are defined
+    simulation_parser = argparse.ArgumentParser(add_help=False)
+    simulation_group = simulation_parser.add_argument_group("simulation")
+    simulation_group.add_argument(
+        "--simulate", action="store_true", help="Use simulated devices instead of the hardware"
+    )
+    simulation_group.add_argument(
+        "--replay", type=str, help="Replay the readings of a trace recorded with serve --record"
+    )
+    simulation_group.add_argument(
+        "--speed", type=float, help="Run simulated and replayed time this many times faster", default=1.0
+    )
+    simulation_group.add_argument(
+        "--latency", type=float, help="Seconds every simulated read or write takes", default=0.0
+    )
+    simulation_group.add_argument(
+        "--jitter", type=float, help="Random extra seconds added to the latency", default=0.0
+    )
+    simulation_group.add_argument(
+        "--failure-rate", type=float, help="Probability of a simulated read or write failing", default=0.0
+    )
+    simulation_group.add_argument("--seed", type=int, help="Seed of the simulated readings")
+    simulation_group.add_argument("--scale", type=int, help="Simulate this many copies of every device", default=1)
+    simulation_args, _ = simulation_parser.parse_known_args()
+
+    config, simulation = create_simulation(config, **simulation_args.__dict__)
+    api = Api(config=config, simulation=simulation)
     read_devices, write_devices = api.read_devices, api.write_devices
 
-    parser = argparse.ArgumentParser(description="Battery management system")
+    parser = argparse.ArgumentParser(description="Battery management system", parents=[simulation_parser])
     subparsers = parser.add_subparsers(dest="command", help="Sub-commands")
 
     read_parser = subparsers.add_parser("read", help="Read device data")
@@ -65,10 +406,26 @@ def main(config: Optional[Config] = None):
         "-f",
         "--format",
         type=str,
-        help="Output format",
-        choices=[f.value for f in OutputFormat],
-        default=OutputFormat.YAML.value,
+        help="Output format (default: yaml, or ndjson with --follow)",
+        choices=[f.value for f in OutputFormat] + [f.value for f in StreamFormat],
+    )
+    read_parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        help="Read devices concurrently using up to this many workers",
+    )
+    read_parser.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        help="Give up on a device after this many seconds (implies concurrent reads)",
     )
+    read_parser.add_argument(
+        "--follow", action="store_true", help="Keep reading the devices and stream the readings, one per line"
+    )
+    read_parser.add_argument("--interval", type=float, help="Seconds between reads with --follow", default=1.0)
+    read_parser.add_argument("-n", "--count", type=int, help="Stop after this many reads with --follow")
 
     write_parser = subparsers.add_parser("write", help="Write device data")
     write_parser.add_argument(
@@ -76,15 +433,144 @@ def main(config: Optional[Config] = None):
     )
     write_parser.add_argument("value", type=str, help="Value to write")
 
+    display_parser = subparsers.add_parser("display", help="Show live readings on a display")
+    display_parser.add_argument(
+        "device_name", metavar="device", type=str, help="Name of the display", choices=list(write_devices.keys())
+    )
+    display_parser.add_argument(
+        "template", type=str, help="Text to show, with fields such as {mppt[battery][soc]} and \\n between lines"
+    )
+    display_parser.add_argument("--fps", type=float, help="Number of frames drawn per second", default=1.0)
+    display_parser.add_argument("-n", "--frames", type=int, help="Stop after drawing this many frames")
+    display_parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Report the writes of every frame to stderr"
+    )
+
+    serve_parser = subparsers.add_parser("serve", help="Poll devices continuously")
+    serve_parser.add_argument(
+        "-i",
+        "--interval",
+        type=float,
+        help="Polling interval in seconds for devices that do not configure one (default: 10)",
+    )
+    serve_parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        help="Read due devices concurrently using up to this many workers",
+    )
+    serve_parser.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        help="Give up on a device read after this many seconds",
+    )
+    serve_parser.add_argument(
+        "--history-size",
+        type=int,
+        help="Number of samples kept in memory for each device metric (default: 3600)",
+    )
+    serve_parser.add_argument(
+        "--history-dir",
+        type=str,
+        help="Directory where readings are persisted (default: ~/.local/share/pybattery/history)",
+    )
+    serve_parser.add_argument("--no-history", action="store_true", help="Do not persist readings to disk")
+    serve_parser.add_argument("--retention", type=float, help="Number of days of persisted readings to keep")
+    serve_parser.add_argument(
+        "--rollup-backfill",
+        type=float,
+        help="Number of days of persisted readings replayed into the rollups at startup",
+        default=1.0,
+    )
+    serve_parser.add_argument(
+        "--http-port", type=int, help="Serve readings as JSON, and as Prometheus metrics, over HTTP on this port"
+    )
+    serve_parser.add_argument("--http-host", type=str, help="Address the HTTP server binds to (default: 127.0.0.1)")
+    serve_parser.add_argument(
+        "--dbus",
+        type=str,
+        help="Publish the in.sebmart.pybattery service on this D-Bus bus",
+        choices=["system", "session"],
+    )
+    serve_parser.add_argument("--record", type=str, help="Append every reading to this trace file, for --replay")
+    serve_parser.add_argument(
+        "--no-reload", action="store_true", help="Do not reload the config when the file changes or on SIGHUP"
+    )
+    serve_parser.add_argument("-v", "--verbose", action="store_true", help="Log every reading to stderr")
+
+    history_parser = subparsers.add_parser("history", help="Show recorded device data")
+    history_parser.add_argument("device_name", metavar="device", type=str, help="Name of the device")
+    history_parser.add_argument("metric", type=str, help="Name of the metric, e.g. battery.soc")
+    history_parser.add_argument("--since", type=parse_time, help="Start time (epoch, ISO date or duration like 7d)")
+    history_parser.add_argument("--until", type=parse_time, help="End time (epoch, ISO date or duration like 1h)")
+    history_parser.add_argument(
+        "--history-dir",
+        type=str,
+        help="Directory where readings are persisted (default: ~/.local/share/pybattery/history)",
+    )
+    history_parser.add_argument(
+        "-f",
+        "--format",
+        type=str,
+        help="Output format",
+        choices=[f.value for f in OutputFormat],
+        default=OutputFormat.YAML.value,
+    )
+
+    export_parser = subparsers.add_parser("export", help="Export recorded device data to a file")
+    export_parser.add_argument("output", type=str, help="File to write, or - for stdout")
+    export_parser.add_argument(
+        "-d", "--device", dest="devices", metavar="DEVICE", action="append", help="Only export this device (repeatable)"
+    )
+    export_parser.add_argument("--since", type=parse_time, help="Start time (epoch, ISO date or duration like 7d)")
+    export_parser.add_argument("--until", type=parse_time, help="End time (epoch, ISO date or duration like 1h)")
+    export_parser.add_argument(
+        "--history-dir",
+        type=str,
+        help="Directory where readings are persisted (default: ~/.local/share/pybattery/history)",
+    )
+    export_parser.add_argument(
+        "-f",
+        "--format",
+        type=str,
+        help="File format (default: csv for .csv.gz files, columnar otherwise)",
+        choices=["columnar", "csv"],
+    )
+    export_parser.add_argument(
+        "--chunk-records",
+        type=int,
+        help="Number of samples per columnar chunk, which bounds memory use (default: 65536)",
+    )
+
     subparsers.add_parser("list", help="List available devices")
     subparsers.add_parser("list-types", help="List available device types")
     subparsers.add_parser("list-gpio", help="List available GPIO pins on the board")
 
     args = parser.parse_args().__dict__
     command = args.pop("command")
+    if command == "read" and args["follow"] and args["format"] in [f.value for f in OutputFormat]:
+        read_parser.error(f"cannot follow readings in {args['format']}, use one of: ndjson, csv")
+    for name in simulation_args.__dict__:
+        args.pop(name)
+    if command == "serve" and config_path:
+
+        def load_config() -> Config:
+            config = Config.from_file(config_path)
+            if simulation is not None:
+                from pybattery.simulation.backend import scale_config
+
+                config = scale_config(config, simulation_args.scale, simulation.sources)
+            return config
+
+        args.update(config_path=config_path, load_config=load_config)
     {
         "read": read,
         "write": write,
+        "display": display,
+        "serve": serve,
+        "history": history,
+        "export": export,
         "list": list_devices,
         "list-types": list_device_types,
         "list-gpio": api.list_gpio,
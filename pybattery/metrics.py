@@ -0,0 +1,97 @@
+import math
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from pybattery.api import Api
+from pybattery.models.config import Config
+from pybattery.models.utils import flatten_reading
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PREFIX = "pybattery_"
+
+_invalid_name_characters = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def metric_name(metric: str) -> str:
+    """Get the name of the gauge of a reading's metric, e.g. `pybattery_battery_voltage` for `battery.voltage`."""
+    return PREFIX + _invalid_name_characters.sub("_", metric)
+
+
+def label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(value)
+
+
+class MetricsRegistry:
+    """
+    Expose every numeric value of the device readings as Prometheus gauges.
+
+    Each metric of a reading (see `flatten_reading`) becomes a gauge named after it (`battery.voltage`
+    is `pybattery_battery_voltage`), with a sample per device labelled with the device name and its
+    description from the config. The registry is a `ReadingSink`: a poll only formats the samples of
+    the devices whose values changed, and the exposition text is rendered on the first scrape after a
+    change, so scrapes in between are served the same bytes. Devices removed from the config are
+    dropped on the first poll after a reload.
+    """
+
+    def __init__(self, api: Api):
+        self._api = api
+        self._config: Optional[Config] = None
+        self._lock = threading.Lock()
+        self._values: Dict[str, List[Tuple[str, float]]] = {}
+        self._samples: Dict[str, Dict[str, str]] = {}  # metric name -> device -> formatted sample line
+        self._texts: Dict[bool, bytes] = {}  # rendered text, by whether it is in the OpenMetrics format
+        self.stats: Dict[str, int] = {"updates": 0, "renders": 0}
+
+    def record(self, timestamp: float, readings: Dict[str, Any]) -> None:
+        """Update the samples of the devices whose values changed."""
+        with self._lock:
+            if self._api.config is not self._config:
+                self._config = self._api.config
+                for device_name, values in list(self._values.items()):  # descriptions may have changed
+                    self._update(device_name, values if device_name in self._config.devices else [])
+            for device_name, reading in readings.items():
+                values = list(flatten_reading(reading))
+                if values != self._values.get(device_name, []):
+                    self._update(device_name, values)
+
+    def render(self, openmetrics: bool = False) -> bytes:
+        """Get the exposition text, in the OpenMetrics format if `openmetrics` is set."""
+        with self._lock:
+            if (text := self._texts.get(openmetrics)) is None:
+                lines = []
+                for name in sorted(self._samples):
+                    lines += [f"# HELP {name} Device reading.", f"# TYPE {name} gauge"]
+                    samples = self._samples[name]
+                    lines += [samples[device_name] for device_name in sorted(samples)]
+                if openmetrics:
+                    lines.append("# EOF")
+                text = self._texts[openmetrics] = "".join(line + "\n" for line in lines).encode()
+                self.stats["renders"] += 1
+            return text
+
+    def _update(self, device_name: str, values: List[Tuple[str, float]]) -> None:
+        for samples in self._samples.values():
+            samples.pop(device_name, None)
+        if values:
+            device_config = self._config.devices.get(device_name) if self._config else None
+            description = device_config.description if device_config else ""
+            labels = f'{{device="{label_value(device_name)}",description="{label_value(description)}"}}'
+            for metric, value in values:
+                name = metric_name(metric)
+                self._samples.setdefault(name, {})[device_name] = f"{name}{labels} {format_value(value)}"
+            self._values[device_name] = values
+        else:
+            self._values.pop(device_name, None)
+        self._samples = {name: samples for name, samples in self._samples.items() if samples}
+        self._texts = {}
+        self.stats["updates"] += 1
@@ -4,31 +4,78 @@ from typing import Any, Dict, Optional, Union
 
 import yaml
 
+from pybattery.models import config_cache
 from pybattery.models.utils import from_dict
 
+DEFAULT_CONFIG_PATH = os.path.abspath(f"{os.path.dirname(__file__)}/../../config.yml")
+
+# The C loader (libyaml) is several times faster, when PyYAML was built with it
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 @dataclass
 class DeviceConfig:
-    def __init__(self, description: str, type: str, args: Optional[Dict[str, Any]] = None):
+    def __init__(
+        self,
+        description: str,
+        type: str,
+        args: Optional[Dict[str, Any]] = None,
+        interval: Optional[float] = None,
+    ):
         self.description = description
         self.type = type
         self.args = args or {}
+        self.interval = interval
 
     description: str
     type: str
     args: Dict[str, Any] = field(default_factory=dict)
+    interval: Optional[float] = None  # Polling interval in seconds when running `pybattery serve`
+
+
+@dataclass
+class AlertConfig:
+    """
+    A condition on a device metric, e.g. `battery.voltage` of `mppt` `below: 11.8`.
+
+    Threshold rules (`above` and/or `below`) are active while the value is beyond a threshold and
+    clear once it is back past the threshold by `hysteresis`. With `rate: true` the thresholds
+    apply to the rate of change of the value, per second, instead, measured over the last `window`
+    seconds (300 by default) so that a single step of a coarse value does not trip it. Change rules (`deadband`
+    without thresholds) fire whenever the value moved by at least `deadband` since it last fired.
+    """
+
+    device: str
+    metric: str  # Dotted path in the reading, e.g. battery.voltage
+    above: Optional[float] = None
+    below: Optional[float] = None
+    hysteresis: Optional[float] = None
+    rate: Optional[bool] = None
+    window: Optional[float] = None  # Seconds the rate of change is measured over
+    deadband: Optional[float] = None
+    message: Optional[str] = None
 
 
 @dataclass
 class Config:
     devices: Dict[str, DeviceConfig]
+    cache_ttl: Optional[Dict[str, float]] = None  # Seconds a reading is reused for, by device type
+    alerts: Optional[Dict[str, AlertConfig]] = None  # Rules evaluated on every poll, by name
+    write_interval: Optional[Dict[str, float]] = None  # Minimum seconds between two writes, by device type
+    isolated: Optional[Dict[str, bool]] = None  # Whether to run devices in a worker process, by device type
 
     @classmethod
-    def from_file(cls, config_path: Union[str, None] = None) -> "Config":
-        """Read the configuration file."""
-        config_path = config_path or os.path.abspath(f"{os.path.dirname(__file__)}/../../config.yml")
+    def from_file(cls, config_path: Union[str, None] = None, cache: bool = True) -> "Config":
+        """
+        Read the configuration file, or the config parsed from it the last time it was read if it has
+        not changed since (see `config_cache`).
+        """
+        config_path = config_path or DEFAULT_CONFIG_PATH
         if not os.path.exists(config_path):
             raise FileNotFoundError(f"Configuration file not found at: {config_path}")
-        with open(config_path, "r") as config_file:
-            config = yaml.safe_load(config_file)
-        return from_dict(Config, config)
+        return config_cache.load_cached(config_path, cls.parse, config_cache.cache_dir() if cache else None)
+
+    @classmethod
+    def parse(cls, content: Union[str, bytes]) -> "Config":
+        """Parse the YAML content of a configuration file."""
+        return from_dict(cls, yaml.load(content, Loader=SafeLoader))
@@ -0,0 +1,107 @@
+import dataclasses
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_CACHE_DIR = os.path.expanduser("~/.cache/pybattery")
+
+# Bump when the layout of the entries changes. Configs parsed while the config dataclasses had other
+# fields are detected by `has_stale_fields`, so adding a field does not need a bump.
+CACHE_VERSION = 2
+
+
+def cache_dir() -> Optional[str]:
+    """
+    Get the directory of the parsed configs: `$PYBATTERY_CACHE_DIR`, `$XDG_CACHE_HOME/pybattery` or
+    `~/.cache/pybattery`. An empty `PYBATTERY_CACHE_DIR` turns caching off.
+    """
+    if (directory := os.environ.get("PYBATTERY_CACHE_DIR")) is not None:
+        return directory or None
+    if xdg_cache_home := os.environ.get("XDG_CACHE_HOME"):
+        return os.path.join(xdg_cache_home, "pybattery")
+    return DEFAULT_CACHE_DIR
+
+
+def load_cached(path: str, parse: Callable[[bytes], T], directory: Optional[str]) -> T:
+    """
+    Get the result of `parse` on the content of the file at `path`, from the cache in `directory`
+    when the file has not changed since it was cached.
+
+    An entry is used without reading the file when the file's mtime and size are those it was
+    cached with, or after hashing the file when only its mtime changed (a checkout or a `touch`).
+    Anything wrong with the cache (missing, corrupt, read-only, from another version) falls back to
+    parsing the file, so the cache can always be deleted.
+    """
+    if directory is None:
+        with open(path, "rb") as file:
+            return parse(file.read())
+
+    path = os.path.abspath(path)
+    entry_path = os.path.join(directory, hashlib.sha256(path.encode()).hexdigest()[:32] + ".pickle")
+    stat = os.stat(path)
+    entry = read_entry(entry_path)
+    if entry and (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+        return entry["value"]
+
+    with open(path, "rb") as file:
+        content = file.read()
+    digest = hashlib.sha256(content).hexdigest()
+    value = entry["value"] if entry and entry["sha256"] == digest else parse(content)
+    write_entry(
+        entry_path,
+        {
+            "version": CACHE_VERSION,
+            "path": path,
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": digest,
+            "value": value,
+        },
+    )
+    return value
+
+
+def read_entry(entry_path: str) -> Optional[dict]:
+    try:
+        with open(entry_path, "rb") as file:
+            entry = pickle.load(file)
+    except Exception:  # missing, truncated or written by classes that no longer exist
+        return None
+    if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION or has_stale_fields(entry.get("value")):
+        return None
+    return entry
+
+
+def has_stale_fields(value: Any) -> bool:
+    """
+    Check whether `value` holds a dataclass pickled with other fields than its class has now: a field
+    added since would otherwise silently read as its class default.
+    """
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        fields = [field.name for field in dataclasses.fields(value)]
+        return set(vars(value)) != set(fields) or any(has_stale_fields(getattr(value, name)) for name in fields)
+    if isinstance(value, dict):
+        return any(has_stale_fields(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(has_stale_fields(item) for item in value)
+    return False
+
+
+def write_entry(entry_path: str, entry: Any) -> None:
+    """Write a cache entry atomically, so that concurrent CLI invocations never read half of one."""
+    try:
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, entry_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except OSError:
+        pass  # the cache only saves time
@@ -1,11 +1,31 @@
+from typing import TYPE_CHECKING, Optional
+
 from pybattery.models.config import DeviceConfig
 
+if TYPE_CHECKING:
+    from pybattery.connections import ConnectionPool
+
 
 class Device:
+    cache_ttl: float = 0.0  # Default number of seconds a reading can be reused for
+    write_interval: float = 0.0  # Default minimum number of seconds between two writes
+    isolated: bool = False  # Whether to run in a worker process by default (see `IsolatedDevice`)
+
     def __init__(self, config: DeviceConfig):
         self._config = config
 
     @property
     def description(self) -> str:
         """Get the device description."""
-        return self._config.description
\ No newline at end of file
+        return self._config.description
+
+
+class SerialDevice(Device):
+    """
+    A device reached over a serial port. The `Api` sets `connections` to its connection pool so
+    that the port stays open between reads and is shared with the other devices on the same bus.
+    Drivers set `serial_port` so that the `Api` can close the port once no device uses it anymore.
+    """
+
+    connections: Optional["ConnectionPool"] = None
+    serial_port: Optional[str] = None
@@ -1,39 +1,83 @@
 from dataclasses import fields, is_dataclass
-from typing import TypeVar, Type, get_origin, get_args
+from functools import lru_cache
+from typing import Any, FrozenSet, Iterator, Optional, Tuple, TypeVar, Type, Union, get_origin, get_args
 
 T = TypeVar("T")
 
+# How `from_dict` converts the value of a field
+VALUE = 0  # as is
+NESTED = 1  # a dataclass
+LIST = 2  # List[SomeDataclass]
+DICT = 3  # Dict[str, SomeDataclass]
 
-def from_dict(cls: Type[T], data: dict) -> T:
-    if not is_dataclass(cls):
-        raise TypeError(f"Expected a dataclass, got {cls}")
-
-    fieldtypes = {f.name: f.type for f in fields(cls)}
-    extras = {k: v for k, v in data.items() if k not in fieldtypes.keys()}
-    kwargs = {}
-    for field_name, field_type in fieldtypes.items():
-        value = data.get(field_name)
-
-        if value is None and field_name == "args" and extras:
-            value = extras
-
-        if value is None:
-            kwargs[field_name] = None
-            continue
 
+@lru_cache(maxsize=None)
+def type_plan(cls: type) -> Tuple[FrozenSet[str], Tuple[Tuple[str, int, Optional[type]], ...]]:
+    """
+    Get the field names of a dataclass and, for every field, how to convert its value: the kind of
+    conversion and the dataclass to build, if any. Computed once per class, as resolving the types
+    of the fields is most of the cost of `from_dict` for configs with many devices.
+    """
+    plan = []
+    for f in fields(cls):
+        field_type = f.type
         origin = get_origin(field_type)
         args = get_args(field_type)
 
-        # Handle List[SomeDataclass]
+        # Handle Optional[...] like the type it wraps
+        if origin is Union and len(args) == 2 and type(None) in args:
+            field_type = next(arg for arg in args if arg is not type(None))
+            origin = get_origin(field_type)
+            args = get_args(field_type)
+
         if origin is list and is_dataclass(args[0]):
-            kwargs[field_name] = [from_dict(args[0], item) for item in value]  # type: ignore
-        # Handle Dict[str, SomeDataclass]
+            plan.append((f.name, LIST, args[0]))
         elif origin is dict and is_dataclass(args[1]):
-            kwargs[field_name] = {k: from_dict(args[1], v) for k, v in value.items()}  # type: ignore
-        # Handle nested dataclass
+            plan.append((f.name, DICT, args[1]))
         elif is_dataclass(field_type):
-            kwargs[field_name] = from_dict(field_type, value)  # type: ignore
+            plan.append((f.name, NESTED, field_type))
         else:
+            plan.append((f.name, VALUE, None))
+    return frozenset(name for name, _, _ in plan), tuple(plan)
+
+
+def from_dict(cls: Type[T], data: dict) -> T:
+    if not is_dataclass(cls):
+        raise TypeError(f"Expected a dataclass, got {cls}")
+
+    names, plan = type_plan(cls)
+    kwargs = {}
+    for field_name, kind, field_class in plan:
+        value = data.get(field_name)
+
+        if value is None and field_name == "args":
+            value = {k: v for k, v in data.items() if k not in names} or None
+
+        if value is None or kind == VALUE:
             kwargs[field_name] = value
+        elif kind == LIST:
+            kwargs[field_name] = [from_dict(field_class, item) for item in value]  # type: ignore
+        elif kind == DICT:
+            kwargs[field_name] = {k: from_dict(field_class, v) for k, v in value.items()}  # type: ignore
+        else:
+            kwargs[field_name] = from_dict(field_class, value)  # type: ignore
 
     return cls(**kwargs)
+
+
+def flatten_reading(reading: Any, prefix: str = "", numeric: bool = True) -> Iterator[Tuple[str, Any]]:
+    """
+    Yield a `(metric, value)` pair for every numeric value in a device reading.
+
+    Nested dicts are flattened into dotted metric names (e.g. `battery.voltage`), booleans become
+    0.0/1.0 and non-numeric values (strings, None, error messages) are skipped. A reading that is
+    a bare number is reported under the `value` metric. With `numeric` False, every value is
+    yielded as it is instead, for text outputs such as CSV.
+    """
+    if isinstance(reading, dict):
+        for key, value in reading.items():
+            yield from flatten_reading(value, f"{prefix}.{key}" if prefix else str(key), numeric)
+    elif not numeric:
+        yield prefix or "value", reading
+    elif isinstance(reading, (bool, int, float)):
+        yield prefix or "value", float(reading)
@@ -1,5 +1,16 @@
-from enum import Enum
+import csv
+import io
+import json
 import sys
+from enum import Enum
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+import yaml
+
+from pybattery.models.utils import flatten_reading
+
+# Seconds of readings held back while waiting for a good reading of every device to define the CSV columns
+MAX_HEADER_DELAY = 10.0
 
 
 class OutputFormat(Enum):
@@ -8,6 +19,14 @@ class OutputFormat(Enum):
     JSON = "json"
     YAML = "yaml"
 
+
+class StreamFormat(Enum):
+    """Enum for line-oriented formats, written one record at a time."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
 class OutputWriter:
     def __init__(self, output_format: OutputFormat):
         self.output_format = output_format
@@ -15,10 +34,91 @@ class OutputWriter:
     def write(self, data: dict, fd=None):
         fd = fd or sys.stdout
         if self.output_format == OutputFormat.JSON:
-            import json
             json.dump(data, indent=2, fp=fd)
         elif self.output_format == OutputFormat.YAML:
-            import yaml
             print(yaml.dump(data, default_flow_style=False), file=fd)
         else:
-            raise ValueError(f"Unsupported format: {self.output_format}")
\ No newline at end of file
+            raise ValueError(f"Unsupported format: {self.output_format}")
+
+
+class StreamWriter:
+    """
+    Write readings as a stream of records, one line per call to `write`, for piping into other tools.
+
+    NDJSON records are compact JSON objects: `{"timestamp": ..., "<device>": {...}}`. CSV records
+    are rows under a header with a `timestamp` column and a column per value of the first good
+    reading of each device, named `<device>.<key>.<key>`; values that show up later are left out and
+    missing values are left empty so that the columns never change. A failed read (`{"error": ...}`)
+    does not define columns: records are held back until every device of the first record has
+    been read once, or the records span `MAX_HEADER_DELAY` seconds (so at most one record when
+    they are further apart), and `close` writes any records still held back. Each record is
+    written and flushed at once, so a reader never sees a partial line.
+    """
+
+    def __init__(self, output_format: StreamFormat, fd: Optional[TextIO] = None):
+        self.output_format = output_format
+        self._fd = fd
+        self.columns: Optional[List[str]] = None
+        self._device_columns: Dict[str, Optional[List[str]]] = {}  # by device, until the header is written
+        self._held_back: List[Tuple[float, Dict[str, Any]]] = []
+
+    @property
+    def fd(self) -> TextIO:
+        return self._fd or sys.stdout
+
+    def write(self, timestamp: float, readings: Dict[str, Any]) -> None:
+        """Write the readings of the devices, keyed by device name, sampled at `timestamp`."""
+        if self.output_format == StreamFormat.NDJSON:
+            line = json.dumps({"timestamp": timestamp, **readings}, separators=(",", ":"), default=str) + "\n"
+        elif self.output_format == StreamFormat.CSV:
+            line = self._csv_record(timestamp, readings)
+        else:
+            raise ValueError(f"Unsupported format: {self.output_format}")
+        if line:
+            self.fd.write(line)
+            self.fd.flush()
+
+    def close(self) -> None:
+        """Write the CSV records still held back for the header, if any."""
+        if self._held_back:
+            self.fd.write(self._csv_records([]))
+            self.fd.flush()
+
+    def _csv_record(self, timestamp: float, readings: Dict[str, Any]) -> str:
+        if self.columns is None:
+            for device_name, reading in readings.items():
+                if self._device_columns.get(device_name) is None:
+                    self._device_columns[device_name] = (
+                        None if is_error(reading) else [key for key, _ in flatten_reading(reading, device_name, False)]
+                    )
+            self._held_back.append((timestamp, readings))
+            if None in self._device_columns.values() and timestamp - self._held_back[0][0] < MAX_HEADER_DELAY:
+                return ""
+            return self._csv_records([])
+        return self._csv_records([(timestamp, readings)])
+
+    def _csv_records(self, records: List[Tuple[float, Dict[str, Any]]]) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if self.columns is None:
+            self.columns = [column for columns in self._device_columns.values() for column in columns or []]
+            writer.writerow(["timestamp", *self.columns])
+            records, self._held_back, self._device_columns = self._held_back + records, [], {}
+        for timestamp, readings in records:
+            values = dict(flatten_reading(readings, numeric=False))
+            writer.writerow([timestamp, *(csv_value(values.get(column)) for column in self.columns)])
+        return buffer.getvalue()
+
+
+def is_error(reading: Any) -> bool:
+    """Check whether a reading is a failed read, as reported by `Api.read_all`: `{"error": "..."}`."""
+    return reading is None or (isinstance(reading, dict) and list(reading) == ["error"])
+
+
+def csv_value(value: Any) -> Any:
+    """Get the CSV cell of a value: empty for None, `;`-separated for lists."""
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return ";".join(str(item) for item in value)
+    return value
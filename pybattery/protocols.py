@@ -31,3 +31,44 @@ class WritableDeviceType(Protocol):
     def write(self, value: Any) -> None:
         """Write a value to the component."""
         ...
+
+
+@runtime_checkable
+class ReadingSink(Protocol):
+    def record(self, timestamp: float, readings: Dict[str, Any]) -> None:
+        """Record readings sampled at `timestamp` (seconds since the epoch), keyed by device name."""
+        ...
+
+
+@runtime_checkable
+class AsyncReadableDeviceType(Protocol):
+    """A readable device whose `read` is a coroutine, e.g. a driver doing non-blocking I/O."""
+
+    def __init__(self, config: DeviceConfig):
+        pass
+
+    @property
+    def description(self) -> str:
+        """Get the device description."""
+        ...
+
+    async def read(self) -> Optional[Dict[str, Any]]:
+        """Read the component's value."""
+        ...
+
+
+@runtime_checkable
+class AsyncWritableDeviceType(Protocol):
+    """A writable device whose `write` is a coroutine."""
+
+    def __init__(self, config: DeviceConfig):
+        pass
+
+    @property
+    def description(self) -> str:
+        """Get the device description."""
+        ...
+
+    async def write(self, value: Any) -> None:
+        """Write a value to the component."""
+        ...
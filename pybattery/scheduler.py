@@ -0,0 +1,71 @@
+import heapq
+import math
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class Scheduler:
+    """
+    Keep track of when each named job is next due, given its own fixed interval.
+
+    Deadlines are anchored to the time the job was added (`start + n * interval`) rather than to
+    when the previous run finished, so slow runs do not make the schedule drift. When a job falls
+    more than one interval behind, the missed ticks are skipped (and counted in `skipped`) instead
+    of being run back to back.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._intervals: Dict[str, float] = {}
+        self._next_runs: Dict[str, float] = {}
+        self._queue: List[Tuple[float, str]] = []
+        self.skipped: Dict[str, int] = {}
+
+    @property
+    def jobs(self) -> Dict[str, float]:
+        """Get the interval of every scheduled job."""
+        return dict(self._intervals)
+
+    def add(self, name: str, interval: float, start: Optional[float] = None) -> None:
+        """Schedule `name` every `interval` seconds, first due at `start` (now by default)."""
+        if interval <= 0:
+            raise ValueError(f"Interval for '{name}' must be positive, got {interval}")
+        next_run = self._clock() if start is None else start
+        self._intervals[name] = interval
+        self._next_runs[name] = next_run
+        self.skipped.setdefault(name, 0)
+        heapq.heappush(self._queue, (next_run, name))
+
+    def remove(self, name: str) -> None:
+        """Unschedule `name`; stale queue entries are discarded lazily."""
+        self._intervals.pop(name, None)
+        self._next_runs.pop(name, None)
+        self.skipped.pop(name, None)
+
+    def next_deadline(self) -> Optional[float]:
+        """Get the clock time at which the next job is due, or None if nothing is scheduled."""
+        self._discard_stale()
+        return self._queue[0][0] if self._queue else None
+
+    def due(self) -> List[str]:
+        """Return the jobs that are due now and advance each of them to its next tick."""
+        now = self._clock()
+        names = []
+        self._discard_stale()
+        while self._queue and self._queue[0][0] <= now:
+            deadline, name = heapq.heappop(self._queue)
+            interval = self._intervals[name]
+            next_run = deadline + interval
+            if next_run <= now:
+                missed = math.floor((now - next_run) / interval) + 1
+                self.skipped[name] += missed
+                next_run += missed * interval
+            self._next_runs[name] = next_run
+            heapq.heappush(self._queue, (next_run, name))
+            names.append(name)
+            self._discard_stale()
+        return names
+
+    def _discard_stale(self) -> None:
+        while self._queue and self._next_runs.get(self._queue[0][1]) != self._queue[0][0]:
+            heapq.heappop(self._queue)
@@ -0,0 +1,147 @@
+import abc
+import random
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from pybattery.models.config import Config, DeviceConfig
+from pybattery.models.device import Device
+
+
+class SimulatedFailure(RuntimeError):
+    """Raised by a simulated device to stand in for a hardware error."""
+
+
+@dataclass
+class SimulationSettings:
+    latency: float = 0.0  # Seconds every read or write takes
+    jitter: float = 0.0  # Extra seconds added to the latency, uniformly distributed in [0, jitter]
+    failure_rate: float = 0.0  # Probability of a read or write raising `SimulatedFailure`
+    speed: float = 1.0  # How much faster than real time simulated (and replayed) time goes by
+
+    def merged(self, overrides: Dict[str, Any]) -> "SimulationSettings":
+        """Get a copy of the settings with the given fields replaced, e.g. from a device's `simulation` args."""
+        return replace(self, **overrides)
+
+
+class SimulatedDevice(Device):
+    """
+    Base class of the devices that stand in for hardware. `simulate_io()` waits for the configured
+    latency and fails at the configured rate; `now()` is the simulated time, which starts at the
+    real time and then goes by `speed` times faster.
+    """
+
+    def __init__(
+        self,
+        config: DeviceConfig,
+        settings: Optional[SimulationSettings] = None,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        super().__init__(config)
+        self.settings = settings or SimulationSettings()
+        self.random = rng or random.Random()
+        self.io_stats: Dict[str, int] = {"operations": 0, "failures": 0}
+        self._started = time.time()
+
+    def now(self) -> float:
+        """Get the simulated time in seconds since the epoch."""
+        return self._started + (time.time() - self._started) * self.settings.speed
+
+    def simulate_io(self) -> None:
+        """Take as long as the hardware would and fail as often."""
+        self.io_stats["operations"] += 1
+        delay = self.settings.latency + self.random.uniform(0, self.settings.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if self.settings.failure_rate and self.random.random() < self.settings.failure_rate:
+            self.io_stats["failures"] += 1
+            raise SimulatedFailure(f"Simulated failure of '{self.description}'")
+
+
+class SimulatedSensor(SimulatedDevice, metaclass=abc.ABCMeta):
+    """A simulated readable device, whose readings are produced by `sample()`."""
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Read the component's value."""
+        self.simulate_io()
+        return self.sample()
+
+    @abc.abstractmethod
+    def sample(self) -> Optional[Dict[str, Any]]:
+        """Produce the reading of the device at the current simulated time."""
+
+
+class Simulation:
+    """
+    Build simulated devices in place of the hardware drivers, for `Api(config, simulation=...)`.
+
+    Devices whose name appears in `trace` replay their recorded readings, as do the copies made by
+    `scale_config` of a device in `trace` (`sources` maps each copy to the device it was made from);
+    the others generate readings with the simulator of their device type. Settings can be overridden per device with
+    a `simulation` mapping in its config args, e.g. `simulation: {latency: 0.5, failure_rate: 0.1}`.
+    """
+
+    def __init__(
+        self,
+        settings: Optional[SimulationSettings] = None,
+        trace: Optional[Dict[str, List[Tuple[float, Any]]]] = None,
+        seed: Optional[int] = None,
+        sources: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.settings = settings or SimulationSettings()
+        self.trace = trace or {}
+        self.sources = {} if sources is None else sources
+        self._seed = seed
+        self._random = random.Random(seed)
+
+    @property
+    def device_types(self) -> Mapping[str, type]:
+        """Get the simulated device types by the name of the device type they stand in for."""
+        from pybattery.simulation.devices import SIMULATED_DEVICE_TYPES
+
+        return SIMULATED_DEVICE_TYPES
+
+    def device_type(self, name: str, config: DeviceConfig) -> Optional[type]:
+        """Get the class `create` builds a configured device with, or None if its type cannot be simulated."""
+        from pybattery.simulation.trace import ReplayDevice
+
+        if self._samples(name):
+            return ReplayDevice
+        return self.device_types.get(config.type)
+
+    def create(self, name: str, config: DeviceConfig) -> Optional[Device]:
+        """Build the simulated device for a configured device, or None if its type cannot be simulated."""
+        from pybattery.simulation.trace import ReplayDevice
+
+        settings = self.settings.merged(config.args.get("simulation", {}))
+        # One generator per device, for thread safety, seeded by name so that the order devices are
+        # built in does not matter
+        rng = random.Random(f"{self._seed}/{name}" if self._seed is not None else self._random.getrandbits(64))
+        if samples := self._samples(name):
+            return ReplayDevice(config, samples, settings=settings, rng=rng)
+        if device_type := self.device_types.get(config.type):
+            return device_type(config, settings=settings, rng=rng)
+        return None
+
+    def _samples(self, name: str) -> Optional[list]:
+        if name in self.trace:
+            return self.trace[name]
+        # Copies made by `scale_config` replay the trace of the device they were copied from
+        return self.trace.get(self.sources[name]) if name in self.sources else None
+
+
+def scale_config(config: Config, copies: int, sources: Optional[Dict[str, str]] = None) -> Config:
+    """
+    Get a config with `copies` copies of every device, named `<name>-1` to `<name>-<copies>`, and
+    record the device each copy was made from in `sources`, if set.
+    """
+    if copies <= 1:
+        return config
+    devices = {
+        f"{name}-{copy}": (name, device_config)
+        for name, device_config in config.devices.items()
+        for copy in range(1, copies + 1)
+    }
+    if sources is not None:
+        sources.update((copy_name, name) for copy_name, (name, _) in devices.items())
+    return replace(config, devices={copy_name: device_config for copy_name, (_, device_config) in devices.items()})
@@ -0,0 +1,187 @@
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from pybattery.device_types.lcd import LCD_COLUMNS, LCD_ROWS, LcdDevice
+from pybattery.device_types.relay import RelayDevice
+from pybattery.device_types.renogy_rover.registers import STATE, STATUS, decode
+from pybattery.simulation.backend import SimulatedDevice, SimulatedSensor
+
+
+def daylight(timestamp: float) -> float:
+    """Get how high the sun is at a local time, from 0 (night) to 1 (noon)."""
+    local = time.localtime(timestamp)
+    hour = local.tm_hour + local.tm_min / 60 + local.tm_sec / 3600
+    return max(0.0, math.sin(math.pi * (hour - 6) / 12))
+
+
+def warmth(timestamp: float) -> float:
+    """Get the daily temperature cycle at a local time, from -1 (around 3:00) to 1 (around 15:00)."""
+    local = time.localtime(timestamp)
+    hour = local.tm_hour + local.tm_min / 60
+    return math.sin(math.pi * (hour - 9) / 12)
+
+
+class SimulatedDht11(SimulatedSensor):
+    """Simulated DHT11 temperature and humidity sensor (1°C and 1% resolution)."""
+
+    cache_ttl = 2.0
+
+    def sample(self) -> Optional[Dict[str, Any]]:
+        cycle = warmth(self.now())
+        return {
+            "temperature": float(round(21 + 2 * cycle + self.random.gauss(0, 0.3))),
+            "humidity": float(round(45 - 8 * cycle + self.random.gauss(0, 1))),
+        }
+
+
+class SimulatedThermometer(SimulatedSensor):
+    """Simulated 1-Wire thermometer (1/16°C resolution)."""
+
+    def sample(self) -> Optional[Dict[str, Any]]:
+        temperature = 12 + 6 * warmth(self.now()) + self.random.gauss(0, 0.05)
+        return {"temperature": round(temperature * 16) / 16}
+
+
+class SimulatedRenogyRover(SimulatedSensor):
+    """
+    Simulated Renogy Rover MPPT controller charging a 100Ah 12V battery from a 400W array.
+
+    Readings are produced as Modbus registers and decoded by the real driver's `decode`, so they
+    have the same shape and resolution as the hardware's.
+    """
+
+    panel_watts = 400
+    battery_watt_hours = 1200
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._soc = self.random.uniform(50, 90)
+        self._clouds = 1.0
+        self._last_sample: Optional[float] = None
+        self._today = {"charging_ah": 0.0, "discharging_ah": 0.0, "generation_wh": 0.0, "consumption_wh": 0.0}
+        self._extremes = {"min_voltage": math.inf, "max_voltage": 0.0, "max_charging_power": 0, "max_load_power": 0}
+
+    def sample(self) -> Optional[Dict[str, Any]]:
+        return decode(self.registers())
+
+    def registers(self) -> List[int]:
+        """Advance the simulation to the current simulated time and get the registers of `BLOCK`."""
+        now = self.now()
+        hours = 0.0 if self._last_sample is None else (now - self._last_sample) / 3600
+        self._last_sample = now
+
+        self._clouds = min(1.0, max(0.3, self._clouds + self.random.gauss(0, 0.05)))
+        pv_power = round(self.panel_watts * daylight(now) * self._clouds) if self._soc < 100 else 0
+        load_power = round(self.random.uniform(15, 40))
+        self._soc = min(100.0, max(0.0, self._soc + (pv_power - load_power) * hours / self.battery_watt_hours * 100))
+
+        battery_voltage = 11.8 + self._soc * 0.018 + (0.4 if pv_power else 0.0)
+        pv_voltage = 17.5 + 2 * daylight(now) if pv_power else self.random.uniform(0, 2)
+        charging_current = pv_power / battery_voltage
+        load_current = load_power / battery_voltage
+        self._today["charging_ah"] += charging_current * hours
+        self._today["discharging_ah"] += load_current * hours
+        self._today["generation_wh"] += pv_power * hours
+        self._today["consumption_wh"] += load_power * hours
+        self._extremes["min_voltage"] = min(self._extremes["min_voltage"], battery_voltage)
+        self._extremes["max_voltage"] = max(self._extremes["max_voltage"], battery_voltage)
+        self._extremes["max_charging_power"] = max(self._extremes["max_charging_power"], pv_power)
+        self._extremes["max_load_power"] = max(self._extremes["max_load_power"], load_power)
+
+        controller_temperature = round(25 + pv_power / 40)
+        battery_temperature = round(20 + 3 * warmth(now))
+        charging_state = 0 if not pv_power else 2 if self._soc < 95 else 5  # deactivated, mppt or floating
+        status = [
+            round(self._soc),
+            round(battery_voltage * 10),
+            round(charging_current * 100),
+            signed_byte(controller_temperature) << 8 | signed_byte(battery_temperature),
+            round(battery_voltage * 10),
+            round(load_current * 100),
+            load_power,
+            round(pv_voltage * 10),
+            round(pv_power / pv_voltage * 100) if pv_power else 0,
+            pv_power,
+            0,
+            round(self._extremes["min_voltage"] * 10),
+            round(self._extremes["max_voltage"] * 10),
+            round(self._extremes["max_charging_power"] / battery_voltage * 100),
+            round(self._extremes["max_load_power"] / battery_voltage * 100),
+            self._extremes["max_charging_power"],
+            self._extremes["max_load_power"],
+            round(self._today["charging_ah"]),
+            round(self._today["discharging_ah"]),
+            round(self._today["generation_wh"]),
+            round(self._today["consumption_wh"]),
+        ]
+        state = [0x8000 | charging_state, 0, 0]
+        return status + [0] * (STATE.start - STATUS.stop) + state
+
+
+def signed_byte(value: int) -> int:
+    """Encode a temperature byte, where bit 7 is the sign and bits 0-6 the magnitude."""
+    return 0x80 | min(-value, 0x7F) if value < 0 else min(value, 0x7F)
+
+
+class CharLcdSimulator:
+    """Stand-in for an `RPLCD` `CharLCD`, keeping the characters on screen in `lines`."""
+
+    def __init__(self, cols: int = LCD_COLUMNS, rows: int = LCD_ROWS) -> None:
+        self.cols = cols
+        self.rows = rows
+        self.cursor_pos: Tuple[int, int] = (0, 0)
+        self.lines: List[str] = [" " * cols] * rows
+
+    def clear(self) -> None:
+        self.lines = [" " * self.cols] * self.rows
+        self.cursor_pos = (0, 0)
+
+    def write_string(self, value: str) -> None:
+        row, column = self.cursor_pos
+        line = self.lines[row]
+        text = value[: self.cols - column]
+        self.lines[row] = line[:column] + text + line[column + len(text) :]
+        self.cursor_pos = (row, column + len(value))
+
+
+class SimulatedLcd(SimulatedDevice, LcdDevice):
+    """Simulated 16x2 LCD display, showing the text written to it in `lines`."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._lcd = CharLcdSimulator()
+
+    @property
+    def lines(self) -> List[str]:
+        """Get the text on screen."""
+        return list(self._lcd.lines)  # type: ignore
+
+    def write(self, value: str, *other_lines) -> None:
+        self.simulate_io()
+        super().write(value, *other_lines)
+
+
+class SimulatedRelay(SimulatedDevice, RelayDevice):
+    """Simulated relay, keeping the level of its pin in `level` and the number of switches in `switches`."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.level: Optional[bool] = None
+        self.switches = 0
+
+    def _output(self, level: bool) -> None:
+        self.simulate_io()
+        self.switches += level != self.level
+        self.level = level
+
+
+# Simulated device types by the name of the device type they stand in for
+SIMULATED_DEVICE_TYPES: Dict[str, type] = {
+    "dht11": SimulatedDht11,
+    "ds12b20": SimulatedThermometer,
+    "ds18b20": SimulatedThermometer,
+    "lcd": SimulatedLcd,
+    "relay": SimulatedRelay,
+    "renogy_rover": SimulatedRenogyRover,
+}
@@ -0,0 +1,73 @@
+import bisect
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from pybattery.models.config import DeviceConfig
+from pybattery.simulation.backend import SimulatedSensor
+
+# A recorded reading of a device: (seconds since the epoch, reading)
+Sample = Tuple[float, Any]
+
+
+class TraceRecorder:
+    """
+    Record poll results as a trace, one JSON object per line: `{"timestamp": ..., "readings": {...}}`.
+
+    Use it as a sink of the daemon (`pybattery serve --record <path>`) on the real hardware, then
+    replay the trace anywhere with `pybattery --replay <path>`.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "a")
+
+    def record(self, timestamp: float, readings: Dict[str, Any]) -> None:
+        self._file.write(json.dumps({"timestamp": timestamp, "readings": readings}, default=str) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def load_trace(path: str) -> Dict[str, List[Sample]]:
+    """Load a trace written by `TraceRecorder` as the samples of every device, in time order."""
+    trace: Dict[str, List[Sample]] = {}
+    with open(path) as trace_file:
+        for line in trace_file:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            for device_name, reading in entry["readings"].items():
+                trace.setdefault(device_name, []).append((entry["timestamp"], reading))
+    for samples in trace.values():
+        samples.sort(key=lambda sample: sample[0])
+    return trace
+
+
+class ReplayDevice(SimulatedSensor):
+    """
+    Replay the recorded readings of a device, `speed` times faster than they were recorded. Each
+    `read()` returns the last reading recorded at or before the elapsed (accelerated) time since
+    the device was created; the trace starts over once it is exhausted.
+    """
+
+    def __init__(self, config: DeviceConfig, samples: List[Sample], *args, **kwargs) -> None:
+        super().__init__(config, *args, **kwargs)
+        if not samples:
+            raise ValueError(f"No recorded readings to replay for '{config.description}'")
+        self._timestamps = [timestamp - samples[0][0] for timestamp, _ in samples]
+        self._readings = [reading for _, reading in samples]
+        self._replay_started = time.monotonic()
+
+    @property
+    def duration(self) -> float:
+        """Get the number of seconds of recorded readings."""
+        return self._timestamps[-1]
+
+    def sample(self) -> Optional[Dict[str, Any]]:
+        elapsed = (time.monotonic() - self._replay_started) * self.settings.speed
+        if self.duration > 0:
+            # Each lap starts a little after the last sample so that it is replayed for a period too
+            elapsed %= self.duration + self.duration / max(len(self._timestamps) - 1, 1)
+        return self._readings[max(0, bisect.bisect_right(self._timestamps, elapsed) - 1)]
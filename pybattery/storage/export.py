@@ -0,0 +1,178 @@
+"""
+Export recorded readings to files for offline analysis.
+
+The columnar format is a sequence of chunks, each holding up to `chunk_records` samples grouped
+into one column per `(device, metric)` series, after an 8-byte magic (`MAGIC`):
+
+    uint32 little-endian header length
+    JSON header: {"records": n, "start": t, "end": t, "columns": [
+        {"device": "mppt", "metric": "battery.voltage", "rows": k,
+         "timestamps": {"type": "q", "encoding": "delta_us", "bytes": b},
+         "values": {"type": "d" or "q", "bytes": b}}, ...]}
+    for each column: its zlib-compressed timestamps, then its zlib-compressed values
+
+Arrays are little-endian, `q` being int64 and `d` float64, so that `numpy.frombuffer` reads them
+as they are. Timestamps are microseconds since the epoch, stored as the difference from the
+previous row (the first row holds its own), which compress to almost nothing for a fixed polling
+interval. Values are stored as integers when every value of the column in the chunk is one.
+"""
+import csv
+import gzip
+import io
+import json
+import struct
+import sys
+import zlib
+from array import array
+from typing import BinaryIO, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from pybattery.storage.history import HistoryStore
+
+MAGIC = b"PYBCOL1\n"
+HEADER_LENGTH = struct.Struct("<I")
+DEFAULT_CHUNK_RECORDS = 65536
+INT64_LIMIT = 2**63
+
+Column = Tuple[array, array]  # timestamps (microseconds), values
+
+
+def encode(values: array, level: int) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return zlib.compress(values.tobytes(), level)
+
+
+def decode(data: bytes, typecode: str) -> array:
+    values = array(typecode)
+    values.frombytes(zlib.decompress(data))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class ColumnarWriter:
+    """
+    Write samples to a binary stream in the columnar format, a chunk at a time.
+
+    At most `chunk_records` samples are held in memory (16 bytes each, in typed arrays), whatever
+    the number of samples written.
+    """
+
+    def __init__(self, fd: BinaryIO, chunk_records: int = DEFAULT_CHUNK_RECORDS, level: int = 6):
+        self._fd = fd
+        self._chunk_records = chunk_records
+        self._level = level
+        self._columns: Dict[Tuple[str, str], Column] = {}
+        self._records = 0
+        self.stats: Dict[str, int] = {"records": 0, "chunks": 0, "bytes": len(MAGIC)}
+        fd.write(MAGIC)
+
+    def write(self, device_name: str, metric: str, timestamp: float, value: float) -> None:
+        """Add a sample, writing a chunk once `chunk_records` samples are buffered."""
+        column = self._columns.get((device_name, metric))
+        if column is None:
+            column = self._columns[(device_name, metric)] = (array("q"), array("d"))
+        column[0].append(round(timestamp * 1_000_000))
+        column[1].append(value)
+        self._records += 1
+        if self._records >= self._chunk_records:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered samples as a chunk."""
+        if not self._records:
+            return
+        header: Dict = {"records": self._records, "start": None, "end": None, "columns": []}
+        blobs: List[bytes] = []
+        for (device_name, metric), (timestamps, values) in self._columns.items():
+            deltas = array("q", (b - a for a, b in zip(timestamps, timestamps[1:])))
+            deltas.insert(0, timestamps[0])
+            if all(value.is_integer() and -INT64_LIMIT <= value < INT64_LIMIT for value in values):
+                values = array("q", map(int, values))
+            blobs += [encode(deltas, self._level), encode(values, self._level)]
+            header["columns"].append(
+                {
+                    "device": device_name,
+                    "metric": metric,
+                    "rows": len(timestamps),
+                    "timestamps": {"type": "q", "encoding": "delta_us", "bytes": len(blobs[-2])},
+                    "values": {"type": values.typecode, "bytes": len(blobs[-1])},
+                }
+            )
+            first, last = min(timestamps) / 1_000_000, max(timestamps) / 1_000_000
+            header["start"] = first if header["start"] is None else min(header["start"], first)
+            header["end"] = last if header["end"] is None else max(header["end"], last)
+        header_bytes = json.dumps(header, separators=(",", ":")).encode()
+        chunk = HEADER_LENGTH.pack(len(header_bytes)) + header_bytes + b"".join(blobs)
+        self._fd.write(chunk)
+        self.stats["records"] += self._records
+        self.stats["chunks"] += 1
+        self.stats["bytes"] += len(chunk)
+        self._columns = {}
+        self._records = 0
+
+    def close(self) -> None:
+        """Write the last chunk."""
+        self.flush()
+        self._fd.flush()
+
+
+def read_columnar(fd: BinaryIO) -> Iterator[Dict[Tuple[str, str], Tuple[List[float], List[float]]]]:
+    """Read a columnar export one chunk at a time: `{(device, metric): (timestamps, values)}`."""
+    if fd.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a pybattery columnar export")
+    while length_bytes := fd.read(HEADER_LENGTH.size):
+        header = json.loads(fd.read(HEADER_LENGTH.unpack(length_bytes)[0]))
+        chunk = {}
+        for column in header["columns"]:
+            timestamps = decode(fd.read(column["timestamps"]["bytes"]), column["timestamps"]["type"])
+            values = decode(fd.read(column["values"]["bytes"]), column["values"]["type"])
+            total, absolute = 0, []
+            for delta in timestamps:
+                total += delta
+                absolute.append(total / 1_000_000)
+            chunk[(column["device"], column["metric"])] = (absolute, [float(value) for value in values])
+        yield chunk
+
+
+class CsvWriter:
+    """Write samples to a binary stream as gzip-compressed CSV rows: timestamp, device, metric, value."""
+
+    def __init__(self, fd: BinaryIO, level: int = 6):
+        self._gzip = gzip.GzipFile(fileobj=fd, mode="wb", compresslevel=level)
+        self._text = io.TextIOWrapper(self._gzip, encoding="utf-8", newline="")
+        self._writer = csv.writer(self._text, lineterminator="\n")
+        self._writer.writerow(["timestamp", "device", "metric", "value"])
+        self.stats: Dict[str, int] = {"records": 0}
+
+    def write(self, device_name: str, metric: str, timestamp: float, value: float) -> None:
+        self._writer.writerow([timestamp, device_name, metric, value])
+        self.stats["records"] += 1
+
+    def close(self) -> None:
+        self._text.flush()
+        self._gzip.close()
+
+
+def export(
+    store: HistoryStore,
+    writer: Union[ColumnarWriter, CsvWriter],
+    devices: Optional[Set[str]] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> int:
+    """
+    Stream the samples of `store` recorded between `start` and `end` (of `devices` only, if set)
+    into `writer`, oldest first, and get the number of samples written.
+    """
+    names = {
+        series_id: name for name, series_id in store.series.items() if devices is None or name[0] in devices
+    }
+    count = 0
+    for timestamp, series_id, value in store.records(start, end):
+        if (name := names.get(series_id)) is not None:
+            writer.write(name[0], name[1], timestamp, value)
+            count += 1
+    writer.close()
+    return count
@@ -0,0 +1,378 @@
+import io
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pybattery.models.utils import flatten_reading
+from pybattery.storage.ring_buffer import Sample
+
+DEFAULT_HISTORY_DIR = os.path.expanduser("~/.local/share/pybattery/history")
+DEFAULT_FLUSH_INTERVAL = 60.0
+DEFAULT_FLUSH_RECORDS = 4096
+DEFAULT_SEGMENT_BYTES = 4 * 1024 * 1024
+
+# timestamp (float64), series id (uint32), value (float64)
+RECORD = struct.Struct("<dId")
+RECORD_SIZE = RECORD.size
+SEGMENT_SUFFIX = ".seg"
+SERIES_FILE = "series.tsv"
+
+Record = Tuple[float, int, float]
+
+
+class Segment:
+    """An append-only file of fixed-width records sorted by timestamp."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.first: Optional[float] = None
+        self.last: Optional[float] = None
+        self.size = 0
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Re-read the size and time range of the segment from disk, ignoring a partial last record."""
+        size = os.path.getsize(self.path)
+        self.size = size - size % RECORD_SIZE
+        if self.size < RECORD_SIZE:
+            self.first = self.last = None
+            return
+        with open(self.path, "rb") as segment_file:
+            self.first = RECORD.unpack(segment_file.read(RECORD_SIZE))[0]
+            segment_file.seek(self.size - RECORD_SIZE)
+            self.last = RECORD.unpack(segment_file.read(RECORD_SIZE))[0]
+
+    def overlaps(self, start: Optional[float], end: Optional[float]) -> bool:
+        if self.first is None or self.last is None:
+            return False
+        return (start is None or self.last >= start) and (end is None or self.first <= end)
+
+    def records(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Record]:
+        """Yield the records with `start <= timestamp <= end` by memory-mapping the segment."""
+        if not self.overlaps(start, end):
+            return
+        try:
+            segment_file = open(self.path, "rb")
+        except FileNotFoundError:  # removed by a compaction of the writer since the store was opened
+            return
+        with segment_file:
+            with mmap.mmap(segment_file.fileno(), self.size, access=mmap.ACCESS_READ) as data:
+                count = self.size // RECORD_SIZE
+                index = 0 if start is None else _bisect(data, count, start)
+                while index < count:
+                    record = RECORD.unpack_from(data, index * RECORD_SIZE)
+                    if end is not None and record[0] > end:
+                        break
+                    yield record
+                    index += 1
+
+
+class HistoryStore:
+    """
+    Durable, append-only history of device readings.
+
+    Every numeric value of a reading is stored as a fixed-width binary record (see `RECORD`) in
+    a segment file named after its first timestamp. Records are buffered in memory and written in
+    batches (every `flush_interval` seconds or `flush_records` records) followed by an `fsync`, to
+    limit SD card wear. Segments are rotated once they reach `segment_bytes` and are kept sorted by
+    timestamp, so a range query only memory-maps the segments covering the window and binary
+    searches for its start. Series names are mapped to numeric ids in `series.tsv`, which is always
+    synced before any record that references a new id.
+
+    After a power loss, at most the unflushed batch is lost: a torn record at the end of the last
+    segment and a partial line at the end of `series.tsv` are discarded on open.
+
+    With `read_only`, the store never changes the files (e.g. for queries from the CLI while `serve`
+    appends to them): the directory must exist, and a partial last record or line, which may be a
+    write still in progress, is ignored rather than cut off. Only the writer repairs the files.
+
+    Every rotation also compacts the history (see `compact`), dropping segments older than
+    `retention` seconds when it is set.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_HISTORY_DIR,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        flush_records: int = DEFAULT_FLUSH_RECORDS,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        retention: Optional[float] = None,
+        read_only: bool = False,
+    ):
+        self._path = path
+        self._read_only = read_only
+        self._flush_interval = flush_interval
+        self._flush_records = flush_records
+        self._segment_bytes = segment_bytes
+        self._retention = retention
+        self._lock = threading.RLock()
+        self._series: Dict[Tuple[str, str], int] = {}
+        self._new_series: List[Tuple[int, str, str]] = []
+        self._pending = bytearray()
+        self._last_flush = time.monotonic()
+
+        if not read_only:
+            os.makedirs(path, exist_ok=True)
+        names = os.listdir(path)
+        if not read_only:
+            for name in names:
+                if name.endswith(f"{SEGMENT_SUFFIX}.tmp"):  # the merge of a compaction interrupted by a crash
+                    os.remove(os.path.join(path, name))
+        keys = {name: key for name in names if name.endswith(SEGMENT_SUFFIX) and (key := _segment_key(name))}
+        self._load_series()
+        self._segments: List[Segment] = []
+        for name in sorted(keys, key=keys.__getitem__):
+            try:
+                self._segments.append(Segment(os.path.join(path, name)))
+            except FileNotFoundError:  # removed by a compaction of the writer since it was listed
+                pass
+        if self._segments and not read_only:
+            self._repair(self._segments[-1])
+
+    @property
+    def path(self) -> str:
+        """Get the directory the history is stored in."""
+        return self._path
+
+    @property
+    def read_only(self) -> bool:
+        return self._read_only
+
+    @property
+    def series(self) -> Dict[Tuple[str, str], int]:
+        """Get the id of every `(device, metric)` series."""
+        with self._lock:
+            return dict(self._series)
+
+    @property
+    def segments(self) -> List[Segment]:
+        """Get the segments on disk, oldest first."""
+        with self._lock:
+            return list(self._segments)
+
+    def record(self, timestamp: float, readings: Dict[str, Any]) -> None:
+        """Buffer every numeric value of the readings, flushing to disk when a batch is full."""
+        self._check_writable()
+        with self._lock:
+            for device_name, reading in readings.items():
+                for metric, value in flatten_reading(reading):
+                    self._pending += RECORD.pack(timestamp, self._series_id(device_name, metric), value)
+            if (
+                len(self._pending) >= self._flush_records * RECORD_SIZE
+                or time.monotonic() - self._last_flush >= self._flush_interval
+            ):
+                self.flush()
+
+    def flush(self) -> None:
+        """Write and fsync the buffered records."""
+        if self._read_only:
+            return
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if self._new_series:
+                lines = "".join(f"{series_id}\t{device}\t{metric}\n" for series_id, device, metric in self._new_series)
+                with open(os.path.join(self._path, SERIES_FILE), "a") as series_file:
+                    series_file.write(lines)
+                    series_file.flush()
+                    os.fsync(series_file.fileno())
+                self._new_series = []
+            if not self._pending:
+                return
+
+            # Keep each segment sorted: a clock going backwards starts a new segment.
+            if not _is_sorted(self._pending):
+                self._pending = _sort_records(self._pending)
+            first_pending = RECORD.unpack_from(self._pending, 0)[0]
+            segment = self._segments[-1] if self._segments else None
+            rotate = (
+                segment is None
+                or segment.size >= self._segment_bytes
+                or (segment.last is not None and first_pending < segment.last)
+            )
+            if rotate:
+                segment = self._new_segment(first_pending)
+
+            with open(segment.path, "ab") as segment_file:
+                segment_file.write(self._pending)
+                segment_file.flush()
+                os.fsync(segment_file.fileno())
+            segment.refresh()
+            self._pending = bytearray()
+            if rotate and len(self._segments) > 2:
+                self.compact(self._retention)
+
+    def close(self) -> None:
+        """Flush any buffered records."""
+        self.flush()
+
+    def query(
+        self,
+        device_name: str,
+        metric: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Iterator[Sample]:
+        """Yield the samples of one series recorded between `start` and `end` (inclusive)."""
+        series_id = self.series.get((device_name, metric))
+        if series_id is None:
+            return
+        for timestamp, record_series_id, value in self.records(start, end):
+            if record_series_id == series_id:
+                yield timestamp, value
+
+    def samples(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> Iterator[Tuple[str, str, float, float]]:
+        """Yield every `(device, metric, timestamp, value)` sample between `start` and `end`."""
+        names = {series_id: name for name, series_id in self.series.items()}
+        for timestamp, series_id, value in self.records(start, end):
+            device_name, metric = names[series_id]
+            yield device_name, metric, timestamp, value
+
+    def records(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Record]:
+        """Yield every `(timestamp, series id, value)` record between `start` and `end`, including unflushed ones."""
+        with self._lock:
+            segments = list(self._segments)
+            pending = bytes(self._pending)
+        for segment in segments:
+            yield from segment.records(start, end)
+        for offset in range(0, len(pending), RECORD_SIZE):
+            record = RECORD.unpack_from(pending, offset)
+            if (start is None or record[0] >= start) and (end is None or record[0] <= end):
+                yield record
+
+    def compact(self, retention: Optional[float] = None, now: Optional[float] = None) -> None:
+        """
+        Drop segments older than `retention` seconds and merge runs of small, non-overlapping
+        segments into one so the number of files stays bounded. Merged files are written aside and
+        renamed into place, so a crash mid-compaction can at worst leave duplicate records behind.
+        """
+        self._check_writable()
+        with self._lock:
+            self.flush()
+            now = time.time() if now is None else now
+            active = self._segments[-1:]  # never rewrite the segment being appended to
+            sealed = []
+            for segment in self._segments[:-1]:
+                if segment.last is None or (retention is not None and segment.last < now - retention):
+                    os.remove(segment.path)
+                else:
+                    sealed.append(segment)
+
+            groups: List[List[Segment]] = []
+            for segment in sealed:
+                group = groups[-1] if groups else []
+                if (
+                    group
+                    and sum(s.size for s in group) + segment.size <= self._segment_bytes
+                    and group[-1].last <= segment.first  # type: ignore
+                ):
+                    group.append(segment)
+                else:
+                    groups.append([segment])
+            self._segments = [self._merge(group) if len(group) > 1 else group[0] for group in groups] + active
+            _fsync_dir(self._path)
+
+    def _merge(self, segments: List[Segment]) -> Segment:
+        target = segments[0].path
+        temporary = f"{target}.tmp"
+        with open(temporary, "wb") as merged_file:
+            for segment in segments:
+                with open(segment.path, "rb") as segment_file:
+                    merged_file.write(segment_file.read())
+            merged_file.flush()
+            os.fsync(merged_file.fileno())
+        os.replace(temporary, target)
+        for segment in segments[1:]:
+            os.remove(segment.path)
+        return Segment(target)
+
+    def _check_writable(self) -> None:
+        if self._read_only:
+            raise io.UnsupportedOperation(f"History in {self._path} is open read-only")
+
+    def _series_id(self, device_name: str, metric: str) -> int:
+        series_id = self._series.get((device_name, metric))
+        if series_id is None:
+            series_id = self._series[(device_name, metric)] = len(self._series)
+            self._new_series.append((series_id, device_name, metric))
+        return series_id
+
+    def _new_segment(self, first_timestamp: float) -> Segment:
+        name = f"{int(first_timestamp * 1000):016d}"
+        path = os.path.join(self._path, f"{name}{SEGMENT_SUFFIX}")
+        suffix = 0
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(self._path, f"{name}-{suffix}{SEGMENT_SUFFIX}")
+        open(path, "wb").close()
+        _fsync_dir(self._path)
+        segment = Segment(path)
+        self._segments.append(segment)
+        return segment
+
+    def _load_series(self) -> None:
+        series_path = os.path.join(self._path, SERIES_FILE)
+        if not os.path.exists(series_path):
+            return
+        with open(series_path, "r") as series_file:
+            content = series_file.read()
+        complete, _, partial = content.rpartition("\n")
+        if partial and not self._read_only:  # torn write: drop the incomplete last line
+            with open(series_path, "r+") as series_file:
+                series_file.truncate(len(complete.encode()) + 1 if complete else 0)
+        for line in complete.splitlines():
+            series_id, device_name, metric = line.split("\t")
+            self._series[(device_name, metric)] = int(series_id)
+
+    def _repair(self, segment: Segment) -> None:
+        if os.path.getsize(segment.path) != segment.size:  # torn write: drop the incomplete last record
+            with open(segment.path, "r+b") as segment_file:
+                segment_file.truncate(segment.size)
+
+
+def _segment_key(name: str) -> Optional[Tuple[int, int]]:
+    """
+    Order segment files by first timestamp, then by collision suffix: `<ms>-1.seg` was created after
+    `<ms>.seg` but sorts before it by name. Names not written by the store get None and are ignored.
+    """
+    base, _, suffix = name[: -len(SEGMENT_SUFFIX)].partition("-")
+    try:
+        return int(base), int(suffix or 0)
+    except ValueError:
+        return None
+
+
+def _bisect(data: mmap.mmap, count: int, timestamp: float) -> int:
+    """Find the index of the first record with a timestamp >= `timestamp`."""
+    low, high = 0, count
+    while low < high:
+        middle = (low + high) // 2
+        if RECORD.unpack_from(data, middle * RECORD_SIZE)[0] < timestamp:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _is_sorted(records: bytearray) -> bool:
+    timestamps = [record[0] for record in RECORD.iter_unpack(records)]
+    return all(a <= b for a, b in zip(timestamps, timestamps[1:]))
+
+
+def _sort_records(records: bytearray) -> bytearray:
+    ordered = sorted(RECORD.iter_unpack(records), key=lambda record: record[0])
+    return bytearray(b"".join(RECORD.pack(*record) for record in ordered))
+
+
+def _fsync_dir(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,56 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from pybattery.models.utils import flatten_reading
+from pybattery.storage.ring_buffer import RingBuffer, Sample
+
+DEFAULT_CAPACITY = 3600
+
+
+class MemoryStore:
+    """
+    Keep the most recent samples of every device metric in memory.
+
+    Each `(device, metric)` series gets its own `RingBuffer` of `capacity` samples, created the
+    first time the metric is seen. The store is a `ReadingSink`, so it can be attached to the
+    daemon to record every poll.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._capacity = capacity
+        self._buffers: Dict[Tuple[str, str], RingBuffer] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def series(self) -> List[Tuple[str, str]]:
+        """Get the `(device, metric)` pairs that have been recorded."""
+        with self._lock:
+            return list(self._buffers.keys())
+
+    def record(self, timestamp: float, readings: Dict[str, Any]) -> None:
+        """Append every numeric value of the readings to its series."""
+        with self._lock:
+            for device_name, reading in readings.items():
+                for metric, value in flatten_reading(reading):
+                    buffer = self._buffers.get((device_name, metric))
+                    if buffer is None:
+                        buffer = self._buffers[(device_name, metric)] = RingBuffer(self._capacity)
+                    buffer.append(timestamp, value)
+
+    def latest(self, device_name: str, metric: str) -> Optional[Sample]:
+        """Get the most recent sample of a series, or None if it was never recorded."""
+        with self._lock:
+            buffer = self._buffers.get((device_name, metric))
+            return buffer.latest() if buffer else None
+
+    def range(
+        self,
+        device_name: str,
+        metric: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+    ) -> List[Sample]:
+        """Get the samples of a series recorded between `start` and `end` (inclusive)."""
+        with self._lock:
+            buffer = self._buffers.get((device_name, metric))
+            return buffer.range(start, end) if buffer else []
@@ -0,0 +1,79 @@
+from array import array
+from typing import Iterator, List, Optional, Tuple
+
+Sample = Tuple[float, float]
+
+
+class RingBuffer:
+    """
+    Fixed-capacity buffer of `(timestamp, value)` samples backed by two `array('d')`.
+
+    Memory is allocated once up front (16 bytes per sample); once full, each append overwrites
+    the oldest sample. Timestamps are expected to be appended in non-decreasing order, which lets
+    range queries binary search instead of scanning.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError(f"Capacity must be at least 1, got {capacity}")
+        self._capacity = capacity
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._start = 0
+        self._size = 0
+
+    @property
+    def capacity(self) -> int:
+        """Get the maximum number of samples kept."""
+        return self._capacity
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Sample]:
+        for index in range(self._size):
+            position = self._position(index)
+            yield self._timestamps[position], self._values[position]
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Add a sample, overwriting the oldest one when the buffer is full."""
+        if self._size < self._capacity:
+            position = self._position(self._size)
+            self._size += 1
+        else:
+            position = self._start
+            self._start = (self._start + 1) % self._capacity
+        self._timestamps[position] = timestamp
+        self._values[position] = value
+
+    def latest(self) -> Optional[Sample]:
+        """Get the most recent sample, or None when empty."""
+        if not self._size:
+            return None
+        position = self._position(self._size - 1)
+        return self._timestamps[position], self._values[position]
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Sample]:
+        """Get the samples with `start <= timestamp <= end`, oldest first."""
+        first = 0 if start is None else self._bisect(start, inclusive=False)
+        last = self._size if end is None else self._bisect(end, inclusive=True)
+        samples = []
+        for index in range(first, last):
+            position = self._position(index)
+            samples.append((self._timestamps[position], self._values[position]))
+        return samples
+
+    def _position(self, index: int) -> int:
+        return (self._start + index) % self._capacity
+
+    def _bisect(self, timestamp: float, inclusive: bool) -> int:
+        """Find the first logical index whose timestamp is > (inclusive) or >= `timestamp`."""
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            value = self._timestamps[self._position(middle)]
+            if value < timestamp or (inclusive and value == timestamp):
+                low = middle + 1
+            else:
+                high = middle
+        return low
@@ -0,0 +1,177 @@
+import math
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pybattery.models.utils import flatten_reading
+
+# Bucket size in seconds -> number of buckets kept
+DEFAULT_RESOLUTIONS: Dict[int, int] = {
+    60: 24 * 60,  # 1 minute buckets for a day
+    3600: 60 * 24,  # 1 hour buckets for 60 days
+    86400: 3 * 365,  # 1 day buckets for 3 years
+}
+DEFAULT_MAX_POINTS = 1000
+
+
+class AggregateBuffer:
+    """
+    Fixed-capacity ring of time buckets holding the min, max, sum, count and last value of the
+    samples that fell in each bucket, stored in parallel `array('d')`.
+    """
+
+    def __init__(self, resolution: int, capacity: int):
+        self.resolution = resolution
+        self.capacity = capacity
+        self._starts = array("d", bytes(8 * capacity))
+        self._mins = array("d", bytes(8 * capacity))
+        self._maxs = array("d", bytes(8 * capacity))
+        self._sums = array("d", bytes(8 * capacity))
+        self._counts = array("d", bytes(8 * capacity))
+        self._lasts = array("d", bytes(8 * capacity))
+        self._first = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def covers(self, timestamp: Optional[float]) -> bool:
+        """Check whether no bucket at or after `timestamp` was dropped to make room for newer ones."""
+        if self._size < self.capacity:
+            return True
+        return timestamp is not None and self._starts[self._first] <= timestamp
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Fold a sample into its bucket, opening a new bucket (and dropping the oldest) if needed."""
+        start = math.floor(timestamp / self.resolution) * self.resolution
+        if self._size and start <= self._starts[self._position(self._size - 1)]:
+            index = self._find(start)
+            if index is None:  # late sample for a bucket that was never opened or already dropped
+                return
+            position = self._position(index)
+            self._mins[position] = min(self._mins[position], value)
+            self._maxs[position] = max(self._maxs[position], value)
+            self._sums[position] += value
+            self._counts[position] += 1
+            if index == self._size - 1:
+                self._lasts[position] = value
+            return
+
+        if self._size < self.capacity:
+            position = self._position(self._size)
+            self._size += 1
+        else:
+            position = self._first
+            self._first = (self._first + 1) % self.capacity
+        self._starts[position] = start
+        self._mins[position] = self._maxs[position] = self._sums[position] = self._lasts[position] = value
+        self._counts[position] = 1
+
+    def range(self, start: Optional[float] = None, end: Optional[float] = None) -> List[Dict[str, float]]:
+        """Get the buckets overlapping `[start, end]`, oldest first."""
+        buckets = []
+        for index in range(self._size):
+            position = self._position(index)
+            bucket_start = self._starts[position]
+            if start is not None and bucket_start + self.resolution <= start:
+                continue
+            if end is not None and bucket_start > end:
+                break
+            count = self._counts[position]
+            buckets.append(
+                {
+                    "timestamp": bucket_start,
+                    "min": self._mins[position],
+                    "max": self._maxs[position],
+                    "mean": self._sums[position] / count,
+                    "last": self._lasts[position],
+                    "count": int(count),
+                }
+            )
+        return buckets
+
+    def _position(self, index: int) -> int:
+        return (self._first + index) % self.capacity
+
+    def _find(self, start: float) -> Optional[int]:
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if self._starts[self._position(middle)] < start:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._size and self._starts[self._position(low)] == start:
+            return low
+        return None
+
+
+class Rollup:
+    """
+    Incrementally maintain min/max/mean/last aggregates of every device metric at several
+    resolutions (1 minute, 1 hour and 1 day by default).
+
+    Each sample updates the current bucket of every resolution in constant time, so aggregates
+    never need a rescan of the raw data. The rollup is a `ReadingSink`; `load` replays recorded
+    history into it, e.g. when the daemon starts.
+    """
+
+    def __init__(self, resolutions: Optional[Dict[int, int]] = None):
+        self._resolutions = dict(sorted((resolutions or DEFAULT_RESOLUTIONS).items()))
+        self._buffers: Dict[Tuple[str, str], List[AggregateBuffer]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def resolutions(self) -> List[int]:
+        """Get the bucket sizes in seconds, finest first."""
+        return list(self._resolutions)
+
+    def record(self, timestamp: float, readings: Dict[str, Any]) -> None:
+        """Fold every numeric value of the readings into the aggregates."""
+        with self._lock:
+            for device_name, reading in readings.items():
+                for metric, value in flatten_reading(reading):
+                    self._add(device_name, metric, timestamp, value)
+
+    def load(self, samples: Iterable[Tuple[str, str, float, float]]) -> None:
+        """Fold `(device, metric, timestamp, value)` samples, e.g. replayed from a `HistoryStore`."""
+        with self._lock:
+            for device_name, metric, timestamp, value in samples:
+                self._add(device_name, metric, timestamp, value)
+
+    def query(
+        self,
+        device_name: str,
+        metric: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        max_points: int = DEFAULT_MAX_POINTS,
+    ) -> Tuple[Optional[int], List[Dict[str, float]]]:
+        """
+        Get the aggregates of a series over `[start, end]` and the resolution they were taken from.
+
+        The finest resolution that both still holds data back to `start` and returns at most
+        `max_points` buckets is used, i.e. the data is only made as coarse as the window requires.
+        When no resolution satisfies both, the coarsest one is used.
+        """
+        with self._lock:
+            buffers = self._buffers.get((device_name, metric))
+            if not buffers:
+                return None, []
+            for buffer in buffers:
+                if start is not None and end is not None:
+                    points = (end - start) / buffer.resolution
+                else:
+                    points = len(buffer)
+                if buffer.covers(start) and points <= max_points:
+                    return buffer.resolution, buffer.range(start, end)
+            return buffers[-1].resolution, buffers[-1].range(start, end)
+
+    def _add(self, device_name: str, metric: str, timestamp: float, value: float) -> None:
+        buffers = self._buffers.get((device_name, metric))
+        if buffers is None:
+            buffers = self._buffers[(device_name, metric)] = [
+                AggregateBuffer(resolution, capacity) for resolution, capacity in self._resolutions.items()
+            ]
+        for buffer in buffers:
+            buffer.add(timestamp, value)
@@ -0,0 +1,153 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, TypeVar, Union
+
+T = TypeVar("T")
+
+
+class PendingResult:
+    """The result of work done on another thread, which any number of threads can wait on."""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self._value: Any = None
+        self._error: Optional[Exception] = None
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    def set_result(self, value: Any) -> None:
+        self._value = value
+        self._finish()
+
+    def set_error(self, error: Exception) -> None:
+        self._error = error
+        self._finish()
+
+    def add_done_callback(self, callback: Callable[[], None]) -> None:
+        """Call `callback` once the result is set, right away if it already is."""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    async def wait(self) -> Any:
+        """Wait for the result without blocking the running event loop, and return it."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def transfer():
+            if not future.done():
+                if self._error is not None:
+                    future.set_exception(self._error)
+                else:
+                    future.set_result(self._value)
+
+        self.add_done_callback(lambda: loop.call_soon_threadsafe(transfer))
+        return await future
+
+    def _finish(self) -> None:
+        with self._lock:
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """Wait for the result and return it, or raise the error the work failed with."""
+        if not self._done.wait(timeout):
+            raise TimeoutError("Timed out waiting for the result")
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+class TaskTimeoutError(TimeoutError):
+    """Raised (returned) in place of a task result when the task ran longer than its timeout."""
+
+    def __init__(self, name: str, timeout: float):
+        super().__init__(f"'{name}' timed out after {timeout}s")
+        self.name = name
+        self.timeout = timeout
+
+
+def run_concurrently(
+    tasks: Dict[str, Callable[[], T]],
+    max_workers: int,
+    timeout: Optional[float] = None,
+) -> Dict[str, Union[T, Exception]]:
+    """
+    Run named tasks on a bounded pool of worker threads and return their outcomes by name.
+
+    Each task's outcome is either its return value or the exception it raised. A task that
+    runs longer than `timeout` seconds (measured from when a worker picks it up) is reported as
+    a `TaskTimeoutError` and a replacement worker is started so the remaining tasks are not
+    starved; the timed-out worker exits once its task returns, so that at most `max_workers`
+    tasks that have not timed out run at once. Workers are daemon threads: a task that never
+    returns cannot block the caller or interpreter shutdown.
+    """
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+    if not tasks:
+        return {}
+
+    pending: "queue.Queue[str]" = queue.Queue()
+    results: "queue.Queue[tuple]" = queue.Queue()
+    started: Dict[str, float] = {}
+    lock = threading.Lock()
+    finished: Set[str] = set()
+    timed_out: Set[str] = set()
+    for name in tasks:
+        pending.put(name)
+
+    def worker():
+        while True:
+            try:
+                name = pending.get_nowait()
+            except queue.Empty:
+                return
+            started[name] = time.monotonic()
+            try:
+                results.put((name, tasks[name]()))
+            except Exception as e:
+                results.put((name, e))
+            with lock:
+                finished.add(name)
+                if name in timed_out:  # a replacement worker took over
+                    return
+
+    def start_worker():
+        threading.Thread(target=worker, name="pybattery-worker", daemon=True).start()
+
+    for _ in range(min(max_workers, len(tasks))):
+        start_worker()
+
+    outcomes: Dict[str, Union[T, Exception]] = {}
+    while len(outcomes) < len(tasks):
+        wait = None
+        if timeout is not None:
+            now = time.monotonic()
+            for name, start in list(started.items()):
+                if name not in outcomes and now - start >= timeout:
+                    with lock:
+                        if name in finished:  # its result is already queued
+                            continue
+                        timed_out.add(name)
+                    outcomes[name] = TaskTimeoutError(name, timeout)
+                    start_worker()
+            if len(outcomes) == len(tasks):
+                break
+            deadlines = [start + timeout for name, start in list(started.items()) if name not in outcomes]
+            wait = max(0.0, min(deadlines) - now) if deadlines else timeout
+
+        try:
+            name, outcome = results.get(timeout=wait)
+        except queue.Empty:
+            continue
+        if name not in outcomes:  # late results from timed out tasks are dropped
+            outcomes[name] = outcome
+
+    return {name: outcomes[name] for name in tasks}
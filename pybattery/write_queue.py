@@ -0,0 +1,117 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from pybattery.protocols import WritableDeviceType
+from pybattery.workers import PendingResult
+
+
+class WriteQueue:
+    """
+    Send the values written to a device from a worker thread, at most once every `min_interval` seconds.
+
+    Only the latest value is kept while a write is in progress or held back by the interval: a value
+    submitted before the previous one was sent supersedes it, and the callers of both are notified
+    once the latest value is written. Slow hardware (an LCD) is never flooded and a relay cannot
+    chatter faster than its interval. Submissions, writes, coalesced values, errors and the latency
+    from submission to the end of the write are counted in `stats`.
+    """
+
+    def __init__(self, device: WritableDeviceType, min_interval: float = 0.0, name: str = ""):
+        self._device = device
+        self._min_interval = min_interval
+        self._name = name
+        self._condition = threading.Condition()
+        self._pending: Optional[Any] = None
+        self._waiters: List[PendingResult] = []
+        self._submitted_at = 0.0
+        self._has_pending = False
+        self._last_write: Optional[float] = None
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self.stats: Dict[str, float] = {
+            "submitted": 0,
+            "written": 0,
+            "coalesced": 0,
+            "errors": 0,
+            "last_latency_s": 0.0,
+            "max_latency_s": 0.0,
+            "total_latency_s": 0.0,
+        }
+
+    @property
+    def device(self) -> WritableDeviceType:
+        """Get the device written to."""
+        return self._device
+
+    @property
+    def min_interval(self) -> float:
+        """Get the minimum number of seconds between two writes."""
+        return self._min_interval
+
+    @property
+    def depth(self) -> int:
+        """Get the number of values waiting to be written (0 or 1, since newer values replace older ones)."""
+        with self._condition:
+            return int(self._has_pending)
+
+    def submit(self, value: Any) -> PendingResult:
+        """Queue a value, replacing the one waiting if any, and get the result of its write."""
+        result = PendingResult()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError(f"The write queue of '{self._name}' is closed")
+            self.stats["submitted"] += 1
+            if self._has_pending:
+                self.stats["coalesced"] += 1
+            self._pending, self._has_pending = value, True
+            self._waiters.append(result)
+            self._submitted_at = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"pybattery-write-{self._name}", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return result
+
+    def close(self) -> None:
+        """Write the value still waiting, if any, and stop the worker."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread:
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._has_pending and not self._closed:
+                    self._condition.wait()
+                if not self._has_pending:
+                    return
+                if self._last_write is not None:
+                    if (delay := self._last_write + self._min_interval - time.monotonic()) > 0:
+                        self._condition.wait(delay)  # newer values submitted meanwhile replace this one
+                        continue
+                value, waiters, submitted_at = self._pending, self._waiters, self._submitted_at
+                self._pending, self._has_pending, self._waiters = None, False, []
+
+            error = None
+            try:
+                self._device.write(value)
+            except Exception as e:
+                error = e
+            self._last_write = time.monotonic()  # failed writes count too, the hardware may still have switched
+
+            latency = self._last_write - submitted_at
+            with self._condition:
+                self.stats["written"] += 1
+                self.stats["errors"] += error is not None
+                self.stats["last_latency_s"] = latency
+                self.stats["max_latency_s"] = max(self.stats["max_latency_s"], latency)
+                self.stats["total_latency_s"] += latency
+            for waiter in waiters:
+                if error is not None:
+                    waiter.set_error(error)
+                else:
+                    waiter.set_result(None)
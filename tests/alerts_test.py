@@ -0,0 +1,175 @@
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+import pytest
+
+from pybattery.alerts import ACTIVE, CHANGED, CLEARED, AlertEngine, AlertEvent
+from pybattery.api import Api
+from pybattery.daemon import Daemon
+from pybattery.models.config import AlertConfig, Config, DeviceConfig
+from pybattery.models.device import Device
+from pybattery.models.utils import from_dict
+
+
+def states(engine: AlertEngine, device: str, metric: str, values: List[Any], interval: float = 1.0) -> List[Any]:
+    """Feed values to the engine one reading at a time and get the state of each resulting event."""
+    path = metric.split(".")
+    results = []
+    for index, value in enumerate(values):
+        reading: Dict[str, Any] = value
+        for key in reversed(path):
+            reading = {key: reading}
+        events = engine.evaluate(index * interval, {device: reading})
+        results.append(events[0].state if events else None)
+    return results
+
+
+def test_threshold_below_with_hysteresis():
+    engine = AlertEngine({"low": AlertConfig(device="mppt", metric="battery.voltage", below=11.8, hysteresis=0.2)})
+
+    assert states(engine, "mppt", "battery.voltage", [12.5, 11.7, 11.5, 11.9, 12.0, 12.1, 11.7]) == [
+        None,
+        ACTIVE,
+        None,
+        None,  # within the hysteresis band
+        None,
+        CLEARED,
+        ACTIVE,
+    ]
+
+
+def test_threshold_above():
+    engine = AlertEngine({"humid": AlertConfig(device="thermo", metric="humidity", above=80, hysteresis=5)})
+
+    assert states(engine, "thermo", "humidity", [70, 81, 90, 76, 74]) == [None, ACTIVE, None, None, CLEARED]
+    assert engine.active == []
+
+
+def test_rate_of_change():
+    engine = AlertEngine({"draining": AlertConfig(device="mppt", metric="battery.soc", rate=True, below=-1, window=1)})
+
+    assert states(engine, "mppt", "battery.soc", [80, 79.5, 77, 76.5, 76]) == [None, None, ACTIVE, CLEARED, None]
+
+
+def test_rate_of_change__over_a_window():
+    engine = AlertEngine({"draining": AlertConfig(device="mppt", metric="battery.soc", rate=True, below=-0.005)})
+
+    # A single 1% step of an integer SOC polled every 10s is not a drain...
+    soc = [80] * 30 + [79] * 30
+    assert set(states(engine, "mppt", "battery.soc", soc, interval=10)) == {None}
+    # ...but 18% per hour sustained over the 300s window is
+    draining = states(engine, "mppt", "battery.soc", [79 - 0.1 * step for step in range(40)], interval=10)
+    assert draining.count(ACTIVE) == 1 and CLEARED not in draining
+
+
+def test_rate_of_change__skips_repeated_samples():
+    engine = AlertEngine({"draining": AlertConfig(device="mppt", metric="soc", rate=True, below=-1, window=1)})
+
+    assert engine.evaluate(0, {"mppt": {"soc": 80}}) == []
+    assert [event.state for event in engine.evaluate(1, {"mppt": {"soc": 78}})] == [ACTIVE]
+    assert engine.evaluate(1, {"mppt": {"soc": 78}}) == [], "The same cached reading must not clear the alert"
+    assert engine.rules[0].active
+
+
+def test_rate_of_change__needs_a_window():
+    with pytest.raises(ValueError):
+        AlertEngine({"draining": AlertConfig(device="mppt", metric="battery.soc", rate=True, below=-1, window=0)})
+
+
+def test_deadband():
+    engine = AlertEngine({"soc": AlertConfig(device="mppt", metric="battery.soc", deadband=1)})
+
+    assert states(engine, "mppt", "battery.soc", [80, 80.5, 80.9, 81, 81.5, 79]) == [
+        CHANGED,
+        None,
+        None,
+        CHANGED,
+        None,
+        CHANGED,
+    ]
+
+
+def test_missing_and_non_numeric_values_are_ignored():
+    engine = AlertEngine({"low": AlertConfig(device="mppt", metric="battery.voltage", below=11.8)})
+
+    assert engine.evaluate(0, {"mppt": {"error": "TimeoutError: timed out"}}) == []
+    assert engine.evaluate(1, {"mppt": {"battery": {"voltage": "n/a"}}}) == []
+    assert engine.evaluate(2, {"other": {"battery": {"voltage": 1}}}) == []
+
+
+def test_events_and_listeners():
+    engine = AlertEngine(
+        {"low": AlertConfig(device="mppt", metric="battery.voltage", below=11.8, message="Battery voltage low")}
+    )
+    received = []
+    engine.add_listener(received.append)
+
+    engine.evaluate(10.0, {"mppt": {"battery": {"voltage": 11.5}}})
+
+    event = AlertEvent("low", ACTIVE, "mppt", "battery.voltage", 11.5, 10.0, "Battery voltage low")
+    assert received == [event]
+    assert str(event) == "low active: Battery voltage low (11.5)"
+
+
+def test_rule_needs_a_condition():
+    with pytest.raises(ValueError):
+        AlertEngine({"nothing": AlertConfig(device="mppt", metric="battery.voltage")})
+
+
+class VoltageDevice(Device):
+    """Test voltage device"""
+
+    voltages = iter([12.5, 11.5])
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        return {"battery": {"voltage": next(self.voltages)}}
+
+
+def test_daemon_evaluates_alerts_on_every_poll():
+    VoltageDevice.voltages = iter([12.5, 11.5, 11.5])
+    config = Config(
+        devices={"mppt": DeviceConfig(description="MPPT", type="voltage")},
+        alerts={"low": AlertConfig(device="mppt", metric="battery.voltage", below=11.8)},
+    )
+    with mock.patch("pybattery.api.list_device_types", return_value={"voltage": VoltageDevice}):
+        daemon = Daemon(Api(config))
+    received = []
+    daemon.api.alerts.add_listener(received.append)
+
+    daemon.poll(["mppt"])
+    daemon.api.read(["mppt"])  # reads outside of polls (displays, HTTP, D-Bus) are not evaluated
+    assert received == []
+    daemon.poll(["mppt"])
+
+    assert [(event.rule, event.state) for event in received] == [("low", ACTIVE)]
+
+
+def test_cached_readings_keep_the_time_they_were_read():
+    VoltageDevice.voltages = iter([11.5])
+    config = Config(
+        devices={"mppt": DeviceConfig(description="MPPT", type="voltage")},
+        cache_ttl={"voltage": 60},
+        alerts={"low": AlertConfig(device="mppt", metric="battery.voltage", below=11.8)},
+    )
+    with mock.patch("pybattery.api.list_device_types", return_value={"voltage": VoltageDevice}):
+        api = Api(config, cache=True)
+    received = []
+    api.alerts.add_listener(received.append)
+
+    with mock.patch("time.time", return_value=1000.0):
+        api.read_all(["mppt"])
+    api.evaluate_alerts(2000.0, api.read_all(["mppt"]))
+
+    assert [event.timestamp for event in received] == [1000.0]
+
+
+def test_alerts_are_read_from_the_config():
+    config = from_dict(
+        Config,
+        {
+            "devices": {"mppt": {"description": "MPPT", "type": "renogy_rover"}},
+            "alerts": {"low": {"device": "mppt", "metric": "battery.voltage", "below": 11.8}},
+        },
+    )
+
+    assert config.alerts == {"low": AlertConfig(device="mppt", metric="battery.voltage", below=11.8)}
@@ -0,0 +1,224 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+from unittest import mock
+
+import pytest
+
+from pybattery.api import Api
+from pybattery.models.config import Config, DeviceConfig
+from pybattery.models.device import Device, SerialDevice
+
+
+class SlowDevice(Device):
+    """Test slow read device"""
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        time.sleep(self._config.args.get("delay", 0.2))
+        return {"name": self._config.description}
+
+
+class HungDevice(Device):
+    """Test hung read device"""
+
+    released = threading.Event()
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        self.released.wait(5)
+        return {"late": True}
+
+
+class BrokenDevice(Device):
+    """Test broken read device"""
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        raise RuntimeError("sensor unplugged")
+
+
+class ClosableDevice(Device):
+    """Test device holding a resource until closed"""
+
+    closed = 0
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        return {}
+
+    def close(self) -> None:
+        ClosableDevice.closed += 1
+
+
+class PortDevice(SerialDevice):
+    """Test device opening its serial port on the first read"""
+
+    def __init__(self, config: DeviceConfig) -> None:
+        super().__init__(config)
+        self.serial_port = config.args["address"]
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        self.connections.bus(self.serial_port)
+        return {}
+
+
+@pytest.fixture(autouse=True)
+def mock_device_types():
+    HungDevice.released = threading.Event()
+    with mock.patch("pybattery.api.list_device_types") as mock_list_device_types:
+        mock_list_device_types.return_value = {
+            "slow": SlowDevice,
+            "hung": HungDevice,
+            "broken": BrokenDevice,
+            "closable": ClosableDevice,
+            "port": PortDevice,
+        }
+        yield mock_list_device_types
+    HungDevice.released.set()
+
+
+def make_api(**devices: str) -> Api:
+    return Api(Config(devices={name: DeviceConfig(description=name, type=type) for name, type in devices.items()}))
+
+
+def test_read__sequential_by_default():
+    api = make_api(a="slow", b="slow")
+
+    start = time.monotonic()
+    assert api.read(["a", "b"]) == {"a": {"name": "a"}, "b": {"name": "b"}}
+    assert time.monotonic() - start >= 0.4
+
+
+def test_read__concurrent():
+    api = make_api(a="slow", b="slow", c="slow", d="slow")
+
+    start = time.monotonic()
+    output = api.read(["a", "b", "c", "d"], max_workers=4)
+    elapsed = time.monotonic() - start
+
+    assert output == {name: {"name": name} for name in "abcd"}
+    assert list(output.keys()) == ["a", "b", "c", "d"], "Output should keep the requested order"
+    assert elapsed < 0.4
+
+
+def test_read__bounded_workers():
+    api = make_api(a="slow", b="slow", c="slow", d="slow")
+
+    start = time.monotonic()
+    api.read(["a", "b", "c", "d"], max_workers=2)
+    assert time.monotonic() - start >= 0.4
+
+
+def test_read__timeout_does_not_stall_batch(capsys):
+    api = make_api(stuck="hung", a="slow")
+
+    start = time.monotonic()
+    output = api.read(["stuck", "a"], max_workers=1, timeout=0.5)
+    elapsed = time.monotonic() - start
+
+    assert output["a"] == {"name": "a"}
+    assert output["stuck"] == {"error": "TaskTimeoutError: 'stuck' timed out after 0.5s"}
+    assert elapsed < 1.5
+    assert "Failed to read device 'stuck'" in capsys.readouterr().err
+
+
+def test_read__error_is_captured_per_device():
+    api = make_api(a="slow", bad="broken")
+
+    output = api.read(["a", "bad"], max_workers=2)
+
+    assert output == {"a": {"name": "a"}, "bad": {"error": "RuntimeError: sensor unplugged"}}
+
+
+def test_read__single_device_is_unwrapped():
+    api = make_api(a="slow")
+
+    assert api.read(["a"], timeout=1) == {"name": "a"}
+
+
+def test_reload__rebuilds_only_changed_devices():
+    api = Api(
+        Config(
+            devices={
+                "a": DeviceConfig(description="a", type="slow", args={"delay": 0}, interval=1),
+                "b": DeviceConfig(description="b", type="slow", args={"delay": 0}),
+                "gone": DeviceConfig(description="gone", type="slow"),
+            }
+        ),
+        cache=True,
+    )
+    before = api.read_devices
+
+    changes = api.reload(
+        Config(
+            devices={
+                "a": DeviceConfig(description="a", type="slow", args={"delay": 0}, interval=5),
+                "b": DeviceConfig(description="b", type="slow", args={"delay": 0.01}),
+                "new": DeviceConfig(description="new", type="slow", args={"delay": 0}),
+            }
+        )
+    )
+
+    assert changes == {"added": ["new"], "changed": ["b"], "removed": ["gone"]}
+    assert api.read_devices["a"] is before["a"]
+    assert api.read_devices["b"] is not before["b"]
+    assert set(api.read_devices) == {"a", "b", "new"}
+    assert set(api.cache_stats) == {"a", "b", "new"}
+    assert api.config.devices["a"].interval == 5
+
+
+def test_reload__changed_cache_ttl_rebuilds_devices_of_type():
+    config = Config(devices={"a": DeviceConfig(description="a", type="slow")})
+    api = Api(config, cache=True)
+    before = api.read_devices["a"]
+
+    api.reload(Config(devices=config.devices, cache_ttl={"slow": 5}))
+
+    assert api.read_devices["a"] is not before
+    assert api.read_devices["a"].ttl == 5
+
+
+def test_reload__closes_replaced_and_removed_devices():
+    ClosableDevice.closed = 0
+    api = make_api(kept="closable", changed="closable", gone="closable", unused="closable")
+    api.read_all(["kept", "changed", "gone"])
+
+    api.reload(
+        Config(
+            devices={
+                "kept": DeviceConfig(description="kept", type="closable"),
+                "changed": DeviceConfig(description="changed", type="closable", args={"new": True}),
+            }
+        )
+    )
+
+    assert ClosableDevice.closed == 2, "Only the drivers built for the replaced and removed devices should be closed"
+    api.close()
+    assert ClosableDevice.closed == 3
+
+
+def test_reload__releases_unused_serial_ports():
+    def port_device(address: str) -> DeviceConfig:
+        return DeviceConfig(description=address, type="port", args={"address": address})
+
+    api = Api(Config(devices={"a": port_device("/dev/a"), "b": port_device("/dev/b"), "c": port_device("/dev/c")}))
+    api.read_all(["a", "b", "c"])
+    buses = api.connections.buses
+
+    api.reload(Config(devices={"a": port_device("/dev/a"), "b": port_device("/dev/c")}))
+
+    assert api.connections.buses == {"/dev/a": buses["/dev/a"]}, "Ports of replaced and removed devices should close"
+    api.read_all(["b"])
+    assert set(api.connections.buses) == {"/dev/a", "/dev/c"}
+    api.close()
+
+
+def test_reload__in_flight_read_finishes_on_old_devices():
+    api = make_api(a="slow")
+    results = []
+    reader = threading.Thread(target=lambda: results.append(api.read_all(["a"], max_workers=1)))
+    reader.start()
+    time.sleep(0.05)
+
+    api.reload(Config(devices={}))
+    reader.join()
+
+    assert results == [{"a": {"name": "a"}}]
+    assert api.read_all(["a"]) == {}
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+import pytest
+
+from pybattery.api import Api
+from pybattery.async_adapters import AsyncReader, SyncReader, SyncWriter
+from pybattery.models.config import Config, DeviceConfig
+from pybattery.models.device import Device
+from pybattery.protocols import AsyncReadableDeviceType, ReadableDeviceType, WritableDeviceType
+
+
+class AsyncSensor(Device):
+    """Test async sensor"""
+
+    async def read(self) -> Optional[Dict[str, Any]]:
+        await asyncio.sleep(0.1)
+        return {"thread": threading.current_thread().name}
+
+
+class AsyncDisplay(Device):
+    """Test async display"""
+
+    written: List[Any] = []
+
+    async def write(self, value: Any) -> None:
+        self.written.append(value)
+
+
+class SlowSensor(Device):
+    """Test blocking sensor"""
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        time.sleep(0.1)
+        return {"slow": True}
+
+
+class FailingSensor(Device):
+    """Test failing async sensor"""
+
+    async def read(self) -> Optional[Dict[str, Any]]:
+        raise RuntimeError("sensor unplugged")
+
+
+@pytest.fixture
+def api():
+    AsyncDisplay.written = []
+    device_types = {"async": AsyncSensor, "display": AsyncDisplay, "slow": SlowSensor, "failing": FailingSensor}
+    config = Config(
+        devices={
+            **{f"async-{index}": DeviceConfig(description="async", type="async") for index in range(5)},
+            "slow": DeviceConfig(description="slow", type="slow"),
+            "failing": DeviceConfig(description="failing", type="failing"),
+            "display": DeviceConfig(description="display", type="display"),
+        }
+    )
+    with mock.patch("pybattery.api.list_device_types", return_value=device_types):
+        yield Api(config)
+
+
+def test_async_devices_are_discovered():
+    assert isinstance(AsyncSensor(DeviceConfig(description="a", type="async")), AsyncReadableDeviceType)
+
+
+def test_async_devices_get_a_blocking_facade(api):
+    assert isinstance(api.read_devices["async-0"], SyncReader)
+    assert isinstance(api.read_devices["async-0"], ReadableDeviceType)
+    assert isinstance(api.write_devices["display"], SyncWriter)
+    assert isinstance(api.write_devices["display"], WritableDeviceType)
+    assert api.read_devices["async-0"].description == "async"
+
+    assert api.read(["async-0"]) == {"thread": "pybattery-loop"}
+    api.write_devices["display"].write("hello")
+    assert AsyncDisplay.written == ["hello"]
+
+
+def test_sync_devices_get_a_coroutine_facade(api):
+    assert isinstance(api.async_read_devices["slow"], AsyncReader)
+    assert isinstance(api.async_read_devices["async-0"].device, AsyncSensor)
+
+    assert asyncio.run(api.aread(["slow"])) == {"slow": True}
+
+
+def test_aread_all__shares_the_cache(api):
+    reads = []
+
+    class CountingSensor(Device):
+        """Test async sensor counting its hardware reads"""
+
+        cache_ttl = 60.0
+
+        async def read(self) -> Optional[Dict[str, Any]]:
+            reads.append(time.time())
+            return {"reads": len(reads)}
+
+    config = Config(devices={"counting": DeviceConfig(description="counting", type="counting")})
+    with mock.patch("pybattery.api.list_device_types", return_value={"counting": CountingSensor}):
+        cached_api = Api(config, cache=True)
+
+    assert cached_api.read_all(["counting"]) == {"counting": {"reads": 1}}
+    assert asyncio.run(cached_api.aread_all(["counting"])) == {"counting": {"reads": 1}}
+    assert asyncio.run(cached_api.aread_all(["counting"])) == {"counting": {"reads": 1}}
+    assert len(reads) == 1
+    assert cached_api.cache_stats["counting"]["hits"] == 2
+
+
+def test_aread_all__reads_concurrently(api):
+    names = [f"async-{index}" for index in range(5)] + ["slow"]
+
+    start = time.monotonic()
+    readings = asyncio.run(api.aread_all(names))
+
+    assert time.monotonic() - start < 0.3, "Devices should be read concurrently"
+    assert sorted(readings) == sorted(names)
+
+
+def test_aread_all__isolates_failures_and_timeouts(api, capsys):
+    readings = asyncio.run(api.aread_all(["failing", "slow", "async-0"], timeout=0.05))
+
+    assert readings == {
+        "failing": {"error": "RuntimeError: sensor unplugged"},
+        "slow": {"error": "TaskTimeoutError: 'slow' timed out after 0.05s"},
+        "async-0": {"error": "TaskTimeoutError: 'async-0' timed out after 0.05s"},
+    }
+    assert "sensor unplugged" in capsys.readouterr().err
+
+
+def test_awrite(api):
+    asyncio.run(api.awrite("display", "hello"))
+
+    assert AsyncDisplay.written == ["hello"]
@@ -0,0 +1,133 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+from unittest import mock
+
+import pytest
+
+from pybattery.api import Api
+from pybattery.cache import CachedDevice
+from pybattery.models.config import Config, DeviceConfig
+from pybattery.models.device import Device
+
+
+class SlowCountingDevice(Device):
+    """Test slow counting device"""
+
+    cache_ttl = 5.0
+
+    def __init__(self, config: DeviceConfig):
+        super().__init__(config)
+        self.count = 0
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        self.count += 1
+        time.sleep(0.1)
+        return {"count": self.count}
+
+
+class FailingDevice(Device):
+    """Test failing device"""
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        time.sleep(0.1)
+        raise RuntimeError("checksum error")
+
+
+@pytest.fixture
+def device():
+    return SlowCountingDevice(DeviceConfig(description="counter", type="counting"))
+
+
+def test_read__reuses_reading_within_ttl(device):
+    cached = CachedDevice(device, ttl=60)
+
+    assert cached.read() == {"count": 1}
+    assert cached.read() == {"count": 1}
+    assert cached.stats == {"hits": 1, "misses": 1, "coalesced": 0}
+
+
+def test_read__expired(device):
+    cached = CachedDevice(device, ttl=0.01)
+
+    cached.read()
+    time.sleep(0.02)
+    assert cached.read() == {"count": 2}
+    assert cached.stats["misses"] == 2
+
+
+def test_read__concurrent_reads_are_coalesced(device):
+    cached = CachedDevice(device, ttl=0)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cached.read())) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert device.count == 1
+    assert results == [{"count": 1}] * 5
+    assert cached.stats == {"hits": 0, "misses": 1, "coalesced": 4}
+
+
+def test_read__errors_are_shared_not_cached():
+    cached = CachedDevice(FailingDevice(DeviceConfig(description="failing", type="failing")), ttl=60)
+    errors = []
+
+    def read():
+        try:
+            cached.read()
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=read) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == ["checksum error"] * 3
+    with pytest.raises(RuntimeError):
+        cached.read()
+    assert cached.stats["misses"] == 2
+
+
+def test_read__interrupted_read_does_not_block_later_reads(device):
+    cached = CachedDevice(device, ttl=0)
+    with mock.patch.object(device, "read", side_effect=KeyboardInterrupt):
+        with pytest.raises(KeyboardInterrupt):
+            cached.read()
+
+    assert cached.read() == {"count": 1}
+
+
+def test_invalidate(device):
+    cached = CachedDevice(device, ttl=60)
+    cached.read()
+    cached.invalidate()
+
+    assert cached.read() == {"count": 2}
+
+
+def test_api__cache_ttl_per_device_type():
+    config = Config(
+        devices={
+            "a": DeviceConfig(description="a", type="counting"),
+            "b": DeviceConfig(description="b", type="failing"),
+        },
+        cache_ttl={"failing": 1.5},
+    )
+    with mock.patch(
+        "pybattery.api.list_device_types", return_value={"counting": SlowCountingDevice, "failing": FailingDevice}
+    ):
+        api = Api(config, cache=True)
+
+    assert api.read_devices["a"].ttl == 5.0, "Should default to the device type's cache_ttl"
+    assert api.read_devices["b"].ttl == 1.5, "Should be overridden by the config"
+
+    api.read(["a"])
+    api.read(["a"])
+    assert api.cache_stats == {
+        "a": {"hits": 1, "misses": 1, "coalesced": 0},
+        "b": {"hits": 0, "misses": 0, "coalesced": 0},
+    }
@@ -0,0 +1,58 @@
+import os
+import threading
+
+import pytest
+
+from pybattery.config_watcher import ConfigWatcher, load_inotify
+
+
+@pytest.fixture
+def config_path(tmp_path) -> str:
+    path = tmp_path / "config.yml"
+    path.write_text("devices: {}\n")
+    return str(path)
+
+
+def watch(config_path: str, **kwargs):
+    changed = threading.Event()
+    watcher = ConfigWatcher(config_path, changed.set, poll_interval=0.05, debounce=0.05, **kwargs)
+    watcher.start()
+    return watcher, changed
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_write_is_reported(config_path: str, use_inotify: bool):
+    if use_inotify and load_inotify() is None:
+        pytest.skip("inotify is not available")
+    watcher, changed = watch(config_path, use_inotify=use_inotify)
+    assert watcher.uses_inotify == use_inotify
+    try:
+        with open(config_path, "w") as config_file:
+            config_file.write("devices:\n  a: {type: dht11, description: a}\n")
+        assert changed.wait(2)
+    finally:
+        watcher.stop()
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_rename_over_file_is_reported(config_path: str, use_inotify: bool):
+    if use_inotify and load_inotify() is None:
+        pytest.skip("inotify is not available")
+    watcher, changed = watch(config_path, use_inotify=use_inotify)
+    try:
+        with open(config_path + ".new", "w") as config_file:
+            config_file.write("devices: {}\ncache_ttl: {dht11: 2}\n")
+        os.replace(config_path + ".new", config_path)
+        assert changed.wait(2)
+    finally:
+        watcher.stop()
+
+
+def test_other_files_are_ignored(config_path: str):
+    watcher, changed = watch(config_path)
+    try:
+        with open(os.path.join(os.path.dirname(config_path), "other.yml"), "w") as other_file:
+            other_file.write("x: 1\n")
+        assert not changed.wait(0.3)
+    finally:
+        watcher.stop()
@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+import serial
+
+from pybattery.connections import PORT_ERRORS, ConnectionPool
+from pybattery.device_types.renogy_rover.simulator import ModbusSlaveSimulator
+
+
+@pytest.fixture
+def simulator():
+    with ModbusSlaveSimulator({0x0100: 11, 0x0101: 22}, slave_addresses=[1, 2]) as simulator:
+        yield simulator
+
+
+@pytest.fixture
+def pool():
+    pool = ConnectionPool()
+    yield pool
+    pool.close()
+
+
+def test_bus_is_shared_per_port(pool, simulator):
+    bus = pool.bus(simulator.port, timeout=0.5)
+
+    assert pool.bus(simulator.port) is bus
+    assert bus.read_registers(1, 0x0100, 2) == [11, 22]
+    assert bus.read_registers(2, 0x0100, 1) == [11]
+    assert bus._instrument(1).serial is bus._instrument(2).serial, "Devices on a bus should share the port"
+
+
+def test_release(pool, simulator):
+    bus = pool.bus(simulator.port, timeout=0.5)
+    bus.read_registers(1, 0x0100, 1)
+
+    pool.release(simulator.port)
+    pool.release("/dev/unknown")
+
+    assert pool.buses == {}
+    assert pool.bus(simulator.port, timeout=0.5) is not bus
+    assert pool.bus(simulator.port).read_registers(1, 0x0100, 1) == [11]
+
+
+def test_concurrent_requests_are_serialized(pool, simulator):
+    bus = pool.bus(simulator.port, timeout=0.5)
+    results = []
+
+    def read(slave_address):
+        for _ in range(5):
+            results.append(bus.read_registers(slave_address, 0x0100, 2))
+
+    threads = [threading.Thread(target=read, args=(slave_address,)) for slave_address in (1, 2, 1, 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [[11, 22]] * 20
+    assert simulator.requests == 20
+    assert bus.stats["requests"] == 20
+    assert bus.stats["errors"] == 0
+
+
+def test_reconnects_after_port_failure(pool, simulator, capsys):
+    bus = pool.bus(simulator.port, timeout=0.5)
+    bus.read_registers(1, 0x0100, 1)
+
+    port = bus._instrument(1).serial
+    write = port.write
+
+    def fail_once(data):
+        port.write = write
+        raise serial.SerialException("write failed: [Errno 5] Input/output error")  # e.g. the USB adapter was reset
+
+    port.write = fail_once
+
+    assert bus.read_registers(1, 0x0100, 1) == [11]
+    assert bus.stats["reconnects"] == 1
+    assert "Serial port" in capsys.readouterr().err
+
+
+def test_backs_off_when_port_is_gone(pool, capsys):
+    simulator = ModbusSlaveSimulator({0x0100: 11}).start()
+    bus = pool.bus(simulator.port, timeout=0.2, reconnect_delay=60)
+    bus.read_registers(1, 0x0100, 1)
+    simulator.stop()
+
+    with pytest.raises(PORT_ERRORS):
+        bus.read_registers(1, 0x0100, 1)
+    with pytest.raises(ConnectionError, match="reconnecting in"):
+        bus.read_registers(1, 0x0100, 1)
@@ -0,0 +1,121 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from unittest import mock
+
+import pytest
+
+from pybattery.api import Api
+from pybattery.daemon import Daemon
+from pybattery.models.config import Config, DeviceConfig
+from pybattery.models.device import Device
+
+
+class CountingDevice(Device):
+    """Test counting device"""
+
+    def __init__(self, config: DeviceConfig):
+        super().__init__(config)
+        self.count = 0
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        self.count += 1
+        return {"count": self.count}
+
+
+class ListSink:
+    def __init__(self):
+        self.records: List[Tuple[float, Dict[str, Any]]] = []
+
+    def record(self, timestamp: float, readings: Dict[str, Any]) -> None:
+        self.records.append((timestamp, readings))
+
+
+@pytest.fixture
+def api():
+    with mock.patch("pybattery.api.list_device_types", return_value={"counting": CountingDevice}):
+        yield Api(
+            Config(
+                devices={
+                    "fast": DeviceConfig(description="fast", type="counting", interval=0.05),
+                    "slow": DeviceConfig(description="slow", type="counting"),
+                }
+            )
+        )
+
+
+def test_poll__updates_latest_and_sinks(api):
+    sink = ListSink()
+    daemon = Daemon(api, sinks=[sink])
+
+    daemon.poll(["fast", "slow"])
+    daemon.poll(["fast"])
+
+    assert daemon.latest == {"fast": {"count": 2}, "slow": {"count": 1}}
+    assert [readings for _, readings in sink.records] == [
+        {"fast": {"count": 1}, "slow": {"count": 1}},
+        {"fast": {"count": 2}},
+    ]
+
+
+def test_poll__failing_sink_does_not_stop_daemon(api, capsys):
+    class BrokenSink:
+        def record(self, timestamp, readings):
+            raise RuntimeError("disk full")
+
+    sink = ListSink()
+    daemon = Daemon(api, sinks=[BrokenSink(), sink])
+    daemon.poll(["fast"])
+
+    assert len(sink.records) == 1
+    assert "Sink BrokenSink failed: disk full" in capsys.readouterr().err
+
+
+def test_run__polls_each_device_on_its_interval(api):
+    daemon = Daemon(api, default_interval=60)
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    threading.Event().wait(0.3)
+    daemon.stop()
+    thread.join(1)
+
+    assert not thread.is_alive()
+    assert daemon.latest["fast"]["count"] >= 4
+    assert daemon.latest["slow"] == {"count": 1}
+
+
+def test_reload__reschedules_changed_devices(api):
+    daemon = Daemon(api, default_interval=60)
+    daemon.poll(["fast", "slow"])
+
+    daemon.reload(
+        Config(
+            devices={
+                "fast": DeviceConfig(description="fast", type="counting", interval=0.05),
+                "slow": DeviceConfig(description="slow", type="counting", interval=30),
+                "new": DeviceConfig(description="new", type="counting"),
+            }
+        )
+    )
+
+    assert daemon.scheduler.jobs == {"fast": 0.05, "slow": 30, "new": 60}
+    assert daemon.latest["fast"] == {"count": 1}
+
+    daemon.reload(Config(devices={"new": DeviceConfig(description="new", type="counting")}))
+    assert daemon.scheduler.jobs == {"new": 60}
+    assert "fast" not in daemon.latest
+
+
+def test_run__applies_requested_reload(api, capsys):
+    daemon = Daemon(api, default_interval=60)
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    daemon.request_reload(Config(devices={"slow": DeviceConfig(description="slow", type="counting")}))
+    for _ in range(100):
+        if set(daemon.scheduler.jobs) == {"slow"}:
+            break
+        threading.Event().wait(0.01)
+    daemon.stop()
+    thread.join(1)
+
+    assert set(daemon.scheduler.jobs) == {"slow"}
+    assert "Config reloaded: removed fast" in capsys.readouterr().err
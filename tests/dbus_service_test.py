@@ -0,0 +1,148 @@
+import json
+import shutil
+import subprocess
+import threading
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+import pytest
+
+dbus = pytest.importorskip("dbus")
+pytest.importorskip("gi")
+
+from pybattery.api import Api  # noqa: E402
+from pybattery.daemon import Daemon  # noqa: E402
+from pybattery.dbus_service import BUS_NAME, INTERFACE, OBJECT_PATH, DbusServer  # noqa: E402
+from pybattery.models.config import Config, DeviceConfig  # noqa: E402
+from pybattery.models.device import Device  # noqa: E402
+
+
+class ThermoDevice(Device):
+    """Test thermometer"""
+
+    temperature = 20.0
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        return {"temperature": ThermoDevice.temperature}
+
+
+class DisplayDevice(Device):
+    """Test display"""
+
+    written: List[Any] = []
+    released = threading.Event()
+
+    def write(self, value: Any) -> None:
+        self.released.wait(5)
+        self.written.append(value)
+
+
+@pytest.fixture
+def bus_address():
+    if not shutil.which("dbus-daemon"):
+        pytest.skip("dbus-daemon is not installed")
+    process = subprocess.Popen(
+        ["dbus-daemon", "--session", "--nofork", "--print-address"], stdout=subprocess.PIPE, text=True
+    )
+    yield process.stdout.readline().strip()
+    process.terminate()
+    process.wait()
+
+
+@pytest.fixture
+def daemon():
+    ThermoDevice.temperature = 20.0
+    DisplayDevice.written = []
+    DisplayDevice.released = threading.Event()
+    DisplayDevice.released.set()
+    config = Config(
+        devices={
+            "thermo": DeviceConfig(description="Thermometer", type="thermo", args={"gpio": 17}),
+            "display": DeviceConfig(description="LCD", type="display"),
+        }
+    )
+    with mock.patch("pybattery.api.list_device_types", return_value={"thermo": ThermoDevice, "display": DisplayDevice}):
+        return Daemon(Api(config))
+
+
+@pytest.fixture
+def server(daemon, bus_address):
+    server = DbusServer(daemon, address=bus_address)
+    daemon.add_sink(server.service)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(server, bus_address):
+    bus = dbus.bus.BusConnection(bus_address)
+    return bus, dbus.Interface(bus.get_object(BUS_NAME, OBJECT_PATH), INTERFACE)
+
+
+def test_list(client):
+    _, service = client
+    assert dict(service.List()) == {"thermo": "Thermometer", "display": "LCD"}
+
+
+def test_read(client, daemon):
+    _, service = client
+    with pytest.raises(dbus.exceptions.DBusException) as exc:
+        service.Read("thermo")
+    assert exc.value.get_dbus_name() == f"{INTERFACE}.NoReading", "Hardware should not be read on the bus thread"
+
+    daemon.poll(["thermo"])
+    assert json.loads(service.Read("thermo")) == {"temperature": 20.0}
+    assert json.loads(service.ReadPin(17)) == {"temperature": 20.0}
+
+    with pytest.raises(dbus.exceptions.DBusException) as exc:
+        service.Read("unknown")
+    assert exc.value.get_dbus_name() == f"{INTERFACE}.UnknownDevice"
+
+
+def test_stop__releases_the_bus_name(daemon, bus_address):
+    server = DbusServer(daemon, address=bus_address)
+    server.start()
+    server.stop()
+
+    bus = dbus.bus.BusConnection(bus_address)
+    assert not bus.name_has_owner(BUS_NAME)
+
+
+def test_write(client):
+    _, service = client
+    service.Write("display", "Hello")
+    assert DisplayDevice.written == ["Hello"]
+
+
+def test_write__does_not_block_other_calls(client):
+    _, service = client
+    DisplayDevice.released.clear()
+    writer = threading.Thread(target=service.Write, args=("display", "Hello"))
+    writer.start()
+
+    assert dict(service.List()) == {"thermo": "Thermometer", "display": "LCD"}
+    assert DisplayDevice.written == []
+    DisplayDevice.released.set()
+    writer.join(5)
+    assert DisplayDevice.written == ["Hello"]
+
+
+def test_reading_changed_signal(client, daemon):
+    bus, _ = client
+    received = []
+    done = threading.Event()
+
+    def on_changed(device_name, reading):
+        received.append((str(device_name), json.loads(reading)))
+        if len(received) == 2:
+            done.set()
+
+    bus.add_signal_receiver(on_changed, signal_name="ReadingChanged", dbus_interface=INTERFACE)
+    daemon.poll(["thermo"])
+    daemon.poll(["thermo"])  # unchanged, no signal
+    ThermoDevice.temperature = 21.0
+    daemon.poll(["thermo"])
+
+    assert done.wait(5)
+    assert received == [("thermo", {"temperature": 20.0}), ("thermo", {"temperature": 21.0})]
@@ -0,0 +1,118 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+from unittest import mock
+
+import pytest
+
+from pybattery.api import Api
+from pybattery.device_proxy import DeviceProxy, capabilities
+from pybattery.models.config import Config, DeviceConfig
+from pybattery.models.device import Device
+
+
+class CountedDevice(Device):
+    """Test device counting the instances built"""
+
+    built = 0
+
+    def __init__(self, config: DeviceConfig):
+        time.sleep(0.01)
+        type(self).built += 1
+        super().__init__(config)
+        self.mode = "normal"
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        return {"value": 1}
+
+
+class AsyncCountedDevice(Device):
+    async def write(self, value: Any) -> None:
+        pass
+
+
+class NotADevice:
+    pass
+
+
+@pytest.fixture(autouse=True)
+def mock_device_types():
+    CountedDevice.built = 0
+    with mock.patch("pybattery.api.list_device_types") as mock_list_device_types:
+        mock_list_device_types.return_value = {"counted": CountedDevice, "async": AsyncCountedDevice}
+        yield mock_list_device_types
+
+
+def make_proxy(factory=None) -> DeviceProxy:
+    config = DeviceConfig(description="Counted", type="counted")
+    return DeviceProxy(config, factory or (lambda: CountedDevice(config)), capabilities(CountedDevice))
+
+
+def test_capabilities():
+    assert capabilities(CountedDevice) == (True, False, False, False)
+    assert capabilities(AsyncCountedDevice) == (False, True, False, True)
+    assert capabilities(NotADevice) == (False, False, False, False)
+
+
+def test_description_does_not_build_device():
+    proxy = make_proxy()
+    assert proxy.description == "Counted"
+    assert not proxy.built
+    assert CountedDevice.built == 0
+
+
+def test_read__builds_device_once():
+    proxy = make_proxy()
+    assert proxy.read() == {"value": 1}
+    assert proxy.read() == {"value": 1}
+    assert proxy.built
+    assert CountedDevice.built == 1
+
+
+def test_concurrent_first_reads_build_device_once():
+    proxy = make_proxy()
+    threads = [threading.Thread(target=proxy.read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert CountedDevice.built == 1
+
+
+def test_failed_build_is_retried():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("no hardware")
+        return CountedDevice(DeviceConfig(description="Counted", type="counted"))
+
+    proxy = make_proxy(factory)
+    with pytest.raises(RuntimeError, match="no hardware"):
+        proxy.read()
+    assert proxy.read() == {"value": 1}
+
+
+def test_attributes_are_forwarded():
+    proxy = make_proxy()
+    assert proxy.mode == "normal"
+    with pytest.raises(AttributeError):
+        proxy.missing
+
+
+def test_api_builds_only_devices_used():
+    api = Api(
+        Config(
+            devices={
+                **{f"device-{index}": DeviceConfig(description=str(index), type="counted") for index in range(100)},
+                "display": DeviceConfig(description="display", type="async"),
+            }
+        )
+    )
+    assert len(api.read_devices) == 100
+    assert list(api.write_devices) == ["display"]
+    assert CountedDevice.built == 0
+
+    assert api.read(["device-7"]) == {"value": 1}
+    assert CountedDevice.built == 1
@@ -0,0 +1,146 @@
+import os
+import time
+from unittest import mock
+
+import pytest
+
+from pybattery.device_types.ds12b20 import Ds12b20Device
+from pybattery.device_types import ds18b20
+from pybattery.device_types.ds18b20 import Ds18b20Device, OneWireBus, parse_w1_slave
+from pybattery.models.config import DeviceConfig
+from pybattery.protocols import ReadableDeviceType
+
+W1_SLAVE = "72 01 4b 46 7f ff 0e 10 57 : crc=57 {crc}\n72 01 4b 46 7f ff 0e 10 57 t={millidegrees}\n"
+
+
+def add_sensor(root, sensor: str, millidegrees: int, crc: str = "YES"):
+    directory = root / sensor
+    directory.mkdir()
+    (directory / "temperature").write_text(f"{millidegrees}\n")
+    (directory / "w1_slave").write_text(W1_SLAVE.format(crc=crc, millidegrees=millidegrees))
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    """A fake /sys/bus/w1/devices with a bus master supporting bulk reads and two probes."""
+    master = tmp_path / "w1_bus_master1"
+    master.mkdir()
+    (master / "therm_bulk_read").write_text("0\n")
+    add_sensor(tmp_path, "28-0316a279c3ff", 21562)
+    add_sensor(tmp_path, "28-0417b3a1e2ff", -5125)
+    (tmp_path / "00-400000000000").mkdir()  # not a thermometer
+    return tmp_path
+
+
+def make_device(sysfs, sensor=None) -> Ds18b20Device:
+    args = {"sysfs": str(sysfs)}
+    if sensor:
+        args["sensor"] = sensor
+    return Ds18b20Device(DeviceConfig(description="Test thermometer", type="ds18b20", args=args))
+
+
+def test_ds18b20_is_readable_device_type(sysfs):
+    assert isinstance(make_device(sysfs), ReadableDeviceType)
+
+
+def test_ds12b20_is_an_alias():
+    assert Ds12b20Device is Ds18b20Device
+
+
+def test_parse_w1_slave():
+    assert parse_w1_slave(W1_SLAVE.format(crc="YES", millidegrees=23125).encode()) == 23125
+    assert parse_w1_slave(W1_SLAVE.format(crc="YES", millidegrees=-1062).encode()) == -1062
+    assert parse_w1_slave(W1_SLAVE.format(crc="NO", millidegrees=23125).encode()) is None
+    assert parse_w1_slave(b"") is None
+
+
+def test_bus__discovers_thermometers(sysfs):
+    assert OneWireBus(str(sysfs)).sensors() == ["28-0316a279c3ff", "28-0417b3a1e2ff"]
+
+
+def test_bus__bulk_read(sysfs):
+    bus = OneWireBus(str(sysfs))
+    assert bus.read() == {"28-0316a279c3ff": 21.562, "28-0417b3a1e2ff": -5.125}
+    assert (sysfs / "w1_bus_master1" / "therm_bulk_read").read_text() == "trigger\n"
+    assert bus.stats == {"conversions": 1, "bulk_conversions": 1}
+
+
+def test_bus__reads_share_a_conversion(sysfs):
+    bus = OneWireBus(str(sysfs))
+    bus.read()
+    bus.read()
+    assert bus.stats["conversions"] == 1
+    bus.read(max_age=0)
+    assert bus.stats["conversions"] == 2
+
+
+def test_bus__w1_slave_without_bulk_read(sysfs):
+    os.remove(sysfs / "w1_bus_master1" / "therm_bulk_read")
+    add_sensor(sysfs, "28-0518c4b2f3ff", 85000, crc="NO")
+    for sensor in ("28-0316a279c3ff", "28-0417b3a1e2ff"):
+        (sysfs / sensor / "temperature").write_text("garbage\n")  # must not be read
+
+    bus = OneWireBus(str(sysfs))
+    assert bus.read() == {"28-0316a279c3ff": 21.562, "28-0417b3a1e2ff": -5.125, "28-0518c4b2f3ff": None}
+    assert bus.stats == {"conversions": 1, "bulk_conversions": 0}
+
+
+def test_bus__w1_slave_reads_only_requested_sensors(sysfs):
+    os.remove(sysfs / "w1_bus_master1" / "therm_bulk_read")
+    bus = OneWireBus(str(sysfs))
+
+    with mock.patch.object(ds18b20, "read_file", wraps=ds18b20.read_file) as read_file:
+        assert bus.read(sensors=["28-0417b3a1e2ff", "28-ffffffffffff"]) == {"28-0417b3a1e2ff": -5.125}
+        assert read_file.call_count == 1
+        bus.read(sensors=["28-0417b3a1e2ff"])
+        assert read_file.call_count == 1, "The reading should be shared"
+        assert bus.read() == {"28-0316a279c3ff": 21.562, "28-0417b3a1e2ff": -5.125}
+        assert read_file.call_count == 2, "Only the probe not read yet should be converted"
+
+
+def test_bus__w1_slave_sensors_are_read_concurrently(sysfs):
+    os.remove(sysfs / "w1_bus_master1" / "therm_bulk_read")
+    add_sensor(sysfs, "28-0518c4b2f3ff", 18000)
+    read_file = ds18b20.read_file
+
+    def slow_read_file(path, size=128):
+        time.sleep(0.2)  # a conversion
+        return read_file(path, size)
+
+    with mock.patch.object(ds18b20, "read_file", side_effect=slow_read_file):
+        start = time.monotonic()
+        assert OneWireBus(str(sysfs)).read() == {
+            "28-0316a279c3ff": 21.562,
+            "28-0417b3a1e2ff": -5.125,
+            "28-0518c4b2f3ff": 18.0,
+        }
+        assert time.monotonic() - start < 0.5
+
+
+def test_read__configured_sensor(sysfs):
+    assert make_device(sysfs, "28-0417b3a1e2ff").read() == {"temperature": -5.125}
+
+
+def test_read__every_sensor_without_configured_sensor(sysfs):
+    assert make_device(sysfs).read() == {"sensors": {"28-0316a279c3ff": 21.562, "28-0417b3a1e2ff": -5.125}}
+
+
+def test_read__only_sensor(tmp_path):
+    add_sensor(tmp_path, "28-0316a279c3ff", 19000)
+    assert make_device(tmp_path).read() == {"temperature": 19.0}
+
+
+def test_read__missing_sensor(sysfs):
+    with pytest.raises(RuntimeError, match="not found"):
+        make_device(sysfs, "28-ffffffffffff").read()
+
+
+def test_read__no_sensors(tmp_path):
+    with pytest.raises(RuntimeError, match="No 1-Wire thermometer"):
+        make_device(tmp_path).read()
+
+
+def test_read__unreadable_sensor(sysfs):
+    (sysfs / "28-0316a279c3ff" / "temperature").write_text("")
+    with pytest.raises(RuntimeError, match="could not be read"):
+        make_device(sysfs, "28-0316a279c3ff").read()
@@ -1,7 +1,7 @@
 import pytest
 import mock
 from mock import MagicMock
-from pybattery.device_types.lcd import LcdDevice
+from pybattery.device_types.lcd import LcdDevice, changed_runs
 from pybattery.protocols import WritableDeviceType
 from pybattery.models.config import DeviceConfig
 
@@ -9,6 +9,9 @@ from pybattery.models.config import DeviceConfig
 @pytest.fixture
 def mock_lcd_api():
     mock = MagicMock()
+    # Record where each string is written, from the cursor position set before it
+    mock.writes = []
+    mock.write_string.side_effect = lambda text: mock.writes.append((*mock.cursor_pos, text))
     return mock
 
 @pytest.fixture(autouse=True)
@@ -64,20 +67,94 @@ def test_lcd_initialize__defaults(mock_gpio, mock_lcd_factory, mock_lcd_api):
     assert lcd.lcd is not None, "LCD should be initialized"
 
 @pytest.mark.parametrize("value, expected", [
-    ("Hello", "Hello"),
-    ("Hello\nWorld", "Hello\r\nWorld"),
-    ("Line1\nLine2\nLine3", "Line1\r\nLine2"),
+    ("Hello", [(0, 0, "Hello")]),
+    ("Hello\nWorld", [(0, 0, "Hello"), (1, 0, "World")]),
+    ("Hello\r\nWorld", [(0, 0, "Hello"), (1, 0, "World")]),
+    ("Line1\nLine2\nLine3", [(0, 0, "Line1"), (1, 0, "Line2")]),
+    ("A line longer than the display", [(0, 0, "A line longer th")]),
 ])
-def test_lcd_write(value: str, expected: str, config: DeviceConfig, mock_lcd_api):
+def test_lcd_write(value: str, expected, config: DeviceConfig, mock_lcd_api):
     lcd = LcdDevice(config)
 
     lcd.write(value)
-    assert mock_lcd_api.clear.call_count == 2
-    mock_lcd_api.write_string.assert_called_once_with(expected)
+    mock_lcd_api.clear.assert_called_once()  # only when initializing
+    assert positioned_writes(mock_lcd_api) == expected
 
 
 def test_lcd_write_two_args(config: DeviceConfig, mock_lcd_api):
     lcd = LcdDevice(config)
 
     lcd.write("Hello", "World")
-    mock_lcd_api.write_string.assert_called_once_with("Hello\r\nWorld")
\ No newline at end of file
+    assert positioned_writes(mock_lcd_api) == [(0, 0, "Hello"), (1, 0, "World")]
+
+
+def test_lcd_write__only_changes(config: DeviceConfig, mock_lcd_api):
+    lcd = LcdDevice(config)
+    lcd.write("SOC 80% 13.2V", "PV 120W")
+    positioned_writes(mock_lcd_api)
+
+    lcd.write("SOC 81% 13.1V", "PV 120W")
+    assert positioned_writes(mock_lcd_api) == [(0, 5, "1"), (0, 11, "1")]
+    assert lcd.stats["last_frame_writes"] == 4
+
+
+def test_lcd_write__merges_small_gaps(config: DeviceConfig, mock_lcd_api):
+    lcd = LcdDevice(config)
+    lcd.write("1234")
+    positioned_writes(mock_lcd_api)
+
+    lcd.write("5264")
+    assert positioned_writes(mock_lcd_api) == [(0, 0, "526")]
+
+
+def test_lcd_write__clears_shorter_lines(config: DeviceConfig, mock_lcd_api):
+    lcd = LcdDevice(config)
+    lcd.write("Hello", "World")
+    positioned_writes(mock_lcd_api)
+
+    lcd.write("Hi")
+    assert positioned_writes(mock_lcd_api) == [(0, 1, "i   "), (1, 0, "     ")]
+
+
+def test_lcd_write__unchanged_is_skipped(config: DeviceConfig, mock_lcd_api):
+    lcd = LcdDevice(config)
+    lcd.write("Hello")
+    positioned_writes(mock_lcd_api)
+
+    lcd.write("Hello")
+    assert positioned_writes(mock_lcd_api) == []
+    assert lcd.stats == {"frames": 2, "skipped": 1, "writes": 6, "last_frame_writes": 0}
+
+
+def test_lcd_refresh(config: DeviceConfig, mock_lcd_api):
+    lcd = LcdDevice(config)
+    values = iter(["1", "1", "2"])
+    frame_writes = []
+
+    lcd.refresh(lambda: next(values), fps=1000, frames=3, on_frame=frame_writes.append)
+    assert frame_writes == [2, 0, 2]
+    assert lcd.stats["frames"] == 3
+
+
+def test_lcd_close(config: DeviceConfig, mock_lcd_factory, mock_lcd_api):
+    lcd = LcdDevice(config)
+    lcd.close()  # never set up
+    lcd.write("Hello")
+    lcd.close()
+
+    mock_lcd_api.close.assert_called_once_with(clear=False)
+    lcd.write("Hello")
+    assert mock_lcd_factory.call_count == 2
+
+
+def test_changed_runs():
+    assert changed_runs("abcdef", "abcdef") == []
+    assert changed_runs("abcdef", "xbcdeX") == [(0, "x"), (5, "X")]
+    assert changed_runs("abcdef", "xbXdef") == [(0, "xbX")]
+
+
+
+def positioned_writes(mock_lcd_api):
+    """Get the `(row, column, text)` of the writes since the last call."""
+    writes, mock_lcd_api.writes = mock_lcd_api.writes, []
+    return writes
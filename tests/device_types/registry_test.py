@@ -0,0 +1,60 @@
+import sys
+from textwrap import dedent
+
+import pytest
+
+from pybattery.device_types import DeviceTypeRegistry
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    root = tmp_path / "fake_device_types"
+    root.mkdir()
+    (root / "__init__.py").write_text("")
+    (root / "thermo.py").write_text(
+        dedent(
+            '''
+            class ThermoDevice:
+                """Fake thermometer"""
+
+            Device = ThermoDevice
+            '''
+        )
+    )
+    (root / "broken.py").write_text("import some_missing_hardware_library\nDevice = object\n")
+    (root / "helpers.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "fake_device_types", [str(root)]
+    for name in [name for name in sys.modules if name.startswith("fake_device_types")]:
+        del sys.modules[name]
+
+
+def test_names_are_listed_without_importing(package):
+    registry = DeviceTypeRegistry(*package)
+
+    assert sorted(registry) == ["broken", "helpers", "thermo"]
+    assert "thermo" in registry
+    assert "fake_device_types.thermo" not in sys.modules
+    assert "fake_device_types.broken" not in sys.modules
+
+
+def test_lookup_imports_only_that_driver(package):
+    registry = DeviceTypeRegistry(*package)
+
+    assert registry["thermo"].__name__ == "ThermoDevice"
+    assert "fake_device_types.thermo" in sys.modules
+    assert "fake_device_types.broken" not in sys.modules
+
+
+def test_lookup__not_a_device_type(package):
+    registry = DeviceTypeRegistry(*package)
+
+    assert registry.get("helpers") is None
+    assert registry.get("unknown") is None
+
+
+def test_lookup__missing_dependency(package):
+    registry = DeviceTypeRegistry(*package)
+
+    with pytest.raises(ImportError):
+        registry["broken"]
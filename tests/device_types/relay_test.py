@@ -0,0 +1,73 @@
+from unittest import mock
+
+import pytest
+
+from pybattery.device_types.relay import RelayDevice
+from pybattery.device_types.relay.device import parse_state
+from pybattery.models.config import DeviceConfig
+from pybattery.protocols import ReadableDeviceType, WritableDeviceType
+
+
+@pytest.fixture(autouse=True)
+def mock_gpio():
+    with mock.patch("pybattery.device_types.relay.device.GPIO") as mock_gpio:
+        yield mock_gpio
+
+
+def make_relay(**args) -> RelayDevice:
+    return RelayDevice(DeviceConfig(description="Test relay", type="relay", args=args))
+
+
+def test_relay_is_readable_and_writable():
+    relay = make_relay()
+    assert isinstance(relay, ReadableDeviceType)
+    assert isinstance(relay, WritableDeviceType)
+
+
+@pytest.mark.parametrize("value", [True, 1, "1", "on", "ON", " true ", "yes", "high"])
+def test_parse_state__on(value):
+    assert parse_state(value) is True
+
+
+@pytest.mark.parametrize("value", [False, 0, "0", "off", "False", "no", "low"])
+def test_parse_state__off(value):
+    assert parse_state(value) is False
+
+
+def test_parse_state__invalid():
+    with pytest.raises(ValueError, match="Invalid relay state"):
+        parse_state("maybe")
+
+
+def test_write__sets_pin(mock_gpio):
+    relay = make_relay(gpio=5)
+    assert relay.read() == {"on": None}
+
+    relay.write("on")
+    mock_gpio.setup.assert_called_once_with(5, mock_gpio.OUT)
+    mock_gpio.output.assert_called_with(5, mock_gpio.HIGH)
+    assert relay.read() == {"on": True}
+
+    relay.write("off")
+    mock_gpio.output.assert_called_with(5, mock_gpio.LOW)
+    assert mock_gpio.setup.call_count == 1
+
+
+def test_write__active_low(mock_gpio):
+    relay = make_relay(gpio=5, active_low=True)
+    relay.write("on")
+    mock_gpio.output.assert_called_with(5, mock_gpio.LOW)
+
+
+def test_write__invalid_value_keeps_state(mock_gpio):
+    relay = make_relay()
+    with pytest.raises(ValueError):
+        relay.write("maybe")
+    mock_gpio.output.assert_not_called()
+    assert relay.read() == {"on": None}
+
+
+def test_write__without_gpio():
+    with mock.patch("pybattery.device_types.relay.device.GPIO", None):
+        with pytest.raises(RuntimeError, match="RPi.GPIO"):
+            make_relay().write("on")
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from pybattery.api import Api
+from pybattery.device_types.renogy_rover import RenogyRoverDevice
+from pybattery.device_types.renogy_rover.registers import decode
+from pybattery.device_types.renogy_rover.simulator import ModbusSlaveSimulator
+from pybattery.models.config import Config, DeviceConfig
+from pybattery.protocols import ReadableDeviceType
+
+REGISTERS = {
+    0x0100: 87,  # SOC %
+    0x0101: 131,  # battery 13.1 V
+    0x0102: 452,  # charging 4.52 A
+    0x0103: (27 << 8) | 0x85,  # controller 27 C, battery -5 C
+    0x0104: 130,  # load 13.0 V
+    0x0105: 35,  # load 0.35 A
+    0x0106: 4,  # load 4 W
+    0x0107: 185,  # PV 18.5 V
+    0x0108: 320,  # PV 3.20 A
+    0x0109: 59,  # PV 59 W
+    0x010B: 124,
+    0x010C: 143,
+    0x010D: 510,
+    0x010E: 120,
+    0x010F: 66,
+    0x0110: 15,
+    0x0111: 21,
+    0x0112: 3,
+    0x0113: 270,
+    0x0114: 40,
+    0x0120: 0x8002,  # load on, MPPT charging
+    0x0121: (1 << 2) | (1 << 1),  # battery over-voltage, battery under-voltage
+    0x0122: 0,
+}
+
+EXPECTED = {
+    "battery": {
+        "soc": 87,
+        "voltage": 13.1,
+        "charging_current": 4.52,
+        "temperature": -5,
+        "min_voltage_today": 12.4,
+        "max_voltage_today": 14.3,
+    },
+    "controller": {
+        "temperature": 27,
+        "charging_state": "mppt",
+        "faults": ["battery_under_voltage", "battery_over_voltage"],
+    },
+    "load": {"on": True, "voltage": 13.0, "current": 0.35, "power": 4},
+    "pv": {"voltage": 18.5, "current": 3.2, "power": 59},
+    "today": {
+        "max_charging_current": 5.1,
+        "max_discharging_current": 1.2,
+        "max_charging_power": 66,
+        "max_discharging_power": 15,
+        "charging_amp_hours": 21,
+        "discharging_amp_hours": 3,
+        "power_generation": 270,
+        "power_consumption": 40,
+    },
+}
+
+
+@pytest.fixture
+def simulator():
+    with ModbusSlaveSimulator(REGISTERS, slave_addresses=[1]) as simulator:
+        yield simulator
+
+
+def test_renogy_rover_is_readable_device_type():
+    device = RenogyRoverDevice(DeviceConfig(description="MPPT", type="renogy_rover"))
+    assert isinstance(device, ReadableDeviceType)
+    assert (device.serial_port, device.slave_address) == ("/dev/ttyUSB0", 1)
+
+
+def test_decode():
+    assert decode([REGISTERS.get(register, 0) for register in range(0x0100, 0x0123)]) == EXPECTED
+
+
+def test_read__over_serial(simulator):
+    device = RenogyRoverDevice(
+        DeviceConfig(description="MPPT", type="renogy_rover", args={"address": simulator.port, "port": 1})
+    )
+
+    assert asyncio.run(device.read()) == EXPECTED
+    assert simulator.requests == 1, "Registers should be fetched with a single request"
+
+    asyncio.run(device.read())
+    assert simulator.requests == 2
+
+    bus = device.bus
+    device.close()
+    assert device.connections is None, "The device's own pool should be closed"
+    assert asyncio.run(device.read()) == EXPECTED
+    assert device.bus is not bus
+    device.close()
+
+
+def test_read__through_api(simulator):
+    config = Config(
+        devices={
+            "mppt": DeviceConfig(description="MPPT", type="renogy_rover", args={"address": simulator.port, "port": 1})
+        }
+    )
+    api = Api(config)
+    try:
+        assert api.read(["mppt"]) == EXPECTED, "The async driver should be readable synchronously"
+        assert asyncio.run(api.aread(["mppt"])) == EXPECTED
+        device = api.all_devices["mppt"].device
+        device.close()
+        assert device.connections is api.connections, "The Api's pool should be left to the Api"
+    finally:
+        api.close()
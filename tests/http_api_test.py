@@ -0,0 +1,139 @@
+import json
+import threading
+from typing import Any, Dict, List, Optional
+from unittest import mock
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from pybattery.api import Api
+from pybattery.daemon import Daemon
+from pybattery.http_api import HttpApi
+from pybattery.metrics import MetricsRegistry
+from pybattery.models.config import AlertConfig, Config, DeviceConfig
+from pybattery.models.device import Device
+from pybattery.storage.memory import MemoryStore
+from pybattery.storage.rollup import Rollup
+
+
+class CountingDevice(Device):
+    """Test counting device"""
+
+    reads = 0
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        CountingDevice.reads += 1
+        return {"battery": {"soc": 80 + CountingDevice.reads}}
+
+
+class DisplayDevice(Device):
+    """Test display device"""
+
+    written: List[Any] = []
+
+    def write(self, value: Any) -> None:
+        self.written.append(value)
+
+
+@pytest.fixture
+def daemon():
+    CountingDevice.reads = 0
+    DisplayDevice.written = []
+    config = Config(
+        devices={
+            "mppt": DeviceConfig(description="MPPT controller", type="counting"),
+            "display": DeviceConfig(description="LCD", type="display"),
+        },
+        alerts={"soc-high": AlertConfig(device="mppt", metric="battery.soc", above=81.5)},
+    )
+    device_types = {"counting": CountingDevice, "display": DisplayDevice}
+    with mock.patch("pybattery.api.list_device_types", return_value=device_types):
+        daemon = Daemon(Api(config))
+    memory, rollup, metrics = MemoryStore(), Rollup(), MetricsRegistry(daemon.api)
+    daemon.add_sink(memory)
+    daemon.add_sink(rollup)
+    daemon.add_sink(metrics)
+    daemon.poll(["mppt"])
+    daemon.poll(["mppt"])
+    return daemon, memory, rollup, metrics
+
+
+@pytest.fixture
+def url(daemon):
+    daemon, memory, rollup, metrics = daemon
+    http = HttpApi(daemon, memory=memory, rollup=rollup, metrics=metrics, port=0)
+    http.start()
+    yield f"http://127.0.0.1:{http.port}"
+    http.stop()
+
+
+def get(url: str) -> Any:
+    with urlopen(url, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def test_devices(url):
+    assert get(f"{url}/devices") == {"read": {"mppt": "MPPT controller"}, "write": {"display": "LCD"}}
+
+
+def test_readings__served_from_state(url):
+    assert get(f"{url}/readings") == {"mppt": {"battery": {"soc": 82}}}
+    assert get(f"{url}/readings/mppt") == {"battery": {"soc": 82}}
+    assert CountingDevice.reads == 2, "Requests should not read the hardware"
+
+
+def test_history(url):
+    samples = get(f"{url}/history/mppt/battery.soc")["samples"]
+    assert [value for _, value in samples] == [81.0, 82.0]
+
+    aggregates = get(f"{url}/history/mppt/battery.soc?resolution=auto")
+    assert aggregates["resolution"] == 60
+    assert aggregates["buckets"][-1]["last"] == 82.0
+
+
+def test_write(url):
+    request = Request(f"{url}/devices/display", data=json.dumps({"value": "Hello"}).encode(), method="POST")
+    with urlopen(request, timeout=5) as response:
+        assert json.loads(response.read()) == {"written": "Hello"}
+    assert DisplayDevice.written == ["Hello"]
+
+
+@pytest.mark.parametrize(
+    "path, status",
+    [("/readings/unknown", 404), ("/nope", 404), ("/history/mppt/battery.soc?start=abc", 400)],
+)
+def test_errors(url, path, status):
+    with pytest.raises(HTTPError) as exc:
+        get(f"{url}{path}")
+    assert exc.value.code == status
+
+
+def test_concurrent_clients(url):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get(f"{url}/readings/mppt"))) for _ in range(50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [{"battery": {"soc": 82}}] * 50
+
+
+def test_alerts(url):
+    assert get(f"{url}/alerts") == {"soc-high": {"device": "mppt", "metric": "battery.soc", "active": True, "value": 82.0}}
+
+
+def test_metrics(url):
+    with urlopen(f"{url}/metrics", timeout=5) as response:
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert response.read().decode().splitlines() == [
+            "# HELP pybattery_battery_soc Device reading.",
+            "# TYPE pybattery_battery_soc gauge",
+            'pybattery_battery_soc{device="mppt",description="MPPT controller"} 82.0',
+        ]
+
+    request = Request(f"{url}/metrics", headers={"Accept": "application/openmetrics-text; version=1.0.0"})
+    with urlopen(request, timeout=5) as response:
+        assert response.headers["Content-Type"].startswith("application/openmetrics-text")
+        assert response.read().decode().endswith("82.0\n# EOF\n")
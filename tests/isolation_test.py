@@ -0,0 +1,107 @@
+import os
+import time
+from typing import Any, Dict, Optional
+from unittest import mock
+
+import pytest
+
+from pybattery.api import Api
+from pybattery.isolation import IsolatedDevice
+from pybattery.models.config import Config, DeviceConfig
+from pybattery.models.device import Device
+from pybattery.workers import TaskTimeoutError
+
+
+class PidDevice(Device):
+    """Test device reporting the process it runs in"""
+
+    isolated = True
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        if self._config.args.get("hang"):
+            time.sleep(60)
+        if self._config.args.get("fail"):
+            raise ValueError("bad checksum")
+        return {"pid": os.getpid()}
+
+    def write(self, value: Any) -> None:
+        if value == "hang":
+            time.sleep(60)
+
+
+class UnpluggedDevice(Device):
+    """Test device whose driver fails to build"""
+
+    def __init__(self, config: DeviceConfig):
+        raise RuntimeError("no such GPIO")
+
+
+def make_device(timeout: float = 10.0, **args) -> IsolatedDevice:
+    return IsolatedDevice(PidDevice, DeviceConfig(description="pid", type="pid", args=args), timeout=timeout)
+
+
+def test_read__runs_in_worker_process():
+    device = make_device()
+    try:
+        first = device.read()
+        assert first["pid"] != os.getpid()
+        assert first["pid"] == device.pid
+        assert device.read() == first
+        assert device.stats == {"calls": 2, "starts": 1, "timeouts": 0}
+    finally:
+        device.close()
+    assert device.pid is None
+
+
+def test_read__error_is_raised_in_caller():
+    device = make_device(fail=True)
+    try:
+        with pytest.raises(ValueError, match="bad checksum"):
+            device.read()
+        assert device.stats["starts"] == 1, "An error should not restart the worker"
+    finally:
+        device.close()
+
+
+def test_hung_worker_is_killed_and_respawned():
+    device = make_device(timeout=0.5)
+    try:
+        first = device.read()["pid"]
+        start = time.monotonic()
+        with pytest.raises(TaskTimeoutError):
+            device.write("hang")
+        assert time.monotonic() - start < 5
+        assert device.pid is None
+
+        assert device.read()["pid"] != first
+        assert device.stats == {"calls": 3, "starts": 2, "timeouts": 1}
+    finally:
+        device.close()
+
+
+def test_api__isolates_marked_device_types():
+    with mock.patch("pybattery.api.list_device_types", return_value={"pid": PidDevice}):
+        api = Api(
+            Config(
+                devices={
+                    "isolated": DeviceConfig(description="isolated", type="pid"),
+                }
+            )
+        )
+        try:
+            assert api.read(["isolated"])["pid"] != os.getpid()
+            assert api.isolation_stats == {"isolated": {"calls": 1, "starts": 1, "timeouts": 0}}
+        finally:
+            api.close()
+        assert api.read_devices["isolated"].device.pid is None
+
+        api = Api(Config(devices={"local": DeviceConfig(description="local", type="pid")}, isolated={"pid": False}))
+        assert api.read(["local"]) == {"pid": os.getpid()}
+        assert api.isolation_stats == {}
+
+
+def test_driver_that_fails_to_build_is_reported():
+    device = IsolatedDevice(UnpluggedDevice, DeviceConfig(description="unplugged", type="unplugged"))
+    with pytest.raises(RuntimeError, match="no such GPIO"):
+        device.read()
+    assert device.pid is None
@@ -13,6 +13,7 @@ from pybattery.main import main
 from pybattery.models.config import Config, DeviceConfig
 from pybattery.models.device import Device
 from pybattery.models.utils import from_dict
+from pybattery.storage.history import HistoryStore
 
 
 @pytest.fixture
@@ -136,6 +137,46 @@ def test_read__one_device(format, fake_config, capsys):
     assert data == {'data': 'this is read-only data from the config'}
 
 
+def test_read__closes_api(fake_config, capsys):
+    test_args = ["main.py", "read", "test-reader"]
+    with mock.patch.object(sys, "argv", test_args), mock.patch("pybattery.main.Api.close") as close:
+        main(fake_config)
+
+    close.assert_called_once_with()
+
+
+def test_read__follow(fake_config, capsys):
+    test_args = ["main.py", "read", "test-reader", "--follow", "--interval", "0", "-n", "3"]
+    with mock.patch.object(sys, "argv", test_args):
+        main(fake_config)
+
+    captured = capsys.readouterr()
+    records = [json.loads(line) for line in captured.out.splitlines()]
+    assert len(records) == 3
+    assert all(record["test-reader"] == {"data": "this is read-only data from the config"} for record in records)
+
+
+def test_read__follow_csv(fake_config, capsys):
+    test_args = ["main.py", "read", "test-reader", "--follow", "--interval", "0", "-n", "2", "-f", "csv"]
+    with mock.patch.object(sys, "argv", test_args):
+        main(fake_config)
+
+    captured = capsys.readouterr()
+    lines = captured.out.splitlines()
+    assert lines[0] == "timestamp,test-reader.data"
+    assert [line.split(",", 1)[1] for line in lines[1:]] == ["this is read-only data from the config"] * 2
+
+
+def test_read__follow_needs_a_stream_format(fake_config, capsys):
+    test_args = ["main.py", "read", "test-reader", "--follow", "-f", "json"]
+    with mock.patch.object(sys, "argv", test_args):
+        with pytest.raises(SystemExit) as exit_info:
+            main(fake_config)
+
+    assert exit_info.value.code != 0
+    assert "cannot follow readings in json" in capsys.readouterr().err
+
+
 def test_read__invalid_device(fake_config, capsys):
     test_args = ["main.py", "read", "test-writer"]
     with mock.patch.object(sys, "argv", test_args):
@@ -145,7 +186,9 @@ def test_read__invalid_device(fake_config, capsys):
     captured = capsys.readouterr()
     output = dedent(
         """
-        usage: main.py read [-h] [-f {json,yaml}] [device [device ...]]
+        usage: main.py read [-h] [-f {json,yaml,ndjson,csv}] [-j WORKERS] [-t TIMEOUT]
+                            [--follow] [--interval INTERVAL] [-n COUNT]
+                            [device [device ...]]
         main.py read: error: argument device: invalid choice: 'test-writer' (choose from 'test-reader', 'test-reader-writer')
         """
     )
@@ -166,3 +209,57 @@ def test_write__invalid_device(fake_config, capsys):
         """
     )
     assert output.strip() == captured.err.strip()
+
+
+def test_history(fake_config, capsys, tmp_path):
+    store = HistoryStore(str(tmp_path))
+    for timestamp in (100.0, 200.0, 300.0):
+        store.record(timestamp, {"test-reader": {"battery": {"soc": timestamp / 10}}})
+    store.close()
+
+    test_args = ["main.py", "history", "test-reader", "battery.soc", "--since", "150", "--history-dir", str(tmp_path)]
+    with mock.patch.object(sys, "argv", test_args):
+        main(fake_config)
+
+    captured = capsys.readouterr()
+    assert yaml.load(captured.out, Loader=Loader) == {
+        "test-reader": {
+            "battery.soc": [{"timestamp": 200.0, "value": 20.0}, {"timestamp": 300.0, "value": 30.0}],
+        }
+    }
+
+
+def test_export(fake_config, capsys, tmp_path):
+    history_dir, output = str(tmp_path / "history"), str(tmp_path / "export.csv.gz")
+    store = HistoryStore(history_dir)
+    store.record(100.0, {"test-reader": {"battery": {"soc": 10}}})
+    store.close()
+
+    with mock.patch.object(sys, "argv", ["main.py", "export", output, "--history-dir", history_dir]):
+        main(fake_config)
+    assert capsys.readouterr().err == f"Exported 1 samples to {output}\n"
+
+    with mock.patch.object(sys, "argv", ["main.py", "export", output, "--history-dir", history_dir, "-d", "other"]):
+        with pytest.raises(SystemExit):
+            main(fake_config)
+    assert capsys.readouterr().err == "No recorded samples for devices: other\n"
+
+
+def test_export__missing_history(fake_config, capsys, tmp_path):
+    history_dir = str(tmp_path / "typo")
+    with mock.patch.object(sys, "argv", ["main.py", "export", str(tmp_path / "out"), "--history-dir", history_dir]):
+        with pytest.raises(SystemExit):
+            main(fake_config)
+
+    assert capsys.readouterr().err == f"No history found in {history_dir}\n"
+    assert not (tmp_path / "typo").exists()
+    assert not (tmp_path / "out").exists()
+
+
+def test_display__not_a_display(fake_config, capsys):
+    test_args = ["main.py", "display", "test-writer", "{test-reader[data]}"]
+    with mock.patch.object(sys, "argv", test_args):
+        main(fake_config)
+
+    captured = capsys.readouterr()
+    assert captured.err.strip() == "Device 'test-writer' is not a display."
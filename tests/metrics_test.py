@@ -0,0 +1,92 @@
+from typing import Any, Dict, Optional
+from unittest import mock
+
+import pytest
+
+from pybattery.api import Api
+from pybattery.metrics import MetricsRegistry, metric_name
+from pybattery.models.config import Config, DeviceConfig
+from pybattery.models.device import Device
+
+
+class SensorDevice(Device):
+    """Test sensor device"""
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        return None
+
+
+def make_api(devices: Dict[str, str]) -> Api:
+    config = Config(
+        devices={name: DeviceConfig(description=description, type="sensor") for name, description in devices.items()}
+    )
+    with mock.patch("pybattery.api.list_device_types", return_value={"sensor": SensorDevice}):
+        return Api(config)
+
+
+@pytest.fixture
+def api() -> Api:
+    return make_api({"mppt": "MPPT controller", "thermo": 'Shed "north" wall'})
+
+
+def lines(registry: MetricsRegistry) -> list:
+    return registry.render().decode().splitlines()
+
+
+def test_metric_name():
+    assert metric_name("battery.voltage") == "pybattery_battery_voltage"
+    assert metric_name("load-1.power") == "pybattery_load_1_power"
+
+
+def test_render(api: Api):
+    registry = MetricsRegistry(api)
+    registry.record(0, {"mppt": {"battery": {"voltage": 12.5, "charging": True, "mode": "bulk"}}, "thermo": 21})
+    assert lines(registry) == [
+        "# HELP pybattery_battery_charging Device reading.",
+        "# TYPE pybattery_battery_charging gauge",
+        'pybattery_battery_charging{device="mppt",description="MPPT controller"} 1.0',
+        "# HELP pybattery_battery_voltage Device reading.",
+        "# TYPE pybattery_battery_voltage gauge",
+        'pybattery_battery_voltage{device="mppt",description="MPPT controller"} 12.5',
+        "# HELP pybattery_value Device reading.",
+        "# TYPE pybattery_value gauge",
+        'pybattery_value{device="thermo",description="Shed \\"north\\" wall"} 21.0',
+    ]
+    assert registry.render(openmetrics=True).endswith(b"21.0\n# EOF\n")
+
+
+def test_render__only_when_values_change(api: Api):
+    registry = MetricsRegistry(api)
+    registry.record(0, {"mppt": {"soc": 80}, "thermo": {"temperature": 20.5}})
+    text = registry.render()
+    registry.record(1, {"mppt": {"soc": 80}})
+    registry.record(2, {"thermo": {"temperature": 20.5}})
+
+    assert registry.render() is text
+    assert registry.stats == {"updates": 2, "renders": 1}
+
+    registry.record(3, {"mppt": {"soc": 81}})
+    assert 'pybattery_soc{device="mppt",description="MPPT controller"} 81.0' in lines(registry)
+    assert registry.stats == {"updates": 3, "renders": 2}
+
+
+def test_failed_reading_drops_the_device(api: Api):
+    registry = MetricsRegistry(api)
+    registry.record(0, {"mppt": {"soc": 80}, "thermo": {"temperature": 20.5}})
+    registry.record(1, {"mppt": {"error": "Timed out"}})
+    assert not any("soc" in line for line in lines(registry))
+    assert any(line.startswith("pybattery_temperature{") for line in lines(registry))
+
+
+def test_reload(api: Api):
+    registry = MetricsRegistry(api)
+    registry.record(0, {"mppt": {"soc": 80}, "thermo": {"temperature": 20.5}})
+    with mock.patch("pybattery.api.list_device_types", return_value={"sensor": SensorDevice}):
+        api.reload(make_api({"mppt": "Victron MPPT"}).config)
+    registry.record(1, {})
+
+    assert lines(registry) == [
+        "# HELP pybattery_soc Device reading.",
+        "# TYPE pybattery_soc gauge",
+        'pybattery_soc{device="mppt",description="Victron MPPT"} 80.0',
+    ]
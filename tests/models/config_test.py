@@ -0,0 +1,98 @@
+import os
+from unittest import mock
+
+import pytest
+
+from pybattery.models import config_cache
+from pybattery.models.config import AlertConfig, Config, DeviceConfig
+
+CONFIG = """
+devices:
+  mppt:
+    description: Solar charge controller
+    type: renogy_rover
+    address: /dev/ttyUSB0
+    interval: 5
+alerts:
+  low:
+    device: mppt
+    metric: battery.voltage
+    below: 11.8
+"""
+
+
+@pytest.fixture
+def config_path(tmp_path) -> str:
+    path = tmp_path / "config.yml"
+    path.write_text(CONFIG)
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path):
+    directory = str(tmp_path / "cache")
+    with mock.patch.dict(os.environ, {"PYBATTERY_CACHE_DIR": directory}):
+        yield directory
+
+
+def test_parse():
+    config = Config.parse(CONFIG)
+    assert config.devices["mppt"] == DeviceConfig(
+        description="Solar charge controller", type="renogy_rover", args={"address": "/dev/ttyUSB0"}, interval=5
+    )
+    assert config.alerts == {"low": AlertConfig(device="mppt", metric="battery.voltage", below=11.8)}
+
+
+def test_from_file__cached(config_path: str, cache_dir: str):
+    with mock.patch.object(Config, "parse", wraps=Config.parse) as parse:
+        first = Config.from_file(config_path)
+        second = Config.from_file(config_path)
+    assert parse.call_count == 1
+    assert first == second == Config.parse(CONFIG)
+    assert len(os.listdir(cache_dir)) == 1
+
+
+def test_from_file__reparsed_when_changed(config_path: str):
+    Config.from_file(config_path)
+    with open(config_path, "a") as config_file:
+        config_file.write("cache_ttl:\n  renogy_rover: 2\n")
+    assert Config.from_file(config_path).cache_ttl == {"renogy_rover": 2}
+
+
+def test_from_file__touched_file_is_not_reparsed(config_path: str):
+    Config.from_file(config_path)
+    os.utime(config_path, ns=(0, 0))
+    with mock.patch.object(Config, "parse") as parse:
+        assert Config.from_file(config_path).devices["mppt"].type == "renogy_rover"
+    parse.assert_not_called()
+
+
+def test_from_file__corrupt_cache_is_ignored(config_path: str, cache_dir: str):
+    Config.from_file(config_path)
+    for name in os.listdir(cache_dir):
+        with open(os.path.join(cache_dir, name), "wb") as entry:
+            entry.write(b"not a pickle")
+    assert Config.from_file(config_path) == Config.parse(CONFIG)
+
+
+def test_from_file__cache_with_other_fields_is_ignored(config_path: str, cache_dir: str):
+    Config.from_file(config_path)
+    (name,) = os.listdir(cache_dir)
+    entry = config_cache.read_entry(os.path.join(cache_dir, name))
+    del entry["value"].isolated  # as pickled before `Config.isolated` existed
+    del entry["value"].alerts["low"].window
+    config_cache.write_entry(os.path.join(cache_dir, name), entry)
+
+    assert config_cache.has_stale_fields(entry["value"])
+    with mock.patch.object(Config, "parse", wraps=Config.parse) as parse:
+        config = Config.from_file(config_path)
+    parse.assert_called_once()
+    assert config == Config.parse(CONFIG)
+
+
+def test_from_file__cache_disabled(config_path: str, cache_dir: str):
+    with mock.patch.dict(os.environ, {"PYBATTERY_CACHE_DIR": ""}):
+        assert config_cache.cache_dir() is None
+        Config.from_file(config_path)
+    Config.from_file(config_path, cache=False)
+    assert not os.path.exists(cache_dir)
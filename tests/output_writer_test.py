@@ -0,0 +1,101 @@
+import io
+import json
+
+import pytest
+
+from pybattery.output_writer import StreamFormat, StreamWriter
+
+
+class CountingBuffer(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+        self.flushes = 0
+
+    def write(self, value: str) -> int:
+        self.writes += 1
+        return super().write(value)
+
+    def flush(self) -> None:
+        self.flushes += 1
+
+
+def test_ndjson():
+    fd = CountingBuffer()
+    writer = StreamWriter(StreamFormat.NDJSON, fd)
+
+    writer.write(100.0, {"mppt": {"battery": {"soc": 80}}, "thermo": {"temperature": 21.0}})
+    writer.write(101.0, {"thermo": {"error": "TimeoutError: timed out"}})
+
+    lines = fd.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"timestamp": 100.0, "mppt": {"battery": {"soc": 80}}, "thermo": {"temperature": 21.0}},
+        {"timestamp": 101.0, "thermo": {"error": "TimeoutError: timed out"}},
+    ]
+    assert lines[0] == '{"timestamp":100.0,"mppt":{"battery":{"soc":80}},"thermo":{"temperature":21.0}}'
+
+
+def test_csv__columns_are_fixed_by_the_first_record():
+    fd = io.StringIO()
+    writer = StreamWriter(StreamFormat.CSV, fd)
+
+    writer.write(100.0, {"mppt": {"battery": {"soc": 80}, "faults": ["a", "b"]}, "thermo": {"temperature": 21.0}})
+    writer.write(101.0, {"mppt": {"battery": {"soc": 81}, "new": 1}, "thermo": {"temperature": None}})
+
+    assert fd.getvalue().splitlines() == [
+        "timestamp,mppt.battery.soc,mppt.faults,thermo.temperature",
+        "100.0,80,a;b,21.0",
+        "101.0,81,,",
+    ]
+    assert writer.columns == ["mppt.battery.soc", "mppt.faults", "thermo.temperature"]
+
+
+@pytest.mark.parametrize("output_format", list(StreamFormat))
+def test_each_record_is_written_and_flushed_once(output_format):
+    fd = CountingBuffer()
+    writer = StreamWriter(output_format, fd)
+
+    for timestamp in range(3):
+        writer.write(float(timestamp), {"thermo": {"temperature": 21.0, "humidity": 40.0}})
+
+    assert fd.writes == 3
+    assert fd.flushes == 3
+
+
+def test_csv__failed_reads_do_not_define_columns():
+    fd = io.StringIO()
+    writer = StreamWriter(StreamFormat.CSV, fd)
+
+    writer.write(100.0, {"mppt": {"battery": {"soc": 80}}, "thermo": {"error": "TimeoutError: timed out"}})
+    assert fd.getvalue() == "", "Records are held back until every device was read once"
+    writer.write(101.0, {"mppt": {"battery": {"soc": 81}}, "thermo": {"temperature": 21.0}})
+    writer.write(102.0, {"mppt": {"battery": {"soc": 82}}, "thermo": {"error": "TimeoutError: timed out"}})
+
+    assert fd.getvalue().splitlines() == [
+        "timestamp,mppt.battery.soc,thermo.temperature",
+        "100.0,80,",
+        "101.0,81,21.0",
+        "102.0,82,",
+    ]
+
+
+def test_csv__records_are_held_back_for_a_bounded_time():
+    fd = io.StringIO()
+    writer = StreamWriter(StreamFormat.CSV, fd)
+
+    writer.write(100.0, {"mppt": {"battery": {"soc": 80}}, "thermo": {"error": "TimeoutError: timed out"}})
+    writer.write(105.0, {"mppt": {"battery": {"soc": 81}}, "thermo": {"error": "TimeoutError: timed out"}})
+    assert fd.getvalue() == ""
+    writer.write(160.0, {"mppt": {"battery": {"soc": 82}}, "thermo": {"error": "TimeoutError: timed out"}})
+
+    assert fd.getvalue().splitlines() == ["timestamp,mppt.battery.soc", "100.0,80", "105.0,81", "160.0,82"]
+
+
+def test_csv__held_back_records_are_written_on_close():
+    fd = io.StringIO()
+    writer = StreamWriter(StreamFormat.CSV, fd)
+
+    writer.write(100.0, {"mppt": {"battery": {"soc": 80}}, "thermo": {"error": "TimeoutError: timed out"}})
+    writer.close()
+
+    assert fd.getvalue().splitlines() == ["timestamp,mppt.battery.soc", "100.0,80"]
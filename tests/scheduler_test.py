@@ -0,0 +1,66 @@
+import pytest
+
+from pybattery.scheduler import Scheduler
+
+
+class FakeClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_due__per_job_interval(clock):
+    scheduler = Scheduler(clock)
+    scheduler.add("mppt", 2)
+    scheduler.add("thermo", 30)
+
+    assert sorted(scheduler.due()) == ["mppt", "thermo"]
+    assert scheduler.due() == []
+    assert scheduler.next_deadline() == 2
+
+    clock.now = 2
+    assert scheduler.due() == ["mppt"]
+    clock.now = 30
+    assert sorted(scheduler.due()) == ["mppt", "thermo"]
+
+
+def test_due__does_not_drift(clock):
+    scheduler = Scheduler(clock)
+    scheduler.add("mppt", 2)
+    scheduler.due()
+
+    clock.now = 2.7  # late run
+    assert scheduler.due() == ["mppt"]
+    assert scheduler.next_deadline() == 4, "Next tick should stay anchored to the original schedule"
+
+
+def test_due__skips_missed_ticks_under_overload(clock):
+    scheduler = Scheduler(clock)
+    scheduler.add("mppt", 2)
+    scheduler.due()
+
+    clock.now = 9  # ticks at 2, 4, 6, 8 were all missed
+    assert scheduler.due() == ["mppt"], "Missed ticks should not pile up"
+    assert scheduler.skipped["mppt"] == 3
+    assert scheduler.next_deadline() == 10
+
+
+def test_remove(clock):
+    scheduler = Scheduler(clock)
+    scheduler.add("mppt", 2)
+    scheduler.remove("mppt")
+
+    assert scheduler.due() == []
+    assert scheduler.next_deadline() is None
+
+
+def test_add__invalid_interval(clock):
+    with pytest.raises(ValueError):
+        Scheduler(clock).add("mppt", 0)
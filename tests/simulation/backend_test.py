@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+from pybattery.api import Api
+from pybattery.models.config import Config, DeviceConfig
+from pybattery.protocols import ReadableDeviceType, WritableDeviceType
+from pybattery.simulation.backend import Simulation, SimulationSettings, SimulatedFailure, scale_config
+from pybattery.simulation.devices import SimulatedLcd
+
+
+@pytest.fixture
+def config():
+    return Config(
+        devices={
+            "mppt": DeviceConfig(description="MPPT", type="renogy_rover"),
+            "thermo": DeviceConfig(description="Thermometer", type="dht11"),
+            "exterior": DeviceConfig(description="Exterior", type="ds12b20"),
+            "display": DeviceConfig(description="Display", type="lcd"),
+            "weather": DeviceConfig(description="Weather", type="weather_station"),
+        }
+    )
+
+
+def test_api_builds_simulated_devices(config, capsys):
+    api = Api(config, simulation=Simulation(seed=1))
+
+    assert sorted(api.read_devices) == ["exterior", "mppt", "thermo"]
+    assert sorted(api.write_devices) == ["display"]
+    assert "weather" in capsys.readouterr().err
+    assert api.cache_ttl("thermo") == 2.0
+
+
+def test_readings_look_like_the_hardware(config):
+    api = Api(config, simulation=Simulation(seed=1))
+
+    readings = api.read_all(["mppt", "thermo", "exterior"])
+
+    assert 0 <= readings["mppt"]["battery"]["soc"] <= 100
+    assert 11 < readings["mppt"]["battery"]["voltage"] < 15
+    assert readings["mppt"]["controller"]["faults"] == []
+    assert set(readings["thermo"]) == {"temperature", "humidity"}
+    assert readings["exterior"]["temperature"] * 16 == int(readings["exterior"]["temperature"] * 16)
+
+
+def test_readings_are_reproducible_with_a_seed(config):
+    first = Api(config, simulation=Simulation(seed=42)).read_all(["thermo", "exterior"])
+    second = Api(config, simulation=Simulation(seed=42)).read_all(["thermo", "exterior"])
+
+    assert first == second
+
+
+def test_latency_and_failures(config):
+    settings = SimulationSettings(latency=0.05, failure_rate=1.0)
+    device = Api(config, simulation=Simulation(settings)).read_devices["thermo"]
+
+    start = time.monotonic()
+    with pytest.raises(SimulatedFailure):
+        device.read()
+    assert time.monotonic() - start >= 0.05
+    assert device.io_stats == {"operations": 1, "failures": 1}
+
+
+def test_settings_can_be_overridden_per_device(config):
+    config.devices["thermo"].args["simulation"] = {"failure_rate": 1.0}
+    api = Api(config, simulation=Simulation())
+
+    api.read_devices["exterior"].read()
+    with pytest.raises(SimulatedFailure):
+        api.read_devices["thermo"].read()
+
+
+def test_lcd_shows_what_is_written(config):
+    display = Api(config, simulation=Simulation()).write_devices["display"].device
+    assert isinstance(display, SimulatedLcd)
+
+    display.write("Hello", "World")
+    display.write("Help")
+
+    assert display.lines == ["Help            ", " " * 16]
+
+
+def test_scale_config(config):
+    scaled = scale_config(config, 3)
+
+    assert len(scaled.devices) == 15
+    assert scaled.devices["mppt-3"] is config.devices["mppt"]
+    assert scale_config(config, 1) is config
+
+
+def test_scale_config__records_the_source_of_every_copy(config):
+    sources = {}
+    scale_config(config, 2, sources)
+
+    assert sources["mppt-1"] == sources["mppt-2"] == "mppt"
+    assert len(sources) == 10
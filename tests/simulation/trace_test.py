@@ -0,0 +1,76 @@
+import time
+
+from pybattery.api import Api
+from pybattery.daemon import Daemon
+from pybattery.models.config import Config, DeviceConfig
+from pybattery.simulation.backend import Simulation, SimulationSettings, scale_config
+from pybattery.simulation.trace import ReplayDevice, TraceRecorder, load_trace
+
+
+def test_record_and_load(tmp_path):
+    path = str(tmp_path / "trace.ndjson")
+    recorder = TraceRecorder(path)
+    recorder.record(100.0, {"a": {"value": 1}, "b": {"value": 10}})
+    recorder.record(101.0, {"a": {"value": 2}})
+    recorder.close()
+
+    assert load_trace(path) == {
+        "a": [(100.0, {"value": 1}), (101.0, {"value": 2})],
+        "b": [(100.0, {"value": 10})],
+    }
+
+
+def test_daemon_records_a_trace(tmp_path):
+    path = str(tmp_path / "trace.ndjson")
+    config = Config(devices={"thermo": DeviceConfig(description="Thermometer", type="dht11")})
+    daemon = Daemon(Api(config, simulation=Simulation(seed=1)), sinks=[TraceRecorder(path)])
+
+    readings = daemon.poll(["thermo"])
+
+    assert load_trace(path)["thermo"][0][1] == readings["thermo"]
+
+
+def test_replay_at_accelerated_speed():
+    samples = [(1000.0, {"value": 1}), (1010.0, {"value": 2}), (1020.0, {"value": 3})]
+    device = ReplayDevice(
+        DeviceConfig(description="replayed", type="dht11"), samples, settings=SimulationSettings(speed=1000)
+    )
+
+    values = [device.read()]
+    while len(values) < 4:
+        if (value := device.read()) != values[-1]:
+            values.append(value)
+        time.sleep(0.001)
+
+    assert values == [{"value": 1}, {"value": 2}, {"value": 3}, {"value": 1}]  # then starts over
+
+
+def test_simulation_replays_traced_devices():
+    config = Config(
+        devices={
+            "thermo": DeviceConfig(description="Thermometer", type="dht11"),
+            "exterior": DeviceConfig(description="Exterior", type="ds12b20"),
+        }
+    )
+    trace = {"thermo": [(0.0, {"temperature": 99.0})]}
+    simulation = Simulation(trace=trace)
+    api = Api(scale_config(config, 2, simulation.sources), simulation=simulation)
+
+    assert api.read_all(["thermo-1", "thermo-2"]) == {
+        "thermo-1": {"temperature": 99.0},
+        "thermo-2": {"temperature": 99.0},
+    }
+    assert not isinstance(api.read_devices["exterior-1"].device, ReplayDevice)
+
+
+def test_simulation_does_not_replay_the_trace_of_a_device_with_a_similar_name():
+    config = Config(
+        devices={
+            "thermo": DeviceConfig(description="Thermometer", type="dht11"),
+            "thermo-exterior": DeviceConfig(description="Exterior", type="ds18b20"),
+        }
+    )
+    api = Api(config, simulation=Simulation(trace={"thermo": [(0.0, {"temperature": 99.0})]}))
+
+    assert isinstance(api.read_devices["thermo"].device, ReplayDevice)
+    assert not isinstance(api.read_devices["thermo-exterior"].device, ReplayDevice)
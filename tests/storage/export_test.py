@@ -0,0 +1,87 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from pybattery.storage.export import HEADER_LENGTH, MAGIC, ColumnarWriter, CsvWriter, export, read_columnar
+from pybattery.storage.history import HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path) -> HistoryStore:
+    store = HistoryStore(str(tmp_path / "history"), flush_records=100)
+    for minute in range(60):
+        timestamp = 1_700_000_000 + minute * 60
+        battery = {"soc": 50 + minute % 10, "voltage": 12.5 + minute / 100}
+        store.record(timestamp, {"mppt": {"battery": battery}, "thermo": {"temperature": 20.5}})
+    return store
+
+
+def read_all(data: bytes):
+    merged = {}
+    for chunk in read_columnar(io.BytesIO(data)):
+        for name, (timestamps, values) in chunk.items():
+            merged.setdefault(name, ([], []))
+            merged[name][0].extend(timestamps)
+            merged[name][1].extend(values)
+    return merged
+
+
+def test_columnar__round_trip(store: HistoryStore):
+    output = io.BytesIO()
+    assert export(store, ColumnarWriter(output)) == 180
+
+    columns = read_all(output.getvalue())
+    assert set(columns) == {("mppt", "battery.soc"), ("mppt", "battery.voltage"), ("thermo", "temperature")}
+    timestamps, values = columns[("mppt", "battery.voltage")]
+    assert timestamps == [1_700_000_000 + minute * 60 for minute in range(60)]
+    assert values == pytest.approx([12.5 + minute / 100 for minute in range(60)])
+    assert columns[("mppt", "battery.soc")][1] == [50 + minute % 10 for minute in range(60)]
+
+
+def test_columnar__integer_columns(store: HistoryStore):
+    output = io.BytesIO()
+    export(store, ColumnarWriter(output))
+
+    data = output.getvalue()
+    header_start = len(MAGIC) + HEADER_LENGTH.size
+    header = json.loads(data[header_start : header_start + HEADER_LENGTH.unpack_from(data, len(MAGIC))[0]])
+    types = {(column["device"], column["metric"]): column["values"]["type"] for column in header["columns"]}
+    assert types == {("mppt", "battery.soc"): "q", ("mppt", "battery.voltage"): "d", ("thermo", "temperature"): "d"}
+
+
+def test_columnar__chunks_bound_memory(store: HistoryStore):
+    output = io.BytesIO()
+    writer = ColumnarWriter(output, chunk_records=50)
+    export(store, writer)
+
+    assert writer.stats["chunks"] == 4
+    chunks = list(read_columnar(io.BytesIO(output.getvalue())))
+    assert [sum(len(timestamps) for timestamps, _ in chunk.values()) for chunk in chunks] == [50, 50, 50, 30]
+
+
+def test_columnar__not_an_export():
+    with pytest.raises(ValueError):
+        list(read_columnar(io.BytesIO(b"timestamp,device\n")))
+
+
+def test_export__filters_devices_and_time(store: HistoryStore):
+    output = io.BytesIO()
+    start, end = 1_700_000_000 + 10 * 60, 1_700_000_000 + 19 * 60
+    assert export(store, ColumnarWriter(output), devices={"thermo"}, start=start, end=end) == 10
+
+    columns = read_all(output.getvalue())
+    assert list(columns) == [("thermo", "temperature")]
+    assert columns[("thermo", "temperature")][0] == [start + minute * 60 for minute in range(10)]
+
+
+def test_csv(store: HistoryStore):
+    output = io.BytesIO()
+    assert export(store, CsvWriter(output), devices={"mppt"}) == 120
+
+    rows = list(csv.reader(io.StringIO(gzip.decompress(output.getvalue()).decode())))
+    assert rows[0] == ["timestamp", "device", "metric", "value"]
+    assert rows[1] == ["1700000000.0", "mppt", "battery.soc", "50.0"]
+    assert len(rows) == 121
@@ -0,0 +1,176 @@
+import io
+import os
+
+import pytest
+
+from pybattery.storage.history import RECORD_SIZE, SERIES_FILE, HistoryStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "history")
+
+
+def record_hours(store: HistoryStore, hours: int, start: float = 0.0):
+    for hour in range(hours):
+        timestamp = start + hour * 3600
+        store.record(timestamp, {"mppt": {"battery": {"soc": hour, "voltage": 12.0}}, "thermo": {"error": "timeout"}})
+
+
+def test_record_and_query(path):
+    store = HistoryStore(path, flush_records=10)
+    record_hours(store, 24)
+
+    assert list(store.query("mppt", "battery.soc", 3600 * 20, 3600 * 22)) == [
+        (72000.0, 20.0),
+        (75600.0, 21.0),
+        (79200.0, 22.0),
+    ]
+    assert len(list(store.query("mppt", "battery.voltage"))) == 24
+    assert list(store.query("thermo", "temperature")) == []
+
+
+def test_records_are_batched(path):
+    store = HistoryStore(path, flush_records=100)
+    record_hours(store, 10)
+
+    assert store.segments == [], "Nothing should be written before the batch is full"
+    assert len(list(store.query("mppt", "battery.soc"))) == 10, "Unflushed records should still be queryable"
+
+    store.flush()
+    assert os.path.getsize(store.segments[0].path) == 20 * RECORD_SIZE
+
+
+def test_reopen(path):
+    store = HistoryStore(path)
+    record_hours(store, 5)
+    store.close()
+
+    reopened = HistoryStore(path)
+    assert reopened.series == {("mppt", "battery.soc"): 0, ("mppt", "battery.voltage"): 1}
+    assert [value for _, value in reopened.query("mppt", "battery.soc")] == [0, 1, 2, 3, 4]
+
+    record_hours(reopened, 2, start=5 * 3600)
+    reopened.close()
+    assert [value for _, value in HistoryStore(path).query("mppt", "battery.soc")] == [0, 1, 2, 3, 4, 0, 1]
+
+
+def test_reopen__discards_torn_writes(path):
+    store = HistoryStore(path)
+    record_hours(store, 3)
+    store.close()
+    with open(store.segments[-1].path, "ab") as segment_file:
+        segment_file.write(b"\x01\x02\x03")
+    with open(os.path.join(path, SERIES_FILE), "a") as series_file:
+        series_file.write("2\tmppt\tbatt")
+
+    reopened = HistoryStore(path)
+
+    assert reopened.segments[-1].size == 6 * RECORD_SIZE
+    assert len(reopened.series) == 2
+    assert len(list(reopened.query("mppt", "battery.soc"))) == 3
+
+
+def test_rotation(path):
+    store = HistoryStore(path, flush_records=2, segment_bytes=4 * RECORD_SIZE)
+    record_hours(store, 8)
+    store.close()
+
+    assert len(store.segments) == 4
+    assert [value for _, value in store.query("mppt", "battery.soc", 3600 * 2.5, 3600 * 5)] == [3, 4, 5]
+
+
+def test_clock_going_backwards_keeps_segments_sorted(path):
+    store = HistoryStore(path, flush_records=1)
+    record_hours(store, 3, start=10000)
+    record_hours(store, 3, start=0)
+    store.close()
+
+    assert len(store.segments) == 2
+    assert [value for _, value in store.query("mppt", "battery.soc", 0, 7200)] == [0, 1, 2]
+
+
+def test_compact__retention_and_merge(path):
+    store = HistoryStore(path, flush_records=2, segment_bytes=2 * RECORD_SIZE)
+    for day in range(5):
+        record_hours(store, 1, start=day * 86400 + 100)
+    store.close()
+    assert len(store.segments) == 5
+
+    store = HistoryStore(path, segment_bytes=16 * RECORD_SIZE)
+    store.compact(retention=2.5 * 86400, now=4 * 86400)
+
+    assert [value for _, value in store.query("mppt", "battery.soc")] == [0, 0, 0]
+    assert len(store.segments) == 2, "Small sealed segments should be merged, the active one left alone"
+    assert len([name for name in os.listdir(path) if name.endswith(".seg")]) == 2
+
+
+def test_read_only__leaves_files_alone(path):
+    store = HistoryStore(path)
+    record_hours(store, 3)
+    store.close()
+    segment_path, series_path = store.segments[-1].path, os.path.join(path, SERIES_FILE)
+    with open(segment_path, "ab") as segment_file:
+        segment_file.write(b"\x01\x02\x03")  # a record being appended by the writer
+    with open(series_path, "a") as series_file:
+        series_file.write("2\tmppt\tbatt")
+    sizes = os.path.getsize(segment_path), os.path.getsize(series_path)
+
+    reader = HistoryStore(path, read_only=True)
+
+    assert [value for _, value in reader.query("mppt", "battery.soc")] == [0, 1, 2]
+    assert len(reader.series) == 2
+    reader.close()
+    assert (os.path.getsize(segment_path), os.path.getsize(series_path)) == sizes
+    with pytest.raises(io.UnsupportedOperation):
+        reader.record(0, {"mppt": {"soc": 1}})
+
+
+def test_read_only__missing_directory(path):
+    with pytest.raises(FileNotFoundError):
+        HistoryStore(path, read_only=True)
+    assert not os.path.exists(path)
+
+
+def test_reopen__segments_with_the_same_first_timestamp_stay_in_order(path):
+    store = HistoryStore(path, flush_records=1, segment_bytes=RECORD_SIZE)
+    for value in range(3):
+        store.record(100.0, {"mppt": {"soc": value}})
+    store.close()
+    names = [os.path.basename(segment.path) for segment in store.segments]
+    assert names == ["0000000000100000.seg", "0000000000100000-1.seg", "0000000000100000-2.seg"]
+
+    reopened = HistoryStore(path, segment_bytes=RECORD_SIZE)
+    assert [os.path.basename(segment.path) for segment in reopened.segments] == names
+    assert [value for _, value in reopened.query("mppt", "soc")] == [0, 1, 2]
+
+
+def test_read_only__segments_removed_by_compaction_are_skipped(path):
+    store = HistoryStore(path, flush_records=2, segment_bytes=2 * RECORD_SIZE)
+    for day in range(4):
+        record_hours(store, 1, start=day * 86400)
+    store.close()
+    reader = HistoryStore(path, read_only=True)
+    samples = reader.query("mppt", "battery.soc")
+    next(samples)
+
+    HistoryStore(path).compact(retention=1.5 * 86400, now=3 * 86400)
+
+    assert [timestamp for timestamp, _ in samples] == [2 * 86400, 3 * 86400], "Removed segments should be skipped"
+
+
+def test_reopen__ignores_stray_files_and_removes_interrupted_merges(path):
+    store = HistoryStore(path)
+    record_hours(store, 2)
+    store.close()
+    segment_path = store.segments[0].path
+    for name in ("notes.seg", "backup-old.seg"):
+        open(os.path.join(path, name), "wb").close()
+    with open(f"{segment_path}.tmp", "wb") as merged_file:
+        merged_file.write(b"\x00" * RECORD_SIZE)
+
+    assert [value for _, value in HistoryStore(path, read_only=True).query("mppt", "battery.soc")] == [0, 1]
+    assert os.path.exists(f"{segment_path}.tmp"), "A reader should not remove files"
+    reopened = HistoryStore(path)
+    assert [value for _, value in reopened.query("mppt", "battery.soc")] == [0, 1]
+    assert not os.path.exists(f"{segment_path}.tmp")
@@ -0,0 +1,63 @@
+import pytest
+
+from pybattery.storage.memory import MemoryStore
+from pybattery.storage.ring_buffer import RingBuffer
+
+
+def test_append_and_latest():
+    buffer = RingBuffer(3)
+    assert buffer.latest() is None
+
+    buffer.append(1.0, 10.0)
+    buffer.append(2.0, 20.0)
+
+    assert len(buffer) == 2
+    assert buffer.latest() == (2.0, 20.0)
+    assert list(buffer) == [(1.0, 10.0), (2.0, 20.0)]
+
+
+def test_append__overwrites_oldest():
+    buffer = RingBuffer(3)
+    for i in range(5):
+        buffer.append(float(i), float(i * 10))
+
+    assert len(buffer) == 3
+    assert list(buffer) == [(2.0, 20.0), (3.0, 30.0), (4.0, 40.0)]
+    assert buffer.latest() == (4.0, 40.0)
+
+
+@pytest.mark.parametrize(
+    "start, end, expected",
+    [
+        (None, None, [3.0, 4.0, 5.0, 6.0, 7.0]),
+        (4.0, 6.0, [4.0, 5.0, 6.0]),
+        (4.5, 6.5, [5.0, 6.0]),
+        (0.0, 3.0, [3.0]),
+        (8.0, None, []),
+        (None, 2.0, []),
+    ],
+)
+def test_range__wrapped(start, end, expected):
+    buffer = RingBuffer(5)
+    for i in range(8):
+        buffer.append(float(i), float(i))
+
+    assert [timestamp for timestamp, _ in buffer.range(start, end)] == expected
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+
+
+def test_memory_store__records_numeric_metrics():
+    store = MemoryStore(capacity=2)
+    store.record(1.0, {"mppt": {"battery": {"voltage": 12.5, "soc": 80}, "state": "float"}})
+    store.record(2.0, {"mppt": {"battery": {"voltage": 12.6, "soc": 81}}, "thermo": {"error": "timeout"}})
+    store.record(3.0, {"mppt": {"battery": {"voltage": 12.7, "soc": 82}}})
+
+    assert sorted(store.series) == [("mppt", "battery.soc"), ("mppt", "battery.voltage")]
+    assert store.latest("mppt", "battery.voltage") == (3.0, 12.7)
+    assert store.range("mppt", "battery.soc") == [(2.0, 81.0), (3.0, 82.0)]
+    assert store.latest("thermo", "temperature") is None
+    assert store.range("thermo", "temperature") == []
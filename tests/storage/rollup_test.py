@@ -0,0 +1,88 @@
+import pytest
+
+from pybattery.storage.history import HistoryStore
+from pybattery.storage.rollup import AggregateBuffer, Rollup
+
+
+def test_aggregate_buffer__buckets():
+    buffer = AggregateBuffer(resolution=60, capacity=10)
+    for timestamp, value in [(0, 1.0), (30, 3.0), (59, 2.0), (60, 10.0), (150, 5.0)]:
+        buffer.add(timestamp, value)
+
+    assert buffer.range() == [
+        {"timestamp": 0, "min": 1.0, "max": 3.0, "mean": 2.0, "last": 2.0, "count": 3},
+        {"timestamp": 60, "min": 10.0, "max": 10.0, "mean": 10.0, "last": 10.0, "count": 1},
+        {"timestamp": 120, "min": 5.0, "max": 5.0, "mean": 5.0, "last": 5.0, "count": 1},
+    ]
+    assert [bucket["timestamp"] for bucket in buffer.range(70, 130)] == [60, 120]
+
+
+def test_aggregate_buffer__late_sample_updates_its_bucket():
+    buffer = AggregateBuffer(resolution=60, capacity=10)
+    buffer.add(10, 1.0)
+    buffer.add(70, 2.0)
+    buffer.add(20, 5.0)
+
+    first, second = buffer.range()
+    assert (first["max"], first["count"], first["last"]) == (5.0, 2, 1.0)
+    assert second["count"] == 1
+
+
+def test_aggregate_buffer__drops_oldest_bucket():
+    buffer = AggregateBuffer(resolution=60, capacity=2)
+    for minute in range(4):
+        buffer.add(minute * 60, float(minute))
+
+    assert [bucket["timestamp"] for bucket in buffer.range()] == [120, 180]
+    assert buffer.covers(120)
+    assert not buffer.covers(60)
+
+
+@pytest.fixture
+def rollup():
+    rollup = Rollup(resolutions={60: 60, 3600: 48, 86400: 30})
+    for second in range(0, 2 * 86400, 30):
+        rollup.record(second, {"mppt": {"battery": {"soc": second // 3600}}})
+    return rollup
+
+
+@pytest.mark.parametrize(
+    "start, end, expected_resolution",
+    [
+        (2 * 86400 - 1800, 2 * 86400, 60),  # recent window, minutes are still kept
+        (86400, 2 * 86400, 3600),  # minutes were dropped
+        (0, 2 * 86400, 3600),
+    ],
+)
+def test_query__picks_resolution(rollup, start, end, expected_resolution):
+    resolution, buckets = rollup.query("mppt", "battery.soc", start, end)
+
+    assert resolution == expected_resolution
+    assert buckets[0]["timestamp"] <= start + expected_resolution
+
+
+def test_query__max_points(rollup):
+    resolution, buckets = rollup.query("mppt", "battery.soc", 0, 2 * 86400, max_points=10)
+
+    assert resolution == 86400
+    assert buckets == [
+        {"timestamp": 0, "min": 0.0, "max": 23.0, "mean": 11.5, "last": 23.0, "count": 2880},
+        {"timestamp": 86400, "min": 24.0, "max": 47.0, "mean": 35.5, "last": 47.0, "count": 2880},
+    ]
+
+
+def test_query__unknown_series(rollup):
+    assert rollup.query("thermo", "temperature") == (None, [])
+
+
+def test_load__from_history(tmp_path):
+    history = HistoryStore(str(tmp_path))
+    for second in range(0, 300, 60):
+        history.record(second, {"thermo": {"temperature": second / 60}})
+
+    rollup = Rollup()
+    rollup.load(history.samples(start=100))
+
+    resolution, buckets = rollup.query("thermo", "temperature")
+    assert resolution == 60
+    assert [bucket["last"] for bucket in buckets] == [2.0, 3.0, 4.0]
@@ -0,0 +1,26 @@
+import threading
+import time
+
+from pybattery.workers import TaskTimeoutError, run_concurrently
+
+
+def test_run_concurrently__timed_out_worker_does_not_take_more_tasks():
+    lock = threading.Lock()
+    running = []
+    most_running = []
+
+    def task():
+        with lock:
+            running.append(1)
+            most_running.append(len(running))
+        time.sleep(0.1)
+        with lock:
+            running.pop()
+        return "done"
+
+    tasks = {"hung": lambda: time.sleep(0.25), **{name: task for name in "abcd"}}
+    outcomes = run_concurrently(tasks, max_workers=1, timeout=0.15)
+
+    assert isinstance(outcomes["hung"], TaskTimeoutError)
+    assert [outcomes[name] for name in "abcd"] == ["done"] * 4
+    assert max(most_running) == 1, "No more than max_workers tasks should run once the hung one returned"
@@ -0,0 +1,106 @@
+import threading
+import time
+from typing import Any, List
+from unittest import mock
+
+import pytest
+
+from pybattery.api import Api
+from pybattery.models.config import Config, DeviceConfig
+from pybattery.models.device import Device
+from pybattery.write_queue import WriteQueue
+
+
+class RecordingDevice(Device):
+    """Test device recording the values written and when"""
+
+    def __init__(self, config: DeviceConfig):
+        super().__init__(config)
+        self.values: List[Any] = []
+        self.times: List[float] = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def write(self, value: Any) -> None:
+        self.release.wait(5)
+        if value == "fail":
+            raise RuntimeError("relay stuck")
+        self.values.append(value)
+        self.times.append(time.monotonic())
+
+
+@pytest.fixture
+def device() -> RecordingDevice:
+    return RecordingDevice(DeviceConfig(description="Test", type="recording"))
+
+
+def test_submit__writes_value(device: RecordingDevice):
+    queue = WriteQueue(device)
+    queue.submit("on").result(1)
+    assert device.values == ["on"]
+    assert queue.stats["written"] == 1
+    queue.close()
+
+
+def test_submit__coalesces_superseded_values(device: RecordingDevice):
+    queue = WriteQueue(device)
+    device.release.clear()
+    first = queue.submit(1)
+    time.sleep(0.05)  # let the worker start writing 1
+    results = [queue.submit(value) for value in (2, 3, 4)]
+    assert queue.depth == 1
+    device.release.set()
+    for result in [first, *results]:
+        result.result(1)
+
+    assert device.values == [1, 4]
+    assert queue.stats["submitted"] == 4
+    assert queue.stats["coalesced"] == 2
+    assert queue.depth == 0
+    queue.close()
+
+
+def test_submit__minimum_interval(device: RecordingDevice):
+    queue = WriteQueue(device, min_interval=0.2)
+    queue.submit(1).result(1)
+    queue.submit(2).result(1)
+    assert device.times[1] - device.times[0] >= 0.2
+    assert queue.stats["max_latency_s"] >= 0.15
+    queue.close()
+
+
+def test_submit__error_is_reported(device: RecordingDevice):
+    queue = WriteQueue(device)
+    result = queue.submit("fail")
+    with pytest.raises(RuntimeError, match="relay stuck"):
+        result.result(1)
+    assert queue.stats["errors"] == 1
+    queue.submit("on").result(1)
+    assert device.values == ["on"]
+    queue.close()
+
+
+def test_close__flushes_pending_value(device: RecordingDevice):
+    queue = WriteQueue(device, min_interval=0.1)
+    queue.submit(1)
+    queue.submit(2)
+    queue.close()
+    assert device.values[-1] == 2
+    with pytest.raises(RuntimeError, match="closed"):
+        queue.submit(3)
+
+
+def test_api_write__uses_queue_per_device():
+    with mock.patch("pybattery.api.list_device_types", return_value={"recording": RecordingDevice}):
+        api = Api(
+            Config(
+                devices={"relay": DeviceConfig(description="Relay", type="recording")},
+                write_interval={"recording": 0.5},
+            )
+        )
+        api.write("relay", "on")
+        assert api.write_queue("relay").min_interval == 0.5
+        assert api.write_stats["relay"]["written"] == 1
+        with pytest.raises(KeyError):
+            api.write("missing", "on")
+        api.close()